@@ -0,0 +1,170 @@
+"""
+Benchmark: full-file hashing throughput and buffer allocations
+
+Hashes the same file with:
+  - legacy: f.read(chunk_size) into a new bytes object per chunk (the previous loop)
+  - readinto: HashCalculator.calculate_file_hash, reusing one buffer per thread
+  - mmap: HashCalculator.calculate_file_hash(use_mmap=True)
+
+followed by the in-memory speed of every registered digest backend
+(utils.hash_backends) and the one HASH_ALGORITHM = 'auto' picks.
+
+The file is read once before timing, so the numbers compare the hashing paths
+on page-cached data rather than the disk. Buffer allocations are counted by
+handing each path a hash object that records which buffer every update() came
+from (the underlying object of a memoryview), keeping them alive so a freed
+chunk can't be counted twice at a reused address. Peak traced memory is
+measured separately with tracemalloc.
+
+Usage:
+    python benchmarks/hash_throughput.py [--size-mb 512] [--repeat 3] [--path FILE]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import xxhash
+
+import config
+from utils import hash_backends
+from utils.hash_calculator import HashCalculator
+
+_xxh64 = xxhash.xxh64
+_new_hash = HashCalculator.new_hash
+
+
+def legacy_file_hash(filepath: str, chunk_size: int = config.CHUNK_SIZE) -> str:
+    """The previous HashCalculator.calculate_file_hash() loop"""
+    hash_obj = xxhash.xxh64()
+    with open(filepath, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            hash_obj.update(chunk)
+    return hash_obj.hexdigest()
+
+
+class BufferCounter:
+    """Hands out xxh64 objects that count distinct buffers passed to update()"""
+    
+    def __init__(self):
+        self.buffers = {}  # id -> buffer object (kept alive while counting)
+        self.updates = 0
+    
+    def xxh64(self, algorithm='xxh64'):
+        counter = self
+        real = _xxh64()
+        
+        class CountingHash:
+            def update(self, data):
+                owner = data.obj if isinstance(data, memoryview) else data
+                counter.buffers[id(owner)] = owner
+                counter.updates += 1
+                real.update(data)
+            
+            def hexdigest(self):
+                return real.hexdigest()
+        
+        return CountingHash()
+
+
+def count_buffers(func, filepath: str):
+    """(distinct buffers, update calls) for one hash of filepath"""
+    counter = BufferCounter()
+    original_global = globals()['xxhash']
+    HashCalculator.new_hash = staticmethod(counter.xxh64)
+    globals()['xxhash'] = counter
+    try:
+        func(filepath)
+    finally:
+        HashCalculator.new_hash = _new_hash
+        globals()['xxhash'] = original_global
+    return len(counter.buffers), counter.updates
+
+
+def peak_memory(func, filepath: str) -> int:
+    """Peak traced Python memory while hashing filepath once"""
+    tracemalloc.start()
+    try:
+        func(filepath)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def throughput(func, filepath: str, size: int, repeat: int):
+    """Best-of-repeat GB/s and the digest"""
+    best = None
+    digest = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        digest = func(filepath)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return size / best / 1e9, digest
+
+
+def make_file(size: int) -> str:
+    fd, path = tempfile.mkstemp(suffix='.bin')
+    block = os.urandom(1024 * 1024)
+    with os.fdopen(fd, 'wb') as f:
+        written = 0
+        while written < size:
+            f.write(block[:size - written])
+            written += len(block)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=512, help='Size of the generated test file')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per path (best is shown)')
+    parser.add_argument('--path', help='Hash this file instead of a generated one')
+    args = parser.parse_args()
+    
+    config.MMAP_MIN_SIZE = 0  # mmap path for any file size
+    path = args.path or make_file(args.size_mb * 1024 * 1024)
+    try:
+        size = os.path.getsize(path)
+        legacy_file_hash(path)  # Warm the page cache
+        
+        paths = [
+            ('legacy', legacy_file_hash),
+            ('readinto', lambda p: HashCalculator.calculate_file_hash(p, 'xxh64', use_mmap=False)),
+            ('mmap', lambda p: HashCalculator.calculate_file_hash(p, 'xxh64', use_mmap=True)),
+        ]
+        
+        print(f"File: {size / (1024 * 1024):,.0f} MB, chunk {config.CHUNK_SIZE // 1024} KB")
+        print(f"{'path':<10} {'GB/s':>8} {'buffers':>9} {'updates':>9} {'peak KB':>9}")
+        digests = set()
+        for label, func in paths:
+            rate, digest = throughput(func, path, size, args.repeat)
+            digests.add(digest)
+            buffers, updates = count_buffers(func, path)
+            peak = peak_memory(func, path)
+            print(f"{label:<10} {rate:>8.2f} {buffers:>9,} {updates:>9,} {peak / 1024:>9.0f}")
+        
+        if len(digests) != 1:
+            print("\nWARNING: paths produced different digests")
+        
+        # In-memory throughput of each registered digest backend
+        rates = hash_backends.benchmark()
+        print(f"\n{'backend':<10} {'GB/s':>8}  (auto picks {hash_backends.fastest_backend()})")
+        for name, rate in sorted(rates.items(), key=lambda item: -item[1]):
+            safe = '' if hash_backends.get_backend(name).collision_safe else '  (64-bit, not used by auto)'
+            print(f"{name:<10} {rate / 1e9:>8.2f}{safe}")
+    finally:
+        if not args.path:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: memory per file of scan result records (old dict vs FileRecord)
+
+Builds the same synthetic result set twice with tracemalloc running:
+  - dict: the previous six-key get_file_info() dictionary
+  - record: FileRecord (__slots__, path stored as interned directory id + basename)
+
+Path strings are generated inside the measured region, so each record type is
+charged for the strings it keeps: the dict holds the full path, the record only
+the basename (the directory table is shared and counted once).
+
+Usage:
+    python benchmarks/record_memory.py [--count 1000000]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.file_record import FileRecord
+
+
+def legacy_file_info(filepath: str, stat: os.stat_result) -> dict:
+    """The previous FileScanner.get_file_info() result"""
+    return {
+        'path': filepath,
+        'name': os.path.basename(filepath),
+        'size': stat.st_size,
+        'modified': stat.st_mtime,
+        'created': stat.st_ctime,
+        'extension': os.path.splitext(filepath)[1].lower()
+    }
+
+
+def make_path(i: int) -> str:
+    extensions = ['.jpg', '.mp4', '.pdf', '.docx', '.zip', '.txt']
+    return os.path.join('C:\\Users\\user\\Documents', f"folder{i % 500:03d}",
+                        f"file_{i:07d}{extensions[i % len(extensions)]}")
+
+
+def measure(label: str, build, count, stat):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = [build(make_path(i), stat) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    # The result list itself is the same size for both record types
+    list_bytes = sys.getsizeof(records)
+    per_file = (current - list_bytes) / count
+    print(f"{label:<8} {per_file:>12.1f} {current / (1024 * 1024):>12.1f} {elapsed:>9.2f}s")
+    del records
+    return per_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1_000_000, help='Number of file records')
+    args = parser.parse_args()
+    
+    stat = os.stat(__file__)
+    
+    print(f"Records: {args.count:,}")
+    print(f"{'type':<8} {'bytes/file':>12} {'total MB':>12} {'time':>10}")
+    dict_bytes = measure('dict', legacy_file_info, args.count, stat)
+    record_bytes = measure('record', FileRecord.from_stat, args.count, stat)
+    
+    saved = dict_bytes - record_bytes
+    print(f"\nSaved {saved:.1f} bytes/file ({saved / dict_bytes * 100:.1f}%), "
+          f"{saved * args.count / (1024 * 1024):.1f} MB for {args.count:,} files")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Benchmark: metadata syscalls of the scandir traversal engine vs the old os.walk walker
+
+Builds a synthetic directory tree, then walks it twice:
+  - legacy: os.walk + os.stat() per file (the previous FileScanner loop)
+  - scandir: FileScanner.scan_directory_with_stat (os.scandir + cached DirEntry.stat)
+
+Directory listings and stat-family calls are counted by wrapping the os module
+functions, so the numbers reflect what each walker asks the OS for.
+
+Usage:
+    python benchmarks/scanner_syscalls.py [--dirs 200] [--files 50] [--path DIR]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.file_scanner import FileScanner
+
+
+class SyscallCounter:
+    """Wrap os.scandir / os.stat / os.lstat and count calls"""
+
+    def __init__(self):
+        self.counts = {'listdir': 0, 'stat': 0}
+        self._originals = {}
+
+    def __enter__(self):
+        counts = self.counts
+        orig_scandir = os.scandir
+        orig_stat = os.stat
+        orig_lstat = os.lstat
+        self._originals = {'scandir': orig_scandir, 'stat': orig_stat, 'lstat': orig_lstat}
+
+        class CountingEntry:
+            """DirEntry proxy that counts the first stat() that needs a syscall"""
+            __slots__ = ('_entry', '_stat')
+
+            def __init__(self, entry):
+                self._entry = entry
+                self._stat = None
+
+            name = property(lambda self: self._entry.name)
+            path = property(lambda self: self._entry.path)
+
+            def is_dir(self, *, follow_symlinks=True):
+                return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+            def is_file(self, *, follow_symlinks=True):
+                return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+            def is_symlink(self):
+                return self._entry.is_symlink()
+
+            def inode(self):
+                return self._entry.inode()
+
+            def stat(self, *, follow_symlinks=True):
+                if self._stat is None:
+                    # Windows fills stat from the directory listing (except symlinks)
+                    if os.name != 'nt' or self._entry.is_symlink():
+                        counts['stat'] += 1
+                    self._stat = self._entry.stat(follow_symlinks=follow_symlinks)
+                return self._stat
+
+        class CountingScandir:
+            def __init__(self, path):
+                counts['listdir'] += 1
+                self._it = orig_scandir(path)
+
+            def __iter__(self):
+                return (CountingEntry(e) for e in self._it)
+
+            def __next__(self):
+                return CountingEntry(next(self._it))
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._it.close()
+
+            def close(self):
+                self._it.close()
+
+        def counting_stat(*args, **kwargs):
+            counts['stat'] += 1
+            return orig_stat(*args, **kwargs)
+
+        def counting_lstat(*args, **kwargs):
+            counts['stat'] += 1
+            return orig_lstat(*args, **kwargs)
+
+        os.scandir = CountingScandir
+        os.stat = counting_stat
+        os.lstat = counting_lstat
+        return self
+
+    def __exit__(self, *exc):
+        os.scandir = self._originals['scandir']
+        os.stat = self._originals['stat']
+        os.lstat = self._originals['lstat']
+
+
+def legacy_walk(scanner: FileScanner, root_path: str):
+    """The previous FileScanner loop: os.walk + os.stat() per file"""
+    for dirpath, dirnames, filenames in os.walk(root_path):
+        dirnames[:] = [d for d in dirnames
+                       if not scanner.exclusions.match(os.path.join(dirpath, d), d)]
+        for filename in filenames:
+            if not scanner._is_file_safe(filename):
+                continue
+            filepath = os.path.join(dirpath, filename)
+            try:
+                yield (filepath, os.stat(filepath))
+            except OSError:
+                continue
+
+
+def build_tree(root: str, dirs: int, files_per_dir: int):
+    """Create a synthetic tree: dirs spread over two levels, small files in each"""
+    fanout = max(1, int(dirs ** 0.5))
+    created = 0
+    for i in range(fanout):
+        parent = os.path.join(root, f"d{i:04d}")
+        os.makedirs(parent, exist_ok=True)
+        for j in range(fanout):
+            if created >= dirs:
+                break
+            leaf = os.path.join(parent, f"s{j:04d}")
+            os.makedirs(leaf, exist_ok=True)
+            for k in range(files_per_dir):
+                with open(os.path.join(leaf, f"f{k:05d}.bin"), 'wb') as f:
+                    f.write(b'x' * (k % 64))
+            created += 1
+
+
+def run(label: str, walker):
+    with SyscallCounter() as counter:
+        start = time.perf_counter()
+        records = sum(1 for _ in walker())
+        elapsed = time.perf_counter() - start
+    counts = counter.counts
+    print(f"{label:<10} {records:>10,} {counts['listdir']:>10,} {counts['stat']:>10,} "
+          f"{counts['listdir'] + counts['stat']:>10,} {elapsed:>9.3f}s")
+    return counts['listdir'] + counts['stat']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dirs', type=int, default=200, help='Number of leaf directories')
+    parser.add_argument('--files', type=int, default=50, help='Files per leaf directory')
+    parser.add_argument('--path', help='Walk an existing directory instead of a synthetic tree')
+    args = parser.parse_args()
+
+    tmp_root = None
+    root = args.path
+    if root is None:
+        tmp_root = tempfile.mkdtemp(prefix='sm_bench_')
+        root = tmp_root
+        build_tree(root, args.dirs, args.files)
+
+    try:
+        scanner = FileScanner()
+
+        # Warm the OS metadata cache so both walkers see the same conditions
+        for _ in legacy_walk(scanner, root):
+            pass
+
+        print(f"Tree: {root}")
+        print(f"{'walker':<10} {'records':>10} {'listdirs':>10} {'stats':>10} {'total':>10} {'time':>10}")
+        legacy_total = run('legacy', lambda: legacy_walk(scanner, root))
+        scandir_total = run('scandir', lambda: scanner.scan_directory_with_stat(root))
+
+        saved = legacy_total - scandir_total
+        pct = (saved / legacy_total * 100) if legacy_total else 0
+        print(f"\nMetadata syscalls saved: {saved:,} ({pct:.1f}%)")
+    finally:
+        if tmp_root:
+            shutil.rmtree(tmp_root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
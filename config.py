@@ -32,6 +32,14 @@ EXCLUDED_DIRS = {
     'var', 'tmp', 'etc', 'opt', 'root'
 }
 
+# Extra user exclusions, same syntax as EXCLUDED_DIRS (case-insensitive):
+#   'name'              directory name anywhere (e.g. 'node_modules')
+#   'parent\\name'      trailing path components (e.g. 'windows\\temp')
+#   'D:\\Backups'       absolute path: that folder and everything below it
+#   '*.photoslibrary'   glob on the folder name ('*/cache/*' = glob on the full path)
+#   're:pattern'        regular expression searched in the full path ('/' separators)
+EXCLUDED_PATTERNS = []
+
 # Excluded FILES for safety (system-critical files)
 # These files will NEVER be shown in results to prevent accidental deletion
 EXCLUDED_FILES = {
@@ -106,19 +114,72 @@ AUTO_EXCLUDE_USERS_APPDATA = True  # Exclude Users\*\AppData automatically
 
 # File scanning settings
 CHUNK_SIZE = 65536  # 64KB - Faster disk I/O (was 8KB)
+HASH_USE_MMAP = False  # Memory-map large files for full hashing instead of read loops
+MMAP_MIN_SIZE = 64 * 1024 * 1024  # 64MB - Smallest file hashed through mmap when enabled
 MAX_FILE_SIZE = 10 * 1024 * 1024 * 1024  # 10GB max file size to process
 MIN_FILE_SIZE = 1  # 1 byte minimum
 
+# Directory traversal settings
+SCAN_WORKERS = 1  # Directory-listing threads per scan (1 = sequential walker, deterministic order;
+                 # more threads list faster but yield files in a different order each run)
+SCAN_QUEUE_SIZE = 256  # Max directory batches buffered between walker threads and consumer
+PROGRESS_INTERVAL = 0.25  # Seconds between progress updates (coalesced, independent of file rate)
+ASYNC_MAX_ROOTS = 2  # Roots walked concurrently by FileScanner.ascan()
+ASYNC_QUEUE_SIZE = 64  # Batches buffered for async consumers before walkers pause (backpressure)
+ASYNC_BATCH_SIZE = 256  # Files per batch handed to the event loop
+SHARDED_SCAN = False  # Scan roots on different disks/network shares in parallel processes (one per device)
+SHARD_PROCESSES = 4  # Max device worker processes running at once
+SHARD_QUEUE_SIZE = 64  # Batches buffered from device workers before they pause (backpressure)
+SHARD_BATCH_SIZE = 1024  # Files per batch sent from a device worker
+SCAN_STATS_SLOWEST = 20  # Slowest directories kept in FileScanner.stats (see ScanStats)
+FOLLOW_SYMLINKS = False  # Descend into symlinked folders (each target once, never back into a scan root)
+ONE_FILESYSTEM = False  # Stay on each root's filesystem (like find -xdev): other mounts are skipped
+# Mount types (from /proc/self/mounts) that are never scanned: kernel/virtual filesystems
+PSEUDO_FILESYSTEMS = {
+    'proc', 'sysfs', 'devtmpfs', 'devpts', 'cgroup', 'cgroup2', 'securityfs',
+    'debugfs', 'tracefs', 'pstore', 'bpf', 'mqueue', 'hugetlbfs', 'configfs',
+    'fusectl', 'binfmt_misc', 'autofs', 'efivarfs', 'selinuxfs', 'rpc_pipefs', 'nsfs'
+}
+# Replay directories whose mtime is unchanged from directory_index.db (next to hash_cache.db)
+# instead of listing and stat-ing their files again. Opt-in: in-place edits don't change
+# the directory mtime, so sizes of edited files stay stale until the directory changes,
+# and size grouping for duplicates would compare the wrong files
+USE_DIRECTORY_INDEX = False
+# Negative cache, kept in directory_index.db even without USE_DIRECTORY_INDEX: directories
+# that failed with permission denied or were empty are skipped until their mtime or ctime
+# changes (chmod moves the ctime)
+NEGATIVE_CACHE = True
+# True lists the permission-denied directories again on every scan
+RETRY_DENIED_DIRS = False
+# Live updates (Linux inotify): after a scan, watch the scanned directories and apply
+# creates, deletes, edits and renames to the shown results instead of rescanning
+LIVE_UPDATES = False
+WATCH_BATCH_DELAY = 0.2  # Seconds to let a burst of changes (unzip, copy) collect into one update
+
 # GUI settings
 WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 700
 PREVIEW_IMAGE_SIZE = (200, 200)
 
 # Hash algorithm
-HASH_ALGORITHM = 'xxh64'  # Ultra-fast hash for duplicate detection (25x faster than MD5)
+# 'auto' = fastest collision-safe backend on this CPU, measured once per run;
+# or xxh3_128, blake2b, sha256, blake3 (if installed), xxh3_64, xxh64
+HASH_ALGORITHM = 'auto'
+HASH_BENCHMARK_SIZE = 4 * 1024 * 1024  # 4MB - Bytes hashed per backend by the 'auto' benchmark
 
 # Small file optimization
-SMALL_FILE_THRESHOLD = 1024 * 1024  # 1MB - Files smaller than this skip full hash
+SMALL_FILE_THRESHOLD = 1024 * 1024  # 1MB - Files smaller than this are hashed with one read
+SMALL_FILE_BATCH = 64  # Small files verified per worker task
+
+# Progressive partial hashing: prefix lengths hashed between the quick hash and
+# the full hash. Each tier only reads groups that still collide ([] = off)
+PARTIAL_HASH_TIERS = [4 * 1024, 64 * 1024, 1024 * 1024, 16 * 1024 * 1024]
+
+# Small groups are byte-compared in lockstep instead of fully hashed: stops at
+# the first differing chunk and is exact
+BYTE_COMPARE_MAX_GROUP = 3  # Largest group compared directly (0 = always hash)
+COMPARE_CHUNK_SIZE = 1024 * 1024  # 1MB - Bytes compared per file per step
+COMPARE_MAX_OPEN_FILES = 16  # Files held open by all comparisons together
 
 # File extensions for preview
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.tiff', '.webp'}
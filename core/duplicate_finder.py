@@ -2,34 +2,54 @@
 Duplicate file finder module
 """
 
-import os
-from collections import defaultdict
-from typing import Dict, List, Callable, Optional
+import asyncio
+import threading
+from collections import Counter, defaultdict
+from typing import AsyncIterator, Dict, List, Callable, Optional, Tuple, Union
 
 import config
+from core.query_engine import QueryEngine, SizeBucketQuery
+from utils.async_bridge import AsyncChannel
+from utils.byte_compare import compare_files, max_open_files
+from utils.file_record import FileRecord
 from utils.file_scanner import FileScanner
+from utils.hash_backends import digest_algorithm, resolve_algorithm, tag_digest
 from utils.hash_calculator import HashCalculator
 from utils.hash_cache import HashCache
+from utils.progress import ProgressChannel
 
 
 class DuplicateFinder:
     """Find duplicate files based on content hash"""
     
-    def __init__(self, progress_callback: Optional[Callable] = None, enable_cache: bool = True):
+    def __init__(self, progress_callback: Optional[Union[Callable, ProgressChannel]] = None,
+                 enable_cache: bool = True):
         """
         Initialize duplicate finder
         
         Args:
-            progress_callback: Optional callback for progress updates
+            progress_callback: ProgressChannel shared by the scan and hash phases,
+                               or a legacy callback(files_count, current_file)
+                               for the scan phase
             enable_cache: Enable persistent hash caching (default: True)
         """
         self.scanner = FileScanner(progress_callback)
+        self.progress = self.scanner.progress
         self.hash_calculator = HashCalculator()
         self.cancelled = False
         
         # Initialize hash cache
         self.cache_enabled = enable_cache
         self.cache = HashCache() if enable_cache else None
+        
+        # Hardlink sets found by the last scan: first path -> all paths of that inode
+        self.hardlink_sets = {}
+        # Size buckets of the last find_duplicates() scan (kept for live updates)
+        self.size_buckets: Optional[SizeBucketQuery] = None
+        # Per-tier elimination stats of the last search, see _tier_stat()
+        self.tier_stats: List[dict] = []
+        # Full-hash algorithm of the last search (config.HASH_ALGORITHM resolved)
+        self.hash_algorithm: Optional[str] = None
     
     def cancel(self):
         """Cancel the current operation"""
@@ -39,76 +59,214 @@ class DuplicateFinder:
     
     def find_duplicates(self, directories: List[str], 
                        min_size: int = 0,
-                       hash_progress_callback=None) -> Dict[str, List[dict]]:
+                       hash_progress_callback=None,
+                       compare_max_group: Optional[int] = None) -> Dict[str, List[FileRecord]]:
         """
         Find duplicate files in given directories
         
         Args:
             directories: List of directory paths to scan
             min_size: Minimum file size to consider (in bytes)
-            hash_progress_callback: Optional callback(phase, current, total, message)
+            hash_progress_callback: Optional callback(phase, current, total, message),
+                                    called at most every config.PROGRESS_INTERVAL
+                                    (new code can read self.progress instead)
+            compare_max_group: Candidate groups of up to this many files are
+                               byte-compared in lockstep instead of fully hashed
+                               (None = config.BYTE_COMPARE_MAX_GROUP, 0 = off)
             
         Returns:
-            Dictionary mapping hash to list of duplicate file info
+            Dictionary mapping hash to list of duplicate FileRecords
         """
-        # Step 1: Group files by size (quick pre-filter)
-        size_groups = defaultdict(list)
+        hash_listener = None
+        if hash_progress_callback is not None:
+            def hash_listener(event):
+                if event.phase != 'scan':
+                    hash_progress_callback(event.phase, event.files, event.total, event.current)
+            self.progress.add_listener(hash_listener)
         
-        for directory in directories:
-            if self.cancelled:
-                break
-            
-            for filepath in self.scanner.scan_directory(directory, min_size=min_size):
-                if self.cancelled:
+        try:
+            return self._find_duplicates(directories, min_size,
+                                         compare_max_group=compare_max_group)
+        finally:
+            if hash_listener is not None:
+                self.progress.remove_listener(hash_listener)
+    
+    async def afind_duplicates(self, directories: List[str],
+                               min_size: int = 0,
+                               queue_size: Optional[int] = None,
+                               compare_max_group: Optional[int] = None) -> AsyncIterator[Tuple[str, List[FileRecord]]]:
+        """
+        Async version of find_duplicates(): groups arrive as soon as they are final
+        
+        A group is final once every same-size candidate has been fully hashed,
+        so the first groups are yielded while larger files are still hashing.
+        The search runs on a worker thread; a bounded queue pauses it when the
+        consumer falls behind. Cancelling the consuming task or breaking out of
+        the loop cancels the search.
+        
+        Args:
+            directories: List of directory paths to scan
+            min_size: Minimum file size to consider (in bytes)
+            queue_size: Groups buffered for the consumer (None = config.ASYNC_QUEUE_SIZE)
+            compare_max_group: Same as in find_duplicates()
+        
+        Yields:
+            Tuple of (hash, list of duplicate FileRecords); progress is in self.progress
+        """
+        loop = asyncio.get_running_loop()
+        channel = AsyncChannel(loop, queue_size)
+        done_marker = object()
+        self.cancelled = False
+        
+        def emit_group(hash_val, files):
+            if not channel.put((hash_val, files)):
+                self.cancel()
+        
+        def run():
+            try:
+                self._find_duplicates(directories, min_size, group_callback=emit_group,
+                                      compare_max_group=compare_max_group)
+            except Exception as e:
+                channel.put(e)
+            finally:
+                channel.put(done_marker)
+        
+        worker = loop.run_in_executor(None, run)
+        finished = False
+        try:
+            while True:
+                item = await channel.get()
+                if item is done_marker:
+                    finished = True
                     break
-                
-                try:
-                    file_size = os.path.getsize(filepath)
-                    size_groups[file_size].append(filepath)
-                except OSError:
-                    continue
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            channel.close()
+            if not finished:
+                self.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+    
+    def _find_duplicates(self, directories: List[str], min_size: int,
+                         group_callback: Optional[Callable] = None,
+                         compare_max_group: Optional[int] = None) -> Dict[str, List[FileRecord]]:
+        """
+        find_duplicates() body; progress goes to self.progress
+        
+        group_callback(hash, files), if given, is called from this thread with
+        each duplicate group as soon as all files of its size are hashed.
+        """
+        # Step 1: Group files by size (quick pre-filter)
+        # scan_roots_entries collapses overlapping roots and walks each directory
+        # once, so a file can't show up as a "duplicate" of itself
+        engine = QueryEngine(self.scanner)
+        buckets = engine.add(SizeBucketQuery(min_size))
+        engine.run(directories)
+        self.size_buckets = buckets
+        return self._find_duplicates_in(buckets, group_callback, compare_max_group)
+    
+    def find_duplicates_in(self, buckets: SizeBucketQuery,
+                           hash_progress_callback=None,
+                           compare_max_group: Optional[int] = None) -> Dict[str, List[FileRecord]]:
+        """
+        Find duplicates among size buckets collected by a shared QueryEngine run
+        
+        Lets a duplicate search share one traversal with other queries:
+        add a SizeBucketQuery to the engine, run it, then pass it here.
+        
+        Args:
+            buckets: SizeBucketQuery fed by a QueryEngine run with this finder's scanner
+            hash_progress_callback: Same as in find_duplicates()
+            compare_max_group: Same as in find_duplicates()
+        
+        Returns:
+            Dictionary mapping hash to list of duplicate FileRecords
+        """
+        hash_listener = None
+        if hash_progress_callback is not None:
+            def hash_listener(event):
+                if event.phase != 'scan':
+                    hash_progress_callback(event.phase, event.files, event.total, event.current)
+            self.progress.add_listener(hash_listener)
+        
+        try:
+            return self._find_duplicates_in(buckets, compare_max_group=compare_max_group)
+        finally:
+            if hash_listener is not None:
+                self.progress.remove_listener(hash_listener)
+    
+    def _find_duplicates_in(self, buckets: SizeBucketQuery,
+                            group_callback: Optional[Callable] = None,
+                            compare_max_group: Optional[int] = None) -> Dict[str, List[FileRecord]]:
+        """Hash phases of find_duplicates() over already collected size buckets"""
+        if compare_max_group is None:
+            compare_max_group = getattr(config, 'BYTE_COMPARE_MAX_GROUP', 0)
+        compare_max_group = min(compare_max_group, max_open_files())
+        progress = self.progress
+        # Groups hold (dir_id, name) entries into the scanner's shared directory
+        # table; full paths are only rebuilt when a file is actually hashed
+        dir_table = self.scanner.directories
+        size_groups = buckets.size_groups
+        inode_entries = buckets.inode_entries
+        link_counts = buckets.link_counts
+        
+        # Hardlink sets are rare: keep them as plain paths for the GUI
+        self.hardlink_sets = {
+            dir_table.join(*entries[0]): [dir_table.join(*e) for e in entries]
+            for entries in inode_entries.values() if len(entries) > 1
+        }
         
         # Step 2: For files with same size, calculate quick hash (MULTI-THREADED)
         from concurrent.futures import ThreadPoolExecutor, as_completed
-        import threading
         
         quick_hash_groups = defaultdict(list)
         quick_hash_lock = threading.Lock()
+        full_cached = set()  # Entries whose full hash is already cached
+        self.tier_stats = []
+        # Digests are recorded as 'algorithm:hex', so cached hashes of another
+        # algorithm are never mistaken for a match
+        algorithm = self._resolve_algorithm()
+        self.hash_algorithm = algorithm
+        quick_bytes = 0
         
         # Collect files that need quick hashing (size >= 2 files)
         files_to_quick_hash = []
-        for size, filepaths in size_groups.items():
-            if len(filepaths) >= 2:
-                for fp in filepaths:
-                    files_to_quick_hash.append((size, fp))
+        for size, entries in size_groups.items():
+            if len(entries) >= 2:
+                for entry in entries:
+                    files_to_quick_hash.append((size, entry))
         
-        total_quick_hash = len(files_to_quick_hash)
-        processed_quick = [0]  # Use list for mutable in closure
-        processed_lock = threading.Lock()
+        progress.start('quick_hash', total=len(files_to_quick_hash))
         
-        def process_quick_hash(size_filepath):
+        def process_quick_hash(size_entry):
             """Process single file for quick hash - thread worker"""
-            size, filepath = size_filepath
+            size, entry = size_entry
             if self.cancelled:
                 return None
             
+            filepath = dir_table.join(*entry)
             quick_hash = None
+            hit_full_cache = False
+            bytes_read = 0
             
             # Try cache first
             if self.cache_enabled and self.cache:
                 cached = self.cache.get_cached_hash(filepath)
                 if cached:
-                    quick_hash, _ = cached
+                    quick_hash, full_hash = cached
+                    hit_full_cache = self._is_full_hash(cached, algorithm)
             
             # Calculate if not in cache
             if not quick_hash:
                 quick_hash = self.hash_calculator.calculate_quick_hash(filepath)
+                bytes_read = min(size, 2 * 1024)  # First and last 1KB
                 
                 # Update cache (thread-safe via db_lock in HashCache)
                 if quick_hash and self.cache_enabled and self.cache:
                     self.cache.update_cache(filepath, quick_hash, None)
             
-            return (size, quick_hash, filepath) if quick_hash else None
+            return (size, quick_hash, entry, hit_full_cache, bytes_read) if quick_hash else None
         
         # Use 8 workers for quick hash (I/O bound - more threads = better)
         max_workers = min(8, len(files_to_quick_hash) or 1)
@@ -125,66 +283,112 @@ class DuplicateFinder:
                 try:
                     result = future.result()
                     if result:
-                        size, quick_hash, filepath = result
+                        size, quick_hash, entry, is_cached, bytes_read = result
                         
                         # Thread-safe append
                         with quick_hash_lock:
-                            quick_hash_groups[(size, quick_hash)].append(filepath)
+                            quick_hash_groups[(size, quick_hash)].append(entry)
+                        if is_cached:
+                            full_cached.add(entry)
+                        quick_bytes += bytes_read
                         
-                        # Thread-safe progress update
-                        with processed_lock:
-                            processed_quick[0] += 1
-                            if hash_progress_callback and processed_quick[0] % 100 == 0:
-                                hash_progress_callback("quick_hash", processed_quick[0], 
-                                                      total_quick_hash, os.path.basename(filepath))
+                        # Results are collected on this thread only
+                        progress.advance(1, size, entry[1])
                 except Exception:
                     continue
         
+        progress.flush()
+        
         # Flush quick hash cache updates
         if self.cache_enabled and self.cache:
             self.cache.flush()
         
-        # Step 3: For files with same quick hash, calculate full hash (MULTI-THREADED)
+        # Groups are keyed (size, quick hash, partial hashes...) from here on
+        candidates = {key: entries for key, entries in quick_hash_groups.items() if len(entries) >= 2}
+        self.tier_stats.append(self._tier_stat('quick', None, len(files_to_quick_hash), candidates, quick_bytes))
+        
+        # Step 3: Progressive partial hashes (MULTI-THREADED)
+        candidates = self._hash_partial_tiers(candidates, full_cached)
+        
+        # Step 4: For files with same partial hashes, calculate full hash or
+        # byte-compare small groups directly (MULTI-THREADED)
         full_hash_groups = defaultdict(list)
         full_hash_groups_lock = threading.Lock()  # Thread-safe access
         
-        # Count files that need full hashing
+        # Work items: (size, quick hash, entries, byte-compare). Large files are
+        # hashed one per item, small files (one read each) in batches
         files_to_full_hash = []
-        for (size, quick_hash), filepaths in quick_hash_groups.items():
-            if len(filepaths) >= 2:
-                files_to_full_hash.extend([(size, quick_hash, fp) for fp in filepaths])
+        small_batch = max(1, getattr(config, 'SMALL_FILE_BATCH', 64))
+        for key, entries in candidates.items():
+            size, quick_hash = key[0], key[1]
+            if size < config.SMALL_FILE_THRESHOLD:
+                files_to_full_hash.extend(
+                    (size, quick_hash, entries[i:i + small_batch], False)
+                    for i in range(0, len(entries), small_batch)
+                )
+            elif (len(entries) <= compare_max_group
+                    and not all(entry in full_cached for entry in entries)):
+                files_to_full_hash.append((size, quick_hash, entries, True))
+            else:
+                files_to_full_hash.extend([(size, quick_hash, [entry], False) for entry in entries])
+        file_count = sum(len(item[2]) for item in files_to_full_hash)
         
-        total_full_hash = len(files_to_full_hash)
-        processed_full = 0
-        processed_lock = threading.Lock()
+        # Hash size buckets one after another (smallest first) so each bucket's
+        # groups become final early and can be reported while the rest is hashed
+        files_to_full_hash.sort(key=lambda item: item[0])
+        pending_per_size = Counter()
+        for size, _, entries, _ in files_to_full_hash:
+            pending_per_size[size] += len(entries)
+        hashes_per_size = defaultdict(set)
         
-        def process_file(size, quick_hash, filepath):
-            """Process single file - thread worker function"""
+        def mark_hardlinks(files):
+            """Each entry is one inode, other links listed separately"""
+            for file_info in files:
+                file_info['nlink'] = link_counts.get((file_info.dir_id, file_info.filename), 1)
+                if file_info['nlink'] > 1:
+                    path = file_info['path']
+                    file_info['hardlinks'] = self.hardlink_sets.get(path, [path])[1:]
+                else:
+                    file_info['hardlinks'] = []
+        
+        progress.start('full_hash', total=file_count)
+        
+        def process_file(size, quick_hash, entries, byte_compare):
+            """Process one file, a batch of small files or a compared group
+            - thread worker function
+            
+            Returns ([(hash, file_info)], bytes read) or None"""
             if self.cancelled:
                 return None
             
-            # Optimization: Skip full hash for small files (quick hash is sufficient)
+            if byte_compare:
+                return compare_group(quick_hash, entries)
+            
+            # Small files are read whole with a single pread
             if size < config.SMALL_FILE_THRESHOLD:
-                # For small files, use quick_hash as the "full" hash
-                file_info = self.scanner.get_file_info(filepath)
-                file_info['hash'] = quick_hash  # Reuse quick hash
-                
-                # Update cache (small files don't need full hash)
-                if self.cache_enabled and self.cache:
-                    self.cache.update_cache(filepath, quick_hash, quick_hash)
-                
-                return (quick_hash, file_info, False)  # False = skipped full hash
+                hash_file = lambda path: self.hash_calculator.calculate_small_file_hash(path, size, algorithm)
             else:
+                hash_file = lambda path: self.hash_calculator.calculate_file_hash(path, algorithm)
+            
+            results = []
+            bytes_read = 0
+            for entry in entries:
+                if self.cancelled:
+                    break
+                filepath = dir_table.join(*entry)
+                
                 # Check cache for full hash first
                 full_hash = None
                 if self.cache_enabled and self.cache:
                     cached = self.cache.get_cached_hash(filepath)
-                    if cached and cached[1]:  # cached[1] is full_hash
+                    if self._is_full_hash(cached, algorithm):
                         full_hash = cached[1]
                 
                 # Calculate full hash if not in cache
                 if not full_hash:
-                    full_hash = self.hash_calculator.calculate_file_hash(filepath)
+                    digest = hash_file(filepath)
+                    full_hash = tag_digest(algorithm, digest) if digest else None
+                    bytes_read += size
                     
                     # Update cache with full hash
                     if full_hash and self.cache_enabled and self.cache:
@@ -193,17 +397,34 @@ class DuplicateFinder:
                 if full_hash:
                     file_info = self.scanner.get_file_info(filepath)
                     file_info['hash'] = full_hash
-                    return (full_hash, file_info, True)  # True = calculated full hash
-            return None
+                    results.append((full_hash, file_info))
+            return (results, bytes_read)
+        
+        def compare_group(quick_hash, entries):
+            """Byte-compare a small group in lockstep; identical sets get the
+            full hash their files would have had"""
+            paths = [dir_table.join(*entry) for entry in entries]
+            identical, bytes_read = compare_files(paths, algorithm)
+            results = []
+            for digest, indices in identical:
+                full_hash = tag_digest(algorithm, digest)
+                for index in indices:
+                    if self.cache_enabled and self.cache:
+                        self.cache.update_cache(paths[index], quick_hash, full_hash)
+                    file_info = self.scanner.get_file_info(paths[index])
+                    file_info['hash'] = full_hash
+                    results.append((full_hash, file_info))
+            return (results, bytes_read)
         
         # Use ThreadPoolExecutor for parallel processing (4 workers)
         max_workers = min(4, len(files_to_full_hash) or 1)
+        full_bytes = 0
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submit all tasks
             futures = {
-                executor.submit(process_file, size, qh, fp): (size, qh, fp)
-                for size, qh, fp in files_to_full_hash
+                executor.submit(process_file, *item): item
+                for item in files_to_full_hash
             }
             
             # Process completed futures
@@ -213,42 +434,203 @@ class DuplicateFinder:
                     executor.shutdown(wait=False, cancel_futures=True)
                     break
                 
+                size, _, entries, _ = futures[future]
                 try:
                     result = future.result()
                     if result:
-                        hash_val, file_info, was_full_hash = result
+                        hashed, bytes_read = result
+                        full_bytes += bytes_read
                         
                         # Thread-safe append
                         with full_hash_groups_lock:
-                            full_hash_groups[hash_val].append(file_info)
-                        
-                        # Thread-safe progress update
-                        with processed_lock:
-                            processed_full += 1
-                            
-                            if hash_progress_callback and processed_full % 10 == 0:
-                                phase_name = "full_hash" if was_full_hash else "small_file"
-                                hash_progress_callback(phase_name, processed_full, total_full_hash,
-                                                      os.path.basename(file_info['path']))
+                            for hash_val, file_info in hashed:
+                                full_hash_groups[hash_val].append(file_info)
+                                hashes_per_size[size].add(hash_val)
+                    
+                    progress.advance(len(entries), size * len(entries), entries[-1][1])
                 
                 except Exception as e:
                     # Handle any errors in thread
                     print(f"Error processing file: {e}")
-                    continue
+                
+                # Last file of this size done: its groups can't change any more
+                pending_per_size[size] -= len(entries)
+                if group_callback and pending_per_size[size] == 0:
+                    for hash_val in hashes_per_size.pop(size, ()):
+                        files = full_hash_groups[hash_val]
+                        if len(files) > 1:
+                            mark_hardlinks(files)
+                            group_callback(hash_val, files)
+        
+        progress.flush()
         
         # Flush cache to disk (batch commit)
         if self.cache_enabled and self.cache:
             self.cache.flush()
         
-        # Step 4: Filter out groups with only one file
+        # Step 5: Filter out groups with only one file
         duplicates = {
             hash_val: files 
             for hash_val, files in full_hash_groups.items() 
             if len(files) > 1
         }
+        self.tier_stats.append(self._tier_stat('full', None, file_count, duplicates, full_bytes))
+        
+        # Mark hardlink sets: each entry is one inode, other links listed separately
+        for files in duplicates.values():
+            mark_hardlinks(files)
         
         return duplicates
     
+    def _hash_partial_tiers(self, candidates: Dict[tuple, list], full_cached: set) -> Dict[tuple, list]:
+        """
+        Narrow colliding groups with growing prefix hashes (config.PARTIAL_HASH_TIERS)
+        
+        Each tier hashes only the range since the previous tier: every file of a
+        group already agrees up to there. Groups of files no longer than a tier,
+        below SMALL_FILE_THRESHOLD, or whose full hashes are all cached go
+        straight to the full hash.
+        
+        Args:
+            candidates: (size, quick hash, ...) -> entries, every group of 2+ files
+            full_cached: Entries whose full hash is cached
+        
+        Returns:
+            Groups still colliding after the last tier, keys extended by one
+            hash per tier they went through
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        
+        progress = self.progress
+        dir_table = self.scanner.directories
+        start = 0
+        
+        for end in sorted(getattr(config, 'PARTIAL_HASH_TIERS', [])):
+            if self.cancelled:
+                break
+            
+            tier_keys = [
+                key for key, entries in candidates.items()
+                if key[0] > end and key[0] >= config.SMALL_FILE_THRESHOLD
+                and not all(entry in full_cached for entry in entries)
+            ]
+            work = [(key, entry) for key in tier_keys for entry in candidates[key]]
+            if not work:
+                start = end
+                continue
+            
+            progress.start('partial_hash', total=len(work))
+            tier_groups = defaultdict(list)
+            tier_start = start
+            tier_bytes = 0
+            
+            def process_range(key_entry):
+                """Hash one file's next range - thread worker"""
+                key, entry = key_entry
+                if self.cancelled:
+                    return None
+                digest = self.hash_calculator.calculate_range_hash(
+                    dir_table.join(*entry), tier_start, end)
+                return (key + (digest,), entry) if digest else None
+            
+            # Short reads like the quick hash: 8 workers
+            with ThreadPoolExecutor(max_workers=min(8, len(work))) as executor:
+                futures = [executor.submit(process_range, item) for item in work]
+                for future in as_completed(futures):
+                    if self.cancelled:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+                    try:
+                        result = future.result()
+                    except Exception:
+                        continue
+                    if result:
+                        key, entry = result
+                        tier_groups[key].append(entry)
+                        tier_bytes += end - tier_start
+                        progress.advance(1, end - tier_start, entry[1])
+            
+            progress.flush()
+            
+            for key in tier_keys:
+                del candidates[key]
+            survivors = {key: entries for key, entries in tier_groups.items() if len(entries) >= 2}
+            candidates.update(survivors)
+            self.tier_stats.append(self._tier_stat('partial', end, len(work), survivors, tier_bytes))
+            start = end
+        
+        return candidates
+    
+    def _resolve_algorithm(self) -> str:
+        """
+        config.HASH_ALGORITHM resolved to an algorithm id
+        
+        The backend 'auto' picks is stored with the hash cache and reused for
+        as long as HASH_ALGORITHM stays the same, so cached full hashes are
+        not discarded because another run benchmarked differently.
+        """
+        name = getattr(config, 'HASH_ALGORITHM', 'auto')
+        if self.cache is None:
+            return resolve_algorithm(name)
+        
+        previous = None
+        if self.cache.get_meta('hash_algorithm') == name:
+            previous = self.cache.get_meta('hash_algorithm_resolved')
+        algorithm = resolve_algorithm(name, previous)
+        if algorithm != previous:
+            self.cache.set_meta('hash_algorithm', name)
+            self.cache.set_meta('hash_algorithm_resolved', algorithm)
+        return algorithm
+    
+    @staticmethod
+    def _is_full_hash(cached: Optional[Tuple[str, str]], algorithm: str) -> bool:
+        """A cache entry holds a full-file hash made with algorithm
+        
+        Untagged entries (older versions, including small files cached with
+        their quick hash as full hash) are hashed again.
+        """
+        return bool(cached and digest_algorithm(cached[1]) == algorithm)
+    
+    @staticmethod
+    def _tier_stat(tier: str, prefix: Optional[int], files: int, groups: dict,
+                   bytes_read: int) -> dict:
+        """
+        One entry of tier_stats
+        
+        Keys: tier ('quick', 'partial' or 'full'), prefix (bytes compared by a
+        partial tier, else None), files (hashed in this tier), groups (still
+        colliding after it), eliminated (files rejected by it) and bytes_read
+        (read from disk, cache hits excluded).
+        """
+        remaining = sum(len(entries) for entries in groups.values())
+        return {
+            'tier': tier,
+            'prefix': prefix,
+            'files': files,
+            'groups': len(groups),
+            'eliminated': files - remaining,
+            'bytes_read': bytes_read,
+        }
+    
+    @staticmethod
+    def reclaimable_size(duplicate_group: List[FileRecord]) -> int:
+        """
+        Bytes freed by deleting every file of a group except the first
+        
+        A file with other hardlinks (inside or outside the scanned folders) keeps
+        its data alive when one path is deleted, so it doesn't count.
+        
+        Args:
+            duplicate_group: List of duplicate FileRecords
+            
+        Returns:
+            Reclaimable size in bytes
+        """
+        return sum(
+            f['size'] for f in duplicate_group[1:]
+            if f.get('nlink', 1) <= 1
+        )
+    
     def select_files_to_keep(self, duplicate_group: List[dict], 
                             strategy: str = 'newest') -> List[str]:
         """
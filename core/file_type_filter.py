@@ -3,8 +3,11 @@ File type filter module
 """
 
 import os
-from typing import List, Dict, Set, Callable, Optional
+from typing import List, Dict, Set, Callable, Optional, Union
+from core.query_engine import FilterQuery, QueryEngine
+from utils.file_record import FileRecord
 from utils.file_scanner import FileScanner
+from utils.result_store import ColumnarResults
 
 
 class FileTypeFilter:
@@ -64,54 +67,65 @@ class FileTypeFilter:
         self.scanner.cancel()
     
     def find_files_by_types(self, directories: List[str],
-                           selected_groups: Set[str]) -> List[dict]:
+                           selected_groups: Set[str],
+                           columnar: bool = False) -> Union[List[FileRecord], ColumnarResults]:
         """
         Find files matching selected type groups
         
         Args:
             directories: List of directory paths to scan
             selected_groups: Set of group keys (e.g., {'images', 'videos'})
-            
+            columnar: Return a ColumnarResults store instead of a list
+                      (much smaller for multi-million-file results)
+        
         Returns:
-            List of file info dictionaries matching criteria
+            List of FileRecord results (or ColumnarResults) matching criteria
         """
-        # Collect all extensions from selected groups
+        if not self._target_extensions(selected_groups):
+            return ColumnarResults() if columnar else []
+        
+        # One-query engine run: entries carry the basename, so no full path
+        # string is built for files that don't match
+        engine = QueryEngine(self.scanner)
+        query = engine.add(self.type_query(selected_groups, columnar))
+        engine.run(directories)
+        return query.results
+    
+    @classmethod
+    def _target_extensions(cls, selected_groups: Set[str]) -> Set[str]:
+        """Collect all extensions from selected groups"""
         target_extensions = set()
         for group_key in selected_groups:
-            if group_key in self.FILE_TYPE_GROUPS:
+            if group_key in cls.FILE_TYPE_GROUPS:
                 target_extensions.update(
-                    self.FILE_TYPE_GROUPS[group_key]['extensions']
+                    cls.FILE_TYPE_GROUPS[group_key]['extensions']
                 )
+        return target_extensions
+    
+    @classmethod
+    def type_query(cls, selected_groups: Set[str], columnar: bool = False) -> FilterQuery:
+        """
+        Build the query behind find_files_by_types(), to run in a shared
+        QueryEngine pass together with other queries
         
-        if not target_extensions:
-            return []
+        Returns:
+            FilterQuery; matching files (with their group) are in query.results after the run
+        """
+        target_extensions = cls._target_extensions(selected_groups)
         
-        # Scan and collect matching files (use optimized method with cached stat)
-        matched_files = []
+        def match(name, stat):
+            # Get extension directly from the basename
+            return os.path.splitext(name)[1].lower() in target_extensions
         
-        for directory in directories:
-            if self.cancelled:
-                break
-            
-            # Use scan_directory_with_stat to avoid double os.stat() call
-            for filepath, stat in self.scanner.scan_directory_with_stat(directory):
-                if self.cancelled:
-                    break
-                
-                # Get extension directly (faster than full get_file_info for filtering)
-                extension = os.path.splitext(filepath)[1].lower()
-                
-                if extension in target_extensions:
-                    # Only get full file_info for matching files
-                    file_info = self.scanner.get_file_info(filepath, cached_stat=stat)
-                    file_info['group'] = self._get_group_for_extension(extension)
-                    matched_files.append(file_info)
+        def group(name):
+            return cls._get_group_for_extension(os.path.splitext(name)[1].lower())
         
-        return matched_files
+        return FilterQuery(match, group=group, columnar=columnar)
     
-    def _get_group_for_extension(self, extension: str) -> str:
+    @classmethod
+    def _get_group_for_extension(cls, extension: str) -> str:
         """Get group name for an extension"""
-        for group_key, group_data in self.FILE_TYPE_GROUPS.items():
+        for group_key, group_data in cls.FILE_TYPE_GROUPS.items():
             if extension in group_data['extensions']:
                 return group_data['name']
         return '❓ Khác'
@@ -123,7 +137,7 @@ class FileTypeFilter:
         
         Args:
             group_key: Group key (e.g., 'images')
-            
+        
         Returns:
             Dictionary with name and extension count
         """
@@ -0,0 +1,392 @@
+"""
+Live result updates: apply filesystem changes to scan results without rescanning
+"""
+
+import os
+import stat as stat_module
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from core.query_engine import FilterQuery, SizeBucketQuery
+from utils.file_record import FileRecord
+from utils.file_scanner import FileScanner
+from utils.hash_cache import HashCache
+from utils.inotify import InotifyWatcher, WatchEvent
+from utils.mounts import MountTable
+from utils.result_store import HAS_NUMPY, ColumnarResults, np
+
+
+class Changes:
+    """One batch of file changes, in scanner entry terms
+    
+    Views apply removals first, then additions: a rewritten or replaced file
+    is both removed and added, so it simply takes its new size and times.
+    """
+    
+    __slots__ = ('removed', 'removed_dirs', 'added')
+    
+    def __init__(self):
+        self.removed: Set[Tuple[int, str]] = set()  # (dir_id, name) of files gone or changed
+        self.removed_dirs: Set[int] = set()  # dir_ids whose files are all gone
+        self.added: Dict[Tuple[int, str], os.stat_result] = {}  # (dir_id, name) -> current stat
+    
+    def __bool__(self):
+        return bool(self.removed or self.removed_dirs or self.added)
+    
+    def is_removed(self, dir_id: int, name: str) -> bool:
+        return dir_id in self.removed_dirs or (dir_id, name) in self.removed
+
+
+class FilterView:
+    """FilterQuery results kept current by a LiveIndex
+    
+    Every batch builds a new result set (copy-on-write) and swaps it in, so
+    the GUI thread can keep using the one it holds; it checks version to
+    notice a new one.
+    """
+    
+    def __init__(self, query: FilterQuery, results=None):
+        """
+        Initialize filter view
+        
+        Args:
+            query: Query the results came from (its match, size range and group)
+            results: Current results (None = query.results)
+        """
+        self.query = query
+        if results is not None:
+            query.results = results
+        self.results = query.results
+        self.version = 0
+        self.lock = threading.Lock()
+    
+    def apply(self, changes: Changes):
+        results = self.results
+        before = len(results)
+        if changes.removed or changes.removed_dirs:
+            results = self._without(results, changes)
+        elif isinstance(results, ColumnarResults):
+            results = results.take(range(len(results)))
+        else:
+            results = list(results)
+        removed = before - len(results)
+        
+        query = self.query
+        query.results = results
+        start = len(results)
+        for (dir_id, name), stat in changes.added.items():
+            size = stat.st_size
+            if size < query.min_size or (query.max_size is not None and size > query.max_size):
+                continue
+            query.feed(dir_id, name, stat)
+        
+        if removed or len(results) != start:
+            with self.lock:
+                self.results = results
+                self.version += 1
+    
+    @staticmethod
+    def _without(results, changes: Changes):
+        """Copy of results without the removed files"""
+        if not isinstance(results, ColumnarResults):
+            return [record for record in results
+                    if not changes.is_removed(record.dir_id, record.filename)]
+        
+        # Only rows in touched directories need their names checked
+        touched = changes.removed_dirs | {dir_id for dir_id, _ in changes.removed}
+        dir_ids = results.dir_ids
+        if HAS_NUMPY and len(dir_ids):
+            view = np.frombuffer(dir_ids, dtype=np.dtype(dir_ids.typecode))
+            rows = np.flatnonzero(np.isin(view, list(touched))).tolist()
+            del view  # Release the buffer
+            keep = np.ones(len(results), dtype=bool)
+        else:
+            rows = [row for row, dir_id in enumerate(dir_ids) if dir_id in touched]
+            keep = [True] * len(results)
+        names = results.names
+        for row in rows:
+            if changes.is_removed(dir_ids[row], names[row]):
+                keep[row] = False
+        return results.filter(keep)
+
+
+class DuplicateView:
+    """Duplicate groups kept current by a LiveIndex
+    
+    The size buckets of the scan are updated in place; only the sizes a batch
+    touched are hashed again (through the finder, so the hash cache applies)
+    and their groups replaced. Group sets are swapped in whole, like FilterView.
+    """
+    
+    def __init__(self, finder, groups: Dict[str, List[FileRecord]],
+                 buckets: Optional[SizeBucketQuery] = None):
+        """
+        Initialize duplicate view
+        
+        Args:
+            finder: DuplicateFinder that produced the groups
+            groups: Duplicate groups (hash -> FileRecords)
+            buckets: Size buckets of that scan (None = finder.size_buckets)
+        """
+        self.finder = finder
+        self.groups = groups
+        self.buckets = buckets if buckets is not None else finder.size_buckets
+        self.version = 0
+        self.lock = threading.Lock()
+        # Size of every bucketed file and hardlink path; inode of multi-link files
+        self._sizes: Dict[Tuple[int, str], int] = {}
+        self._inode_keys: Dict[Tuple[int, str], Tuple[int, int]] = {}
+        for size, entries in self.buckets.size_groups.items():
+            for entry in entries:
+                self._sizes[entry] = size
+        for key, entries in self.buckets.inode_entries.items():
+            size = self._sizes.get(entries[0])
+            for entry in entries:
+                self._inode_keys[entry] = key
+                if size is not None:
+                    self._sizes[entry] = size
+    
+    def _remove(self, entry: Tuple[int, str], affected: Set[int]):
+        size = self._sizes.pop(entry, None)
+        if size is None:
+            return
+        affected.add(size)
+        buckets = self.buckets
+        
+        key = self._inode_keys.pop(entry, None)
+        links = buckets.inode_entries.get(key) if key is not None else None
+        if links and entry in links:
+            first = links[0] == entry
+            links.remove(entry)
+            nlink = buckets.link_counts.pop(entry, None)
+            if not links:
+                del buckets.inode_entries[key]
+            if not first:
+                return  # Not in a bucket itself
+            if links:
+                # The next path of the inode takes its place in the bucket
+                successor = links[0]
+                try:
+                    nlink = os.stat(self.finder.scanner.directories.join(*successor)).st_nlink
+                except OSError:
+                    pass
+                buckets.link_counts[successor] = nlink
+                buckets.size_groups[size].append(successor)
+        
+        bucket = buckets.size_groups.get(size)
+        if bucket is not None and entry in bucket:
+            bucket.remove(entry)
+            if not bucket:
+                del buckets.size_groups[size]
+    
+    def apply(self, changes: Changes):
+        buckets = self.buckets
+        affected: Set[int] = set()
+        
+        if changes.removed_dirs:
+            removed = [entry for entry in self._sizes if entry[0] in changes.removed_dirs]
+        else:
+            removed = []
+        removed.extend(entry for entry in changes.removed if entry in self._sizes)
+        for entry in removed:
+            self._remove(entry, affected)
+        
+        for entry, stat in changes.added.items():
+            self._remove(entry, affected)
+            size = stat.st_size
+            if size < buckets.min_size:
+                continue
+            buckets.feed(entry[0], entry[1], stat)
+            self._sizes[entry] = size
+            if stat.st_nlink > 1 and stat.st_ino:
+                self._inode_keys[entry] = (stat.st_dev, stat.st_ino)
+            affected.add(size)
+        
+        if not affected:
+            return
+        
+        # Hash only the touched sizes again
+        subset = SizeBucketQuery(buckets.min_size)
+        subset.size_groups = defaultdict(list, {
+            size: list(buckets.size_groups[size]) for size in affected
+            if len(buckets.size_groups.get(size, ())) >= 2
+        })
+        subset.inode_entries = buckets.inode_entries
+        subset.link_counts = buckets.link_counts
+        found = self.finder.find_duplicates_in(subset) if subset.size_groups else {}
+        
+        groups = {hash_val: files for hash_val, files in self.groups.items()
+                  if files[0].size not in affected}
+        groups.update(found)
+        with self.lock:
+            self.groups = groups
+            self.version += 1
+
+
+class LiveIndex:
+    """Keeps scan results current by watching the scanned directories
+    
+    Start it right after a scan: changes made between the end of the scan and
+    start() are not seen. Each batch of WatchEvents becomes one Changes batch
+    (new files are stat-ed once, new directories walked with the scanner's
+    rules) that every view applies; the hash cache forgets deleted and
+    rewritten files and keeps the hashes of moved ones. After a kernel queue
+    overflow the affected directories are listed again.
+    """
+    
+    def __init__(self, roots: List[str], views: List[object],
+                 scanner: Optional[FileScanner] = None,
+                 cache: Optional[HashCache] = None):
+        """
+        Initialize live index
+        
+        Args:
+            roots: Scanned root directories
+            views: FilterView / DuplicateView objects (anything with apply(changes))
+            scanner: Scanner whose exclusions apply (None = a new default scanner)
+            cache: Hash cache to keep in step with the files (optional)
+        """
+        self.roots, _ = FileScanner.normalize_roots(roots)
+        self.views = list(views)
+        # Own sequential scanner: listing is done on the watcher thread
+        self.scanner = FileScanner(workers=1, use_index=False,
+                                   exclusions=scanner.exclusions if scanner is not None else None,
+                                   sharded=False)
+        # Changes are interned where the shown results are
+        if scanner is not None:
+            self.scanner.directories = scanner.directories
+        self.directories = self.scanner.directories
+        for view in self.views:
+            # Queries built for a view (never run) feed records into the same table
+            query = getattr(view, 'query', None)
+            if query is not None and getattr(query, 'directories', None) is None:
+                query.directories = self.directories
+        self.cache = cache
+        self.watcher: Optional[InotifyWatcher] = None
+        self.batches = 0
+        self.rescans = 0
+    
+    def start(self):
+        """
+        Watch the roots and start applying changes
+        
+        Raises:
+            OSError: inotify is not available
+        """
+        self.stop()
+        self.scanner.mounts = MountTable.load()
+        self.watcher = InotifyWatcher(self._on_events, exclude=self._excludes)
+        for root in self.roots:
+            self.watcher.watch_tree(root)
+        self.watcher.start()
+    
+    def stop(self):
+        """Stop watching (waits for a batch being applied)"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+    
+    def _excludes(self, dirpath: str, name: str) -> bool:
+        if self.scanner.exclusions.excludes(dirpath, name):
+            return True
+        mounts = self.scanner.mounts
+        mount = mounts.get(dirpath) if mounts else None
+        return mount is not None and mounts.is_pseudo(mount)
+    
+    def _dir_ids_below(self, dirpath: str) -> Set[int]:
+        prefix = dirpath.rstrip(os.sep) + os.sep
+        return {dir_id for dir_id, path in enumerate(self.directories.paths)
+                if path == dirpath or path.startswith(prefix)}
+    
+    def _add_file(self, changes: Changes, path: str):
+        dir_id, name = self.directories.split(path)
+        changes.removed.add((dir_id, name))
+        changes.added.pop((dir_id, name), None)
+        if not self.scanner._is_file_safe(name):
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return  # Already gone again
+        if stat_module.S_ISREG(stat.st_mode):
+            changes.added[(dir_id, name)] = stat
+    
+    def _add_tree(self, changes: Changes, dirpath: str):
+        for dir_id, name, stat in self.scanner._walk(dirpath):
+            changes.added[(dir_id, name)] = stat
+    
+    def _rescan(self, changes: Changes, dirpath: str):
+        """List a directory again after lost events"""
+        self.rescans += 1
+        listing = self.scanner._read_directory(dirpath)
+        if listing is None:
+            changes.removed_dirs |= self._dir_ids_below(dirpath)
+            self.watcher.unwatch_tree(dirpath)
+            return
+        files, dirs = listing
+        dir_id = self.directories.intern(dirpath)
+        changes.removed_dirs.add(dir_id)
+        for name, stat in files:
+            changes.added[(dir_id, name)] = stat
+        
+        # Subdirectories created or deleted while events were lost
+        present = {os.path.join(dirpath, name) for name, is_symlink in dirs if not is_symlink}
+        watched = set(self.watcher.watched)
+        for subdir in present - watched:
+            if not self._excludes(subdir, os.path.basename(subdir)):
+                self.watcher.watch_tree(subdir)
+                self._add_tree(changes, subdir)
+        for subdir in watched:
+            if os.path.dirname(subdir) == dirpath and subdir not in present:
+                changes.removed_dirs |= self._dir_ids_below(subdir)
+                self.watcher.unwatch_tree(subdir)
+    
+    def _on_events(self, events: List[WatchEvent]):
+        changes = Changes()
+        cache = self.cache
+        for event in events:
+            kind, path = event.kind, event.path
+            if kind == 'created':
+                self._add_file(changes, path)
+            elif kind == 'modified':
+                self._add_file(changes, path)
+                if cache is not None:
+                    cache.remove_entry(path)
+            elif kind == 'deleted':
+                entry = self.directories.split(path)
+                changes.removed.add(entry)
+                changes.added.pop(entry, None)
+                if cache is not None:
+                    cache.remove_entry(path)
+            elif kind == 'moved':
+                old_entry = self.directories.split(event.old_path)
+                changes.removed.add(old_entry)
+                changes.added.pop(old_entry, None)
+                self._add_file(changes, path)
+                if cache is not None:
+                    cache.rename_entry(event.old_path, path)
+            elif kind == 'dir_created':
+                self._add_tree(changes, path)
+            elif kind == 'dir_deleted':
+                changes.removed_dirs |= self._dir_ids_below(path)
+                if cache is not None:
+                    cache.remove_tree(path)
+            elif kind == 'dir_moved':
+                changes.removed_dirs |= self._dir_ids_below(event.old_path)
+                self._add_tree(changes, path)
+                if cache is not None:
+                    cache.rename_tree(event.old_path, path)
+            elif kind == 'rescan':
+                self._rescan(changes, path)
+        
+        if cache is not None:
+            cache.flush()
+        if not changes:
+            return
+        self.batches += 1
+        for view in self.views:
+            try:
+                view.apply(changes)
+            except Exception as e:
+                print(f"Live update error: {e}")
@@ -0,0 +1,252 @@
+"""
+Single-pass scan engine: several queries evaluated over one traversal
+"""
+
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from utils.file_record import FileRecord
+from utils.file_scanner import FileScanner
+from utils.result_store import ColumnarResults
+
+
+class ScanQuery(ABC):
+    """Base class for a query fed by QueryEngine
+    
+    Subclasses implement feed(); the engine only passes files inside
+    [min_size, max_size]. unique_inodes=False asks for every path of a
+    hardlinked file instead of the first one only. names_only=True means the
+    query never looks at stat: when every query says so, the engine runs a
+    stat-free traversal and feed() gets None for stat.
+    """
+    
+    min_size = 0
+    max_size: Optional[int] = None
+    unique_inodes = True
+    names_only = False
+    
+    @abstractmethod
+    def feed(self, dir_id: int, name: str, stat):
+        """Process one scanned file"""
+    
+    def finish(self):
+        """Called once the traversal is over (also after a cancel)"""
+
+
+class FilterQuery(ScanQuery):
+    """Collect files accepted by a predicate, as FileRecords or ColumnarResults"""
+    
+    def __init__(self, match: Callable[[str, object], bool],
+                 min_size: int = 0,
+                 max_size: Optional[int] = None,
+                 group: Optional[Callable[[str], str]] = None,
+                 columnar: bool = False):
+        """
+        Initialize filter query
+        
+        Args:
+            match: match(name, stat) -> True to keep the file
+            min_size: Minimum file size in bytes (files below are never offered)
+            max_size: Maximum file size in bytes (None for no limit)
+            group: Optional group(name) -> group label stored with each result
+            columnar: Collect into a ColumnarResults store instead of a list
+        """
+        self.match = match
+        self.min_size = min_size
+        self.max_size = max_size
+        self.group = group
+        self.columnar = columnar
+        self.directories = None  # Scanner table of the current run (see bind())
+        self.results: Union[List[FileRecord], ColumnarResults] = []
+    
+    def bind(self, scanner: FileScanner):
+        """Start a fresh result set interned in the scanner's directory table"""
+        self.directories = scanner.directories
+        self.results = ColumnarResults(scanner.directories) if self.columnar else []
+    
+    def feed(self, dir_id: int, name: str, stat):
+        if not self.match(name, stat):
+            return
+        group = self.group(name) if self.group is not None else None
+        if self.columnar:
+            self.results.append_entry(dir_id, name, stat, group=group)
+            return
+        record = FileRecord.from_entry(dir_id, name, stat, self.directories)
+        if group is not None:
+            record['group'] = group
+        self.results.append(record)
+
+
+class NameQuery(ScanQuery):
+    """Collect files by name only, as FileRecords without stat information
+    
+    Run alone (or with other name-only queries) the traversal never stats a
+    file; call resolve() to stat the matches once they are needed for display.
+    """
+    
+    names_only = True
+    
+    def __init__(self, match: Callable[[str], bool]):
+        """
+        Initialize name query
+        
+        Args:
+            match: match(name) -> True to keep the file
+        """
+        self.match = match
+        self.directories = None
+        self.results: List[FileRecord] = []
+    
+    def bind(self, scanner: FileScanner):
+        self.directories = scanner.directories
+        self.results = []
+    
+    def feed(self, dir_id: int, name: str, stat):
+        if self.match(name):
+            self.results.append(FileRecord.from_name(dir_id, name, self.directories))
+    
+    def resolve(self) -> List[FileRecord]:
+        """Stat the matches; files that disappeared since the scan are dropped"""
+        self.results = [record for record in self.results if record.load_stat()]
+        return self.results
+
+
+class SizeBucketQuery(ScanQuery):
+    """Group files by size for duplicate detection (step 1 of DuplicateFinder)
+    
+    Hardlinks share one inode: only the first path of each inode goes into a
+    size bucket, the other paths are kept to attach to it afterwards.
+    """
+    
+    unique_inodes = False
+    
+    def __init__(self, min_size: int = 0):
+        """
+        Initialize size bucket query
+        
+        Args:
+            min_size: Minimum file size to consider (in bytes)
+        """
+        self.min_size = min_size
+        self.size_groups: Dict[int, List[Tuple[int, str]]] = defaultdict(list)
+        self.inode_entries = {}  # (st_dev, st_ino) -> entries, multi-link files only
+        self.link_counts = {}  # first entry -> st_nlink
+    
+    def feed(self, dir_id: int, name: str, stat):
+        entry = (dir_id, name)
+        if stat.st_nlink > 1 and stat.st_ino:
+            entries = self.inode_entries.setdefault((stat.st_dev, stat.st_ino), [])
+            entries.append(entry)
+            if len(entries) > 1:
+                return
+            self.link_counts[entry] = stat.st_nlink
+        
+        self.size_groups[stat.st_size].append(entry)
+    
+    def candidates(self) -> Dict[int, List[Tuple[int, str]]]:
+        """Size buckets with at least two files"""
+        return {size: entries for size, entries in self.size_groups.items() if len(entries) >= 2}
+
+
+class QueryEngine:
+    """Evaluates several ScanQuery objects over a single traversal
+    
+    The scan covers the union of the queries' size ranges; each file is then
+    offered to every query whose range contains it. Hardlinked files are
+    offered once to unique_inodes queries and once per path to the others,
+    so a size report, a type report and duplicate bucketing of the same drive
+    cost one walk instead of three.
+    """
+    
+    def __init__(self, scanner: Optional[FileScanner] = None):
+        """
+        Initialize query engine
+        
+        Args:
+            scanner: FileScanner to traverse with (None = a new default scanner)
+        """
+        self.scanner = scanner if scanner is not None else FileScanner()
+        self.queries: List[ScanQuery] = []
+    
+    def add(self, query: ScanQuery) -> ScanQuery:
+        """Register a query for the next run(); returns it for convenience"""
+        self.queries.append(query)
+        return query
+    
+    def cancel(self):
+        """Cancel the running traversal"""
+        self.scanner.cancel()
+    
+    def run(self, directories: List[str]) -> List[ScanQuery]:
+        """
+        Scan directories once and feed every registered query
+        
+        Args:
+            directories: Root directories to scan
+        
+        Returns:
+            The registered queries, holding their results
+        """
+        queries = self.queries
+        if not queries:
+            return queries
+        
+        scanner = self.scanner
+        # New results, new directory table: the previous run's is freed with its results
+        scanner.new_directory_table()
+        for query in queries:
+            bind = getattr(query, 'bind', None)
+            if bind is not None:
+                bind(scanner)
+        
+        min_size = min(query.min_size for query in queries)
+        max_sizes = [query.max_size for query in queries]
+        max_size = None if None in max_sizes else max(max_sizes)
+        all_links = not all(query.unique_inodes for query in queries)
+        
+        # Fast path: with one query every scanned file is already in range
+        single = queries[0] if len(queries) == 1 else None
+        seen_inodes = set()
+        
+        if all(query.names_only for query in queries):
+            try:
+                for dir_id, name in scanner.scan_names(directories):
+                    if scanner.cancelled:
+                        break
+                    for query in queries:
+                        query.feed(dir_id, name, None)
+            finally:
+                for query in queries:
+                    query.finish()
+            return queries
+        
+        try:
+            for dir_id, name, stat in scanner.scan_roots_entries(directories, min_size, max_size,
+                                                                 unique_inodes=not all_links):
+                if scanner.cancelled:
+                    break
+                
+                if single is not None:
+                    single.feed(dir_id, name, stat)
+                    continue
+                
+                # Later paths of a hardlinked file only go to queries that want them
+                repeated_link = False
+                if all_links and stat.st_nlink > 1 and stat.st_ino:
+                    key = (stat.st_dev, stat.st_ino)
+                    repeated_link = key in seen_inodes
+                    seen_inodes.add(key)
+                
+                size = stat.st_size
+                for query in queries:
+                    if size < query.min_size or (query.max_size is not None and size > query.max_size):
+                        continue
+                    if repeated_link and query.unique_inodes:
+                        continue
+                    query.feed(dir_id, name, stat)
+        finally:
+            for query in queries:
+                query.finish()
+        
+        return queries
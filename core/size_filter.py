@@ -2,8 +2,11 @@
 File size filter module
 """
 
-from typing import List, Callable, Optional, Tuple
+from typing import List, Callable, Optional, Tuple, Union
+from core.query_engine import FilterQuery, QueryEngine
+from utils.file_record import FileRecord
 from utils.file_scanner import FileScanner
+from utils.result_store import ColumnarResults
 
 
 class SizeFilter:
@@ -27,7 +30,8 @@ class SizeFilter:
     def find_files_by_size(self, directories: List[str],
                           size_condition: str,
                           size_value: float,
-                          size_unit: str = 'MB') -> List[dict]:
+                          size_unit: str = 'MB',
+                          columnar: bool = False) -> Union[List[FileRecord], ColumnarResults]:
         """
         Find files matching size criteria
         
@@ -36,12 +40,33 @@ class SizeFilter:
             size_condition: Condition type ('larger_than', 'smaller_than', 'exactly')
             size_value: Size value in specified unit
             size_unit: Size unit ('B', 'KB', 'MB', 'GB')
-            
+            columnar: Return a ColumnarResults store instead of a list
+                      (much smaller for multi-million-file results)
+        
+        Returns:
+            List of FileRecord results (or ColumnarResults) matching criteria
+        """
+        # One-query engine run: scan_roots_entries yields interned (dir_id, name, stat)
+        # entries (no second os.stat(), no overlapping roots, no path strings)
+        engine = QueryEngine(self.scanner)
+        query = engine.add(self.size_query(size_condition, size_value, size_unit, columnar))
+        engine.run(directories)
+        return query.results
+    
+    @classmethod
+    def size_query(cls, size_condition: str,
+                   size_value: float,
+                   size_unit: str = 'MB',
+                   columnar: bool = False) -> FilterQuery:
+        """
+        Build the query behind find_files_by_size(), to run in a shared
+        QueryEngine pass together with other queries
+        
         Returns:
-            List of file info dictionaries matching criteria
+            FilterQuery; matching files are in query.results after the run
         """
         # Convert size to bytes
-        size_bytes = self._convert_to_bytes(size_value, size_unit)
+        size_bytes = cls._convert_to_bytes(size_value, size_unit)
         
         # Determine min and max size for scanning
         if size_condition == 'larger_than':
@@ -57,28 +82,11 @@ class SizeFilter:
             min_size = 0
             max_size = None
         
-        # Scan and collect files (use optimized method with cached stat)
-        matched_files = []
+        def match(name, stat):
+            # Double-check the condition
+            return cls._matches_condition(stat.st_size, size_condition, size_bytes)
         
-        for directory in directories:
-            if self.cancelled:
-                break
-            
-            # Use scan_directory_with_stat to avoid double os.stat() call
-            for filepath, stat in self.scanner.scan_directory_with_stat(directory, min_size, max_size):
-                if self.cancelled:
-                    break
-                
-                # Pass cached stat to avoid second os.stat() call
-                file_info = self.scanner.get_file_info(filepath, cached_stat=stat)
-                
-                # Double-check the condition
-                if self._matches_condition(file_info.get('size', 0), 
-                                          size_condition, 
-                                          size_bytes):
-                    matched_files.append(file_info)
-        
-        return matched_files
+        return FilterQuery(match, min_size, max_size, columnar=columnar)
     
     @staticmethod
     def _convert_to_bytes(value: float, unit: str) -> int:
@@ -110,7 +118,7 @@ class SizeFilter:
         
         Args:
             size_bytes: Size in bytes
-            
+        
         Returns:
             Formatted string (e.g., "1.5 MB")
         """
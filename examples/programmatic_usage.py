@@ -11,6 +11,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.duplicate_finder import DuplicateFinder
+from core.file_type_filter import FileTypeFilter
+from core.query_engine import QueryEngine, SizeBucketQuery
 from core.size_filter import SizeFilter
 from utils.file_scanner import FileScanner
 from utils.hash_calculator import HashCalculator
@@ -23,10 +25,9 @@ def example_1_find_duplicates():
     print("=" * 60)
     
     # Create duplicate finder
-    def progress_callback(count, filepath):
-        """Show progress every 100 files"""
-        if count % 100 == 0:
-            print(f"Scanned {count} files...")
+    def progress_callback(count, filename):
+        """Show progress (called a few times per second, see PROGRESS_INTERVAL)"""
+        print(f"Scanned {count} files...")
     
     finder = DuplicateFinder(progress_callback)
     
@@ -55,8 +56,8 @@ def example_1_find_duplicates():
             print(f"  - {file_info['name']} ({size_mb:.2f} MB)")
             print(f"    Path: {file_info['path']}")
         
-        # Calculate wasted space (all but one copy)
-        wasted = sum(f['size'] for f in files[1:])
+        # Calculate wasted space (all but one copy, hardlinked copies free nothing)
+        wasted = DuplicateFinder.reclaimable_size(files)
         total_wasted_space += wasted
         print(f"  Wasted space: {wasted / (1024*1024):.2f} MB")
     
@@ -217,6 +218,64 @@ for filepath in files_to_delete:
     print("\nNote: Always confirm with users before deleting files!")
 
 
+def example_6_single_pass_reports():
+    """Example 6: Size report, type report and duplicates from one scan"""
+    print("\n" + "=" * 60)
+    print("Example 6: Several Reports From One Scan")
+    print("=" * 60)
+    
+    directories = [
+        r"C:\Users\Public",  # Example path
+    ]
+    
+    # All queries share the finder's scanner, so the drive is walked once
+    finder = DuplicateFinder()
+    engine = QueryEngine(finder.scanner)
+    large_files = engine.add(SizeFilter.size_query('larger_than', 100, 'MB'))
+    media_files = engine.add(FileTypeFilter.type_query({'images', 'videos'}))
+    buckets = engine.add(SizeBucketQuery(min_size=1024))
+    
+    print(f"\nScanning directories: {directories}\n")
+    engine.run(directories)
+    duplicates = finder.find_duplicates_in(buckets)
+    
+    print(f"Files larger than 100 MB: {len(large_files.results)}")
+    print(f"Images and videos: {len(media_files.results)}")
+    print(f"Duplicate groups: {len(duplicates)}")
+
+
+def example_7_scan_stats():
+    """Example 7: Where a scan spent its time and what it could not read"""
+    print("\n" + "=" * 60)
+    print("Example 7: Scan Cost and Error Report")
+    print("=" * 60)
+    
+    directories = [
+        r"C:\Users",  # Example path
+    ]
+    
+    scanner = FileScanner()
+    file_count = sum(1 for _ in scanner.scan_roots_entries(directories))
+    stats = scanner.stats
+    
+    print(f"\nFiles: {file_count:,}")
+    print(f"Directories listed: {stats.directories_listed:,} "
+          f"(+{stats.directories_replayed:,} from the index)")
+    print(f"Entries seen: {stats.entries_seen:,}, stat calls: {stats.stats_performed:,}")
+    print(f"Scan time: {stats.duration:.1f}s")
+    
+    for name, count in stats.errors_by_errno.most_common():
+        print(f"  {name}: {count}")
+    for path, count in stats.errors_by_top_dir.most_common(5):
+        print(f"  {count} errors under {path}")
+    for path, seconds in stats.slowest_directories[:5]:
+        print(f"  {seconds:.3f}s  {path}")
+    
+    # Full report for later analysis
+    stats.to_json('scan_stats.json')
+    print("\nSaved scan_stats.json")
+
+
 def main():
     """Run all examples"""
     print("\n" + "=" * 60)
@@ -232,6 +291,8 @@ def main():
         '3': ('Custom File Scanning', example_3_custom_file_scanning),
         '4': ('Hash Calculation', example_4_hash_calculation),
         '5': ('Safe Deletion (demo only)', example_5_safe_deletion),
+        '6': ('Several Reports From One Scan', example_6_single_pass_reports),
+        '7': ('Scan Cost and Error Report', example_7_scan_stats),
     }
     
     print("Available examples:")
@@ -13,7 +13,12 @@ from send2trash import send2trash
 import subprocess
 
 from core.duplicate_finder import DuplicateFinder
+from core.live_index import DuplicateView
 from core.size_filter import SizeFilter
+from gui.live_updater import LiveUpdater
+from gui.progress_poller import ProgressPoller
+from utils import scan_snapshot
+from utils.progress import ProgressChannel
 from localization import t
 
 
@@ -22,7 +27,10 @@ class DuplicateFinderTab(ttk.Frame):
     
     def __init__(self, parent):
         super().__init__(parent)
-        self.duplicate_finder = DuplicateFinder(self.update_progress)
+        self.progress = ProgressChannel()
+        self.progress_poller = ProgressPoller(self, self.progress, self.update_progress)
+        self.duplicate_finder = DuplicateFinder(self.progress)
+        self.live_updater = LiveUpdater(self, self.live_refresh)
         self.selected_directories = []
         self.duplicate_groups = {}
         self.current_group_index = 0
@@ -153,6 +161,10 @@ class DuplicateFinderTab(ttk.Frame):
         ttk.Button(action_frame, text=t('btn_delete_selected'), 
                   command=self.delete_selected, 
                   style='Accent.TButton').pack(side=tk.RIGHT, padx=5)
+        ttk.Button(action_frame, text=t('btn_save_results'), 
+                  command=self.save_results).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(action_frame, text=t('btn_open_results'), 
+                  command=self.open_results).pack(side=tk.RIGHT, padx=5)
         
         # Bind click event for checkboxes
         self.file_tree.bind('<Button-1>', self.on_tree_click)
@@ -206,8 +218,9 @@ class DuplicateFinderTab(ttk.Frame):
         self.selected_directories.clear()
         self.dir_listbox.delete(0, tk.END)
     
-    def update_progress(self, files_count, current_file):
-        """Update progress display"""
+    def update_progress(self, event):
+        """Update progress display for the scan and hash phases
+        (polled on the Tk thread, see ProgressPoller)"""
         # Calculate elapsed time
         if hasattr(self, 'start_time') and self.start_time:
             elapsed = int(time.time() - self.start_time)
@@ -215,8 +228,26 @@ class DuplicateFinderTab(ttk.Frame):
         else:
             time_str = ""
         
+        rate = t('progress_rate', files=f"{event.files_per_sec:,.0f}",
+                 size=SizeFilter.format_size(event.bytes_per_sec))
+        
+        if event.phase == 'scan':
+            self.progress_label.config(
+                text=t('progress_scanning', path=f"{event.files:,} files ({rate}){time_str}...")
+            )
+            return
+        
+        if event.phase == "quick_hash":
+            phase_name = t('progress_quick_compare')
+        elif event.phase == "partial_hash":
+            phase_name = t('progress_partial_compare')
+        else:  # full_hash
+            phase_name = t('progress_detailed_check')
+        
+        percentage = event.percentage or 0
+        total = event.total or 0
         self.progress_label.config(
-            text=t('progress_scanning', path=f"{files_count:,} files{time_str}...")
+            text=f"{phase_name}: {event.files:,}/{total:,} files ({percentage}%, {rate}){time_str}..."
         )
     
     def start_scan(self):
@@ -242,6 +273,7 @@ class DuplicateFinderTab(ttk.Frame):
             messagebox.showerror(t('dlg_invalid_input_title'), t('dlg_invalid_input'))
             return
         
+        self.live_updater.stop()
         self.scanning = True
         self.start_time = time.time()  # Start timer
         self.current_scan_id += 1  # Increment scan ID
@@ -250,6 +282,7 @@ class DuplicateFinderTab(ttk.Frame):
         self.scan_btn.config(state=tk.DISABLED)
         self.cancel_btn.config(state=tk.NORMAL)
         self.progress_bar.start()
+        self.progress_poller.start()
         self.duplicate_groups.clear()
         
         # Run scan in separate thread
@@ -260,32 +293,13 @@ class DuplicateFinderTab(ttk.Frame):
         )
         thread.start()
     
-    def update_hash_progress(self, phase, current, total, filename):
-        """Update progress for hash calculation phases"""
-        if hasattr(self, 'start_time') and self.start_time:
-            elapsed = int(time.time() - self.start_time)
-            time_str = f" - {elapsed}s"
-        else:
-            time_str = ""
-        
-        if phase == "quick_hash":
-            phase_name = t('progress_quick_compare')
-        else:  # full_hash
-            phase_name = t('progress_detailed_check')
-        
-        percentage = int((current / total * 100)) if total > 0 else 0
-        self.progress_label.config(
-            text=f"{phase_name}: {current:,}/{total:,} files ({percentage}%){time_str}..."
-        )
-    
     def run_scan(self, min_size, scan_id):
         """Run the scan in background thread"""
         try:
+            # Scan and hash progress are read from self.progress by the poller
             self.duplicate_groups = self.duplicate_finder.find_duplicates(
                 self.selected_directories,
-                min_size=min_size,
-                hash_progress_callback=lambda phase, cur, tot, file: 
-                    self.after(0, lambda: self.update_hash_progress(phase, cur, tot, file))
+                min_size=min_size
             )
             # Only update UI if this is still the current scan
             if self.scanning and scan_id == self.current_scan_id:
@@ -305,21 +319,54 @@ class DuplicateFinderTab(ttk.Frame):
         self.scan_btn.config(state=tk.NORMAL)
         self.cancel_btn.config(state=tk.DISABLED)
         self.progress_bar.stop()
+        self.progress_poller.stop()
         
         if self.duplicate_groups:
             self.display_all_duplicates()
             total_files = sum(len(files) for files in self.duplicate_groups.values())
             total_size = sum(
-                sum(f['size'] for f in files[1:])  # Size of duplicates (excluding one to keep)
+                DuplicateFinder.reclaimable_size(files)  # Excludes one to keep and hardlinked copies
                 for files in self.duplicate_groups.values()
             )
             size_str = SizeFilter.format_size(total_size)
-            self.progress_label.config(
-                text=t('lbl_found_duplicates', groups=len(self.duplicate_groups), files=total_files, size=size_str)
-            )
+            summary = t('lbl_found_duplicates', groups=len(self.duplicate_groups), files=total_files, size=size_str)
+            
+            # Mention roots/folders/files skipped because they overlapped
+            overlap = self.duplicate_finder.scanner.overlap_skipped
+            if any(overlap.values()):
+                summary += " | " + t('lbl_overlap_skipped', roots=overlap['roots'],
+                                     dirs=overlap['directories'], files=overlap['files'])
+            
+            # List mount points the scan did not enter (pseudo / other filesystems)
+            skipped_mounts = self.duplicate_finder.scanner.skipped_mounts
+            if skipped_mounts:
+                mounts = ', '.join(path for path, _ in skipped_mounts[:5])
+                if len(skipped_mounts) > 5:
+                    mounts += ', ...'
+                summary += " | " + t('lbl_mounts_skipped', count=len(skipped_mounts), mounts=mounts)
+            
+            self.progress_label.config(text=summary)
         else:
             self.progress_label.config(text=t('lbl_no_duplicates'))
             self.summary_label.config(text=t('lbl_no_duplicates'))
+        
+        # Keep the groups current while the tab stays open (Linux, config.LIVE_UPDATES)
+        if self.live_updater.enabled() and self.duplicate_finder.size_buckets is not None:
+            self.live_updater.start(self.selected_directories,
+                                    DuplicateView(self.duplicate_finder, self.duplicate_groups),
+                                    self.duplicate_finder.scanner, self.duplicate_finder.cache)
+    
+    def live_refresh(self, view):
+        """Show duplicate groups updated by the live watcher"""
+        if self.scanning:
+            return
+        self.duplicate_groups = view.groups
+        for item in self.file_tree.get_children():
+            self.file_tree.delete(item)
+        if self.duplicate_groups:
+            self.display_all_duplicates()
+        else:
+            self.summary_label.config(text=t('lbl_no_duplicates'))
     
     def scan_error(self, error_msg):
         """Handle scan error"""
@@ -331,6 +378,7 @@ class DuplicateFinderTab(ttk.Frame):
         self.scan_btn.config(state=tk.NORMAL)
         self.cancel_btn.config(state=tk.DISABLED)
         self.progress_bar.stop()
+        self.progress_poller.stop()
         self.progress_label.config(text=f"{t('dlg_error')}: {error_msg}")
         messagebox.showerror(t('dlg_error'), error_msg)
     
@@ -341,6 +389,7 @@ class DuplicateFinderTab(ttk.Frame):
         self.scan_btn.config(state=tk.NORMAL)
         self.cancel_btn.config(state=tk.DISABLED)
         self.progress_bar.stop()
+        self.progress_poller.stop()
         self.progress_label.config(text=t('progress_cancelled'))
     
     def on_file_double_click(self, event):
@@ -385,6 +434,8 @@ class DuplicateFinderTab(ttk.Frame):
         for group_idx, (hash_value, files) in enumerate(self.duplicate_groups.items(), 1):
             for file_info in files:
                 name = os.path.basename(file_info['path'])
+                if file_info.get('hardlinks'):
+                    name += " " + t('lbl_hardlinks', count=len(file_info['hardlinks']))
                 size_str = SizeFilter.format_size(file_info['size'])
                 modified_str = datetime.fromtimestamp(file_info['modified']).strftime('%Y-%m-%d %H:%M:%S')
                 
@@ -474,6 +525,54 @@ class DuplicateFinderTab(ttk.Frame):
                     new_tags.append('checked')
                     self.file_tree.item(item, tags=tuple(new_tags))
     
+    def save_results(self):
+        """Save the duplicate groups to a snapshot file"""
+        if not self.duplicate_groups:
+            messagebox.showinfo(t('dlg_info'), t('dlg_no_results'))
+            return
+        
+        path = filedialog.asksaveasfilename(
+            defaultextension=scan_snapshot.EXTENSION,
+            filetypes=[(t('dlg_scan_results'), '*' + scan_snapshot.EXTENSION)]
+        )
+        if not path:
+            return
+        
+        try:
+            count = scan_snapshot.save_snapshot(path, duplicates=self.duplicate_groups,
+                                                meta={'kind': 'duplicates', 'roots': self.selected_directories})
+            self.progress_label.config(text=t('lbl_results_saved', count=f"{count:,}", path=path))
+        except OSError as e:
+            messagebox.showerror(t('dlg_error'), f"{t('dlg_error')}: {e}")
+    
+    def open_results(self):
+        """Reopen duplicate groups from a snapshot file"""
+        if self.scanning:
+            return
+        
+        path = filedialog.askopenfilename(
+            filetypes=[(t('dlg_scan_results'), '*' + scan_snapshot.EXTENSION)]
+        )
+        if not path:
+            return
+        
+        try:
+            with scan_snapshot.ScanSnapshot(path) as snapshot:
+                self.live_updater.stop()
+                self.duplicate_groups = snapshot.duplicates()
+        except (OSError, ValueError) as e:
+            messagebox.showerror(t('dlg_error'), t('dlg_open_results_failed', error=e))
+            return
+        
+        for item in self.file_tree.get_children():
+            self.file_tree.delete(item)
+        if self.duplicate_groups:
+            self.display_all_duplicates()
+        else:
+            self.summary_label.config(text=t('lbl_no_duplicates'))
+        total_files = sum(len(files) for files in self.duplicate_groups.values())
+        self.progress_label.config(text=t('lbl_results_opened', count=f"{total_files:,}", path=path))
+    
     def delete_selected(self):
         """Delete selected files"""
         selected_files = []
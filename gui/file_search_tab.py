@@ -12,19 +12,28 @@ from datetime import datetime
 from send2trash import send2trash
 import subprocess
 
+from core.query_engine import NameQuery, QueryEngine
 from utils.file_scanner import FileScanner
 from core.size_filter import SizeFilter
+from gui.progress_poller import ProgressPoller
+from utils.progress import ProgressChannel
 from localization import t
 
 
 class FileSearchTab(ttk.Frame):
     """Tab for searching files by name pattern"""
     
+    STAT_BATCH = 500  # Matches stat-ed and added to the tree per Tk callback
+    
     def __init__(self, parent):
         super().__init__(parent)
-        self.file_scanner = FileScanner(self.update_progress)
+        self.progress = ProgressChannel()
+        self.progress_poller = ProgressPoller(self, self.progress, self.update_progress)
+        self.file_scanner = FileScanner(self.progress)
         self.selected_directories = []
         self.matched_files = []
+        self.search_query = None  # NameQuery of the running scan (live match count)
+        self._display_generation = 0  # Bumped to abandon a display still in progress
         self.scanning = False
         self.start_time = None
         
@@ -180,16 +189,23 @@ class FileSearchTab(ttk.Frame):
         self.dir_listbox.delete(0, tk.END)
         self.selected_directories.clear()
     
-    def update_progress(self, files_count, current_file):
-        """Update progress display"""
+    def update_progress(self, event):
+        """Update progress display (polled on the Tk thread, see ProgressPoller)"""
         if hasattr(self, 'start_time') and self.start_time:
             elapsed = int(time.time() - self.start_time)
             time_str = f" - {elapsed}s"
         else:
             time_str = ""
         
+        # Matches are collected by the query until the scan ends
+        query = self.search_query
+        found = len(query.results) if query is not None else len(self.matched_files)
+        
+        rate = t('progress_rate', files=f"{event.files_per_sec:,.0f}",
+                 size=SizeFilter.format_size(event.bytes_per_sec))
         self.progress_label.config(
-            text=t('lbl_files_searched', scanned=f"{files_count:,}", found=f"{len(self.matched_files):,}{time_str}")
+            text=t('lbl_files_searched', scanned=f"{event.files:,}",
+                   found=f"{found:,} ({rate}){time_str}")
         )
     
     def start_scan(self):
@@ -214,7 +230,9 @@ class FileSearchTab(ttk.Frame):
         self.scan_btn.config(state=tk.DISABLED)
         self.cancel_btn.config(state=tk.NORMAL)
         self.progress_bar.start()
-        self.matched_files.clear()
+        self.progress_poller.start()
+        self._display_generation += 1
+        self.matched_files = []
         
         # Run scan in separate thread
         thread = threading.Thread(
@@ -230,26 +248,22 @@ class FileSearchTab(ttk.Frame):
             # Always case-insensitive, partial match
             pattern = pattern.lower()
             
-            # Scan directories
-            for directory in self.selected_directories:
-                if self.file_scanner.cancelled:
-                    break
-                
-                for filepath in self.file_scanner.scan_directory(directory):
-                    if self.file_scanner.cancelled:
-                        break
-                    
-                    # Check if filename matches pattern (case-insensitive, partial)
-                    filename = os.path.basename(filepath)
-                    
-                    if pattern in filename.lower():
-                        file_info = self.file_scanner.get_file_info(filepath)
-                        self.matched_files.append(file_info)
+            # Name-only scan (overlapping roots are collapsed): files are matched
+            # on the directory entry name without a stat; matches are stat-ed on
+            # display, batch by batch (see display_results)
+            engine = QueryEngine(self.file_scanner)
+            query = engine.add(NameQuery(lambda filename: pattern in filename.lower()))
+            self.search_query = query
+            try:
+                engine.run(self.selected_directories)
+                self.matched_files = query.results
+            finally:
+                self.search_query = None
             
             # Scan complete
             if self.scanning:
                 self.after(0, self.scan_complete)
-                
+        
         except Exception as e:
             if self.scanning:
                 self.after(0, lambda: self.scan_error(str(e)))
@@ -263,20 +277,30 @@ class FileSearchTab(ttk.Frame):
         self.scan_btn.config(state=tk.NORMAL)
         self.cancel_btn.config(state=tk.DISABLED)
         self.progress_bar.stop()
+        self.progress_poller.stop()
         
         # Calculate elapsed time
         elapsed = int(time.time() - self.start_time)
         
-        # Display results
-        self.display_results()
-        
-        # Update progress label
+        # Display results; the summary needs every match stat-ed
+        self.display_results(on_done=lambda: self.show_summary(elapsed))
+    
+    def show_summary(self, elapsed: int):
+        """Show the search summary once all matches are displayed"""
         total_size = sum(f['size'] for f in self.matched_files)
         size_str = SizeFilter.format_size(total_size)
         
-        self.progress_label.config(
-            text=t('lbl_search_complete', count=f"{len(self.matched_files):,}", size=size_str, time=elapsed)
-        )
+        summary = t('lbl_search_complete', count=f"{len(self.matched_files):,}", size=size_str, time=elapsed)
+        
+        # List mount points the scan did not enter (pseudo / other filesystems)
+        skipped_mounts = self.file_scanner.skipped_mounts
+        if skipped_mounts:
+            mounts = ', '.join(path for path, _ in skipped_mounts[:5])
+            if len(skipped_mounts) > 5:
+                mounts += ', ...'
+            summary += " | " + t('lbl_mounts_skipped', count=len(skipped_mounts), mounts=mounts)
+        
+        self.progress_label.config(text=summary)
     
     def scan_error(self, error_msg):
         """Handle scan error"""
@@ -284,6 +308,7 @@ class FileSearchTab(ttk.Frame):
         self.scan_btn.config(state=tk.NORMAL)
         self.cancel_btn.config(state=tk.DISABLED)
         self.progress_bar.stop()
+        self.progress_poller.stop()
         self.progress_label.config(text=f"{t('dlg_error')}: {error_msg}")
         messagebox.showerror(t('dlg_error'), f"{t('dlg_error')}: {error_msg}")
     
@@ -294,16 +319,37 @@ class FileSearchTab(ttk.Frame):
         self.scan_btn.config(state=tk.NORMAL)
         self.cancel_btn.config(state=tk.DISABLED)
         self.progress_bar.stop()
+        self.progress_poller.stop()
         self.progress_label.config(text=t('progress_cancelled'))
     
-    def display_results(self):
-        """Display scan results"""
+    def display_results(self, on_done=None):
+        """
+        Display scan results
+        
+        Matches from the name-only scan have no size yet: they are stat-ed
+        here, STAT_BATCH rows per Tk callback, so neither the scan thread nor
+        the UI stalls on a large result set. Files gone since the scan are
+        dropped.
+        
+        Args:
+            on_done: Optional callback once every row is shown
+        """
         # Clear tree
         for item in self.file_tree.get_children():
             self.file_tree.delete(item)
         
-        # Add files to tree
-        for file_info in self.matched_files:
+        self._display_generation += 1
+        self._display_batch(self._display_generation, 0, on_done)
+    
+    def _display_batch(self, generation: int, start: int, on_done):
+        """Stat and add one batch of rows, then schedule the next"""
+        if generation != self._display_generation:
+            return  # Superseded by a new scan or display
+        
+        end = min(start + self.STAT_BATCH, len(self.matched_files))
+        for file_info in self.matched_files[start:end]:
+            if file_info.size is None and not file_info.load_stat():
+                continue
             name = file_info['name']
             size_str = SizeFilter.format_size(file_info['size'])
             modified_str = datetime.fromtimestamp(
@@ -316,8 +362,16 @@ class FileSearchTab(ttk.Frame):
                                  values=(name, size_str, modified_str, path),
                                  tags=('unchecked',))
         
+        if end < len(self.matched_files):
+            self.after(1, lambda: self._display_batch(generation, end, on_done))
+            return
+        
+        self.matched_files = [f for f in self.matched_files if f.size is not None]
+        
         # Update totals
         self.update_total_display()
+        if on_done is not None:
+            on_done()
     
     def update_total_display(self):
         """Update total files and size display"""
@@ -0,0 +1,82 @@
+"""
+Keeps a tab's results current after a scan (config.LIVE_UPDATES)
+"""
+
+from typing import Callable, List, Optional
+
+import config
+from core.live_index import LiveIndex
+from utils.hash_cache import HashCache
+from utils.inotify import HAS_INOTIFY
+
+
+class LiveUpdater:
+    """Runs a LiveIndex for one view and refreshes the tab from the Tk main loop
+    
+    Changes are applied on the watcher thread; the tab only sees a finished
+    result set, picked up by polling the view's version every PROGRESS_INTERVAL.
+    """
+    
+    def __init__(self, widget, refresh: Callable[[object], None]):
+        """
+        Initialize live updater
+        
+        Args:
+            widget: Any Tk widget (provides after/after_cancel)
+            refresh: Called on the Tk thread with the view after it changed
+        """
+        self.widget = widget
+        self.refresh = refresh
+        self.interval_ms = max(1, int(getattr(config, 'PROGRESS_INTERVAL', 0.25) * 1000))
+        self.index: Optional[LiveIndex] = None
+        self.view = None
+        self._version = 0
+        self._after_id = None
+    
+    @staticmethod
+    def enabled() -> bool:
+        """Live updates are switched on and supported on this system"""
+        return getattr(config, 'LIVE_UPDATES', False) and HAS_INOTIFY
+    
+    def start(self, roots: List[str], view, scanner=None,
+              cache: Optional[HashCache] = None) -> bool:
+        """
+        Start watching roots for a view (stops the previous one)
+        
+        Returns:
+            True if live updates are running (enabled and inotify available)
+        """
+        self.stop()
+        if not self.enabled():
+            return False
+        
+        index = LiveIndex(roots, [view], scanner, cache)
+        try:
+            index.start()
+        except OSError as e:
+            print(f"Live updates unavailable: {e}")
+            index.stop()
+            return False
+        
+        self.index = index
+        self.view = view
+        self._version = view.version
+        self._after_id = self.widget.after(self.interval_ms, self._poll)
+        return True
+    
+    def stop(self):
+        """Stop watching"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        if self.index is not None:
+            self.index.stop()
+            self.index = None
+            self.view = None
+    
+    def _poll(self):
+        view = self.view
+        if view.version != self._version:
+            self._version = view.version
+            self.refresh(view)
+        self._after_id = self.widget.after(self.interval_ms, self._poll)
@@ -0,0 +1,48 @@
+"""
+Polls a ProgressChannel from the Tk main loop
+"""
+
+from typing import Callable
+
+import config
+from utils.progress import ProgressChannel, ProgressEvent
+
+
+class ProgressPoller:
+    """Reads a ProgressChannel on the Tk thread every PROGRESS_INTERVAL
+    
+    Scan threads only write to the channel; the widget is updated from Tk's
+    own after() timer, so there is at most one label update per interval
+    and no Tk call is made from a worker thread.
+    """
+    
+    def __init__(self, widget, channel: ProgressChannel,
+                 handler: Callable[[ProgressEvent], None]):
+        """
+        Initialize progress poller
+        
+        Args:
+            widget: Any Tk widget (provides after/after_cancel)
+            channel: Progress channel written by the scan
+            handler: Called on the Tk thread with the latest ProgressEvent
+        """
+        self.widget = widget
+        self.channel = channel
+        self.handler = handler
+        self.interval_ms = max(1, int(getattr(config, 'PROGRESS_INTERVAL', 0.25) * 1000))
+        self._after_id = None
+    
+    def start(self):
+        """Start polling (restarts if already running)"""
+        self.stop()
+        self._after_id = self.widget.after(self.interval_ms, self._poll)
+    
+    def stop(self):
+        """Stop polling"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+    
+    def _poll(self):
+        self.handler(self.channel.snapshot())
+        self._after_id = self.widget.after(self.interval_ms, self._poll)
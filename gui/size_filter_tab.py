@@ -11,7 +11,13 @@ from send2trash import send2trash
 import os
 import subprocess
 
+from core.live_index import FilterView
 from core.size_filter import SizeFilter
+from utils import scan_snapshot
+from utils.result_store import ColumnarResults
+from gui.live_updater import LiveUpdater
+from gui.progress_poller import ProgressPoller
+from utils.progress import ProgressChannel
 from localization import t
 
 
@@ -20,9 +26,14 @@ class SizeFilterTab(ttk.Frame):
     
     def __init__(self, parent):
         super().__init__(parent)
-        self.size_filter = SizeFilter(self.update_progress)
+        self.progress = ProgressChannel()
+        self.progress_poller = ProgressPoller(self, self.progress, self.update_progress)
+        self.size_filter = SizeFilter(self.progress)
+        self.live_updater = LiveUpdater(self, self.live_refresh)
+        self.scan_args = None  # (condition, size_value, size_unit) of the last scan
         self.selected_directories = []
-        self.matched_files = []
+        self.matched_files = ColumnarResults()  # Columnar store (rows = tree item ids)
+        self.snapshot = None  # ScanSnapshot the results were opened from (kept mapped)
         self.scanning = False
         self.start_time = None  # Track scan start time
         
@@ -140,6 +151,10 @@ class SizeFilterTab(ttk.Frame):
         ttk.Button(action_frame, text=t('btn_delete_selected'), 
                   command=self.delete_selected,
                   style='Accent.TButton').pack(side=tk.RIGHT, padx=5)
+        ttk.Button(action_frame, text=t('btn_save_results'), 
+                  command=self.save_results).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(action_frame, text=t('btn_open_results'), 
+                  command=self.open_results).pack(side=tk.RIGHT, padx=5)
         
         # File list with checkboxes
         list_frame = ttk.Frame(results_frame)
@@ -242,8 +257,8 @@ class SizeFilterTab(ttk.Frame):
         self.selected_directories.clear()
         self.dir_listbox.delete(0, tk.END)
     
-    def update_progress(self, files_count, current_file):
-        """Update progress display"""
+    def update_progress(self, event):
+        """Update progress display (polled on the Tk thread, see ProgressPoller)"""
         # Calculate elapsed time
         if hasattr(self, 'start_time') and self.start_time:
             elapsed = int(time.time() - self.start_time)
@@ -251,8 +266,10 @@ class SizeFilterTab(ttk.Frame):
         else:
             time_str = ""
         
+        rate = t('progress_rate', files=f"{event.files_per_sec:,.0f}",
+                 size=SizeFilter.format_size(event.bytes_per_sec))
         self.progress_label.config(
-            text=t('progress_scanning', path=f"{files_count:,} files{time_str}...")
+            text=t('progress_scanning', path=f"{event.files:,} files ({rate}){time_str}...")
         )
     
     def start_scan(self):
@@ -273,13 +290,17 @@ class SizeFilterTab(ttk.Frame):
         size_unit = self.size_unit_var.get()
         condition = self.condition_var.get()
         
+        self.live_updater.stop()
+        self.scan_args = (condition, size_value, size_unit)
         self.scanning = True
         self.start_time = time.time()  # Start timer
         self.size_filter.cancelled = False  # Reset cancelled flag
         self.scan_btn.config(state=tk.DISABLED)
         self.cancel_btn.config(state=tk.NORMAL)
         self.progress_bar.start()
-        self.matched_files.clear()
+        self.progress_poller.start()
+        self.matched_files = ColumnarResults()
+        self._close_snapshot()
         
         # Clear previous results
         for item in self.file_tree.get_children():
@@ -300,7 +321,8 @@ class SizeFilterTab(ttk.Frame):
                 self.selected_directories,
                 condition,
                 size_value,
-                size_unit
+                size_unit,
+                columnar=True
             )
             # Only update UI if scan wasn't cancelled
             if self.scanning:
@@ -320,15 +342,38 @@ class SizeFilterTab(ttk.Frame):
         self.scan_btn.config(state=tk.NORMAL)
         self.cancel_btn.config(state=tk.DISABLED)
         self.progress_bar.stop()
+        self.progress_poller.stop()
         if self.matched_files:
             self.display_results()
-            total_size = sum(f['size'] for f in self.matched_files)
+            total_size = self.matched_files.sum('size')
             size_str = SizeFilter.format_size(total_size)
-            self.progress_label.config(
-                text=t('progress_found_size', count=len(self.matched_files), size=size_str)
-            )
+            summary = t('progress_found_size', count=len(self.matched_files), size=size_str)
+            
+            # List mount points the scan did not enter (pseudo / other filesystems)
+            skipped_mounts = self.size_filter.scanner.skipped_mounts
+            if skipped_mounts:
+                mounts = ', '.join(path for path, _ in skipped_mounts[:5])
+                if len(skipped_mounts) > 5:
+                    mounts += ', ...'
+                summary += " | " + t('lbl_mounts_skipped', count=len(skipped_mounts), mounts=mounts)
+            
+            self.progress_label.config(text=summary)
         else:
             self.progress_label.config(text=t('progress_no_match'))
+        
+        # Keep the results current while the tab stays open (Linux, config.LIVE_UPDATES)
+        if self.live_updater.enabled():
+            query = SizeFilter.size_query(*self.scan_args, columnar=True)
+            self.live_updater.start(self.selected_directories, FilterView(query, self.matched_files),
+                                    self.size_filter.scanner)
+    
+    def live_refresh(self, view):
+        """Show results updated by the live watcher"""
+        if self.scanning:
+            return
+        self.matched_files = view.results
+        self._close_snapshot()
+        self.display_results()
     
     def scan_error(self, error_msg):
         """Handle scan error"""
@@ -340,6 +385,7 @@ class SizeFilterTab(ttk.Frame):
         self.scan_btn.config(state=tk.NORMAL)
         self.cancel_btn.config(state=tk.DISABLED)
         self.progress_bar.stop()
+        self.progress_poller.stop()
         self.progress_label.config(text=f"{t('dlg_error')}: {error_msg}")
         messagebox.showerror(t('dlg_error'), f"{t('dlg_error')}: {error_msg}")
     
@@ -350,6 +396,7 @@ class SizeFilterTab(ttk.Frame):
         self.scan_btn.config(state=tk.NORMAL)
         self.cancel_btn.config(state=tk.DISABLED)
         self.progress_bar.stop()
+        self.progress_poller.stop()
         self.progress_label.config(text=t('progress_cancelled'))
     
     def on_file_double_click(self, event):
@@ -381,18 +428,15 @@ class SizeFilterTab(ttk.Frame):
         for item in self.file_tree.get_children():
             self.file_tree.delete(item)
         
-        # Sort by size (descending) - largest files first
-        sorted_files = sorted(self.matched_files, 
-                            key=lambda x: x['size'], 
-                            reverse=True)
-        
         # Limit display to top 1000 files for performance
+        # Largest first - top-k selection over the size column, no full sort
         MAX_DISPLAY = 1000
-        display_files = sorted_files[:MAX_DISPLAY]
-        hidden_count = len(sorted_files) - MAX_DISPLAY if len(sorted_files) > MAX_DISPLAY else 0
+        display_rows = self.matched_files.top_k(MAX_DISPLAY, 'size')
+        hidden_count = len(self.matched_files) - MAX_DISPLAY if len(self.matched_files) > MAX_DISPLAY else 0
         
-        # Add files to tree
-        for file_info in display_files:
+        # Add files to tree (item id = row index in the result store)
+        for row in display_rows:
+            file_info = self.matched_files[int(row)]
             name = file_info['name']
             size_str = SizeFilter.format_size(file_info['size'])
             modified_str = datetime.fromtimestamp(
@@ -401,6 +445,7 @@ class SizeFilterTab(ttk.Frame):
             path = file_info['path']
             
             self.file_tree.insert('', tk.END,
+                                 iid=str(int(row)),
                                  text='☐',
                                  values=(name, size_str, modified_str, path),
                                  tags=('unchecked',))
@@ -455,21 +500,17 @@ class SizeFilterTab(ttk.Frame):
     def update_total_display(self):
         """Update the total size display"""
         total_count = len(self.matched_files)
-        total_size = sum(f['size'] for f in self.matched_files)
+        total_size = self.matched_files.sum('size')
         
         # Calculate selected
         selected_count = 0
         selected_size = 0
         
         for item in self.file_tree.get_children():
-            if self.file_tree.item(item, 'text') == '☑':
+            if self.file_tree.item(item, 'text') == '☑' and item.isdigit():
                 selected_count += 1
-                # Find matching file
-                path = self.file_tree.item(item, 'values')[3]
-                for f in self.matched_files:
-                    if f['path'] == path:
-                        selected_size += f['size']
-                        break
+                # Item id is the row index in the result store
+                selected_size += self.matched_files.sizes[int(item)]
         
         total_str = SizeFilter.format_size(total_size)
         selected_str = SizeFilter.format_size(selected_size)
@@ -478,25 +519,78 @@ class SizeFilterTab(ttk.Frame):
             text=t('lbl_total_selected', total_count=total_count, total_size=total_str, sel_count=selected_count, sel_size=selected_str)
         )
     
+    def save_results(self):
+        """Save the current results to a snapshot file"""
+        if not len(self.matched_files):
+            messagebox.showinfo(t('dlg_info'), t('dlg_no_results'))
+            return
+        
+        path = filedialog.asksaveasfilename(
+            defaultextension=scan_snapshot.EXTENSION,
+            filetypes=[(t('dlg_scan_results'), '*' + scan_snapshot.EXTENSION)]
+        )
+        if not path:
+            return
+        
+        try:
+            count = scan_snapshot.save_snapshot(path, self.matched_files,
+                                                meta={'kind': 'size', 'roots': self.selected_directories})
+            self.progress_label.config(text=t('lbl_results_saved', count=f"{count:,}", path=path))
+        except OSError as e:
+            messagebox.showerror(t('dlg_error'), f"{t('dlg_error')}: {e}")
+    
+    def open_results(self):
+        """Reopen results from a snapshot file (rows are decoded as they are shown)"""
+        if self.scanning:
+            return
+        
+        path = filedialog.askopenfilename(
+            filetypes=[(t('dlg_scan_results'), '*' + scan_snapshot.EXTENSION)]
+        )
+        if not path:
+            return
+        
+        snapshot = None
+        try:
+            snapshot = scan_snapshot.ScanSnapshot(path)
+            results = snapshot.results
+        except (OSError, ValueError) as e:
+            if snapshot is not None:
+                snapshot.close()
+            messagebox.showerror(t('dlg_error'), t('dlg_open_results_failed', error=e))
+            return
+        
+        # Rows are decoded from the mapped file, so it stays open until replaced
+        self.live_updater.stop()
+        self._close_snapshot()
+        self.snapshot = snapshot
+        self.matched_files = results
+        
+        self.display_results()
+        self.progress_label.config(text=t('lbl_results_opened', count=f"{len(self.matched_files):,}", path=path))
+    
+    def _close_snapshot(self):
+        """Unmap the snapshot the previous results were opened from, if any"""
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+    
     def delete_selected(self):
         """Delete selected files"""
         selected_files = []
+        selected_rows = {}  # filepath -> row index in the result store
         for item in self.file_tree.get_children():
-            if self.file_tree.item(item, 'text') == '☑':
+            if self.file_tree.item(item, 'text') == '☑' and item.isdigit():
                 filepath = self.file_tree.item(item, 'values')[3]
                 selected_files.append(filepath)
+                selected_rows[filepath] = int(item)
         
         if not selected_files:
             messagebox.showinfo(t('dlg_no_selection_title'), t('dlg_no_selection'))
             return
         
         # Calculate total size to delete
-        total_size = 0
-        for filepath in selected_files:
-            for f in self.matched_files:
-                if f['path'] == filepath:
-                    total_size += f['size']
-                    break
+        total_size = sum(self.matched_files.sizes[row] for row in selected_rows.values())
         
         size_str = SizeFilter.format_size(total_size)
         
@@ -550,7 +644,10 @@ class SizeFilterTab(ttk.Frame):
                 messagebox.showinfo(t('dlg_success'), "\n\n".join(messages))
             
             # Remove deleted and skipped files from list and refresh display
-            deleted_paths = set(selected_files) - {f for f, _ in failed}
-            self.matched_files = [f for f in self.matched_files 
-                                if f['path'] not in deleted_paths]
+            failed_paths = {os.path.normpath(f) for f, _ in failed}
+            keep = [True] * len(self.matched_files)
+            for filepath, row in selected_rows.items():
+                if os.path.normpath(filepath) not in failed_paths:
+                    keep[row] = False
+            self.matched_files = self.matched_files.filter(keep)
             self.display_results()
@@ -42,6 +42,8 @@ TRANSLATIONS = {
         'btn_deselect_all': 'Bỏ Chọn Tất Cả',
         'btn_delete_selected': 'Xóa Đã Chọn',
         'btn_auto_select': 'Tự Động Chọn (Giữ Mới Nhất)',
+        'btn_save_results': 'Lưu Kết Quả',
+        'btn_open_results': 'Mở Kết Quả',
         
         # File search tab
         'lbl_search_scope': 'Phạm Vi Tìm Kiếm',
@@ -73,6 +75,9 @@ TRANSLATIONS = {
         'lbl_no_duplicates': 'Chưa tìm thấy file trùng lặp',
         'lbl_found_groups': 'Tìm thấy {groups} nhóm trùng lặp với {files} file tổng cộng',
         'lbl_found_duplicates': 'Tìm thấy {groups} nhóm trùng lặp ({files} file). Dung lượng có thể giải phóng: {size}',
+        'lbl_overlap_skipped': 'Bỏ qua trùng phạm vi: {roots} thư mục gốc, {dirs} thư mục, {files} file',
+        'lbl_mounts_skipped': 'Bỏ qua {count} điểm gắn kết: {mounts}',
+        'lbl_hardlinks': '(+{count} liên kết cứng)',
         
         # Size filter
         'lbl_files_found': 'File Tìm Thấy',
@@ -107,6 +112,7 @@ TRANSLATIONS = {
         
         # Progress messages
         'progress_scanning': 'Đang quét: {path}',
+        'progress_rate': '{files} files/s, {size}/s',
         'progress_found_files': 'Tìm thấy {count} file...',
         'progress_grouping': 'Đang nhóm theo kích thước...',
         'progress_quick_hash': 'Đang tính quick hash ({current}/{total})...',
@@ -116,6 +122,7 @@ TRANSLATIONS = {
         'progress_found_size': 'Tìm thấy {count} file. Tổng dung lượng: {size}',
         'progress_no_match': 'Không tìm thấy file phù hợp',
         'progress_quick_compare': 'So sánh nhanh',
+        'progress_partial_compare': 'So sánh từng phần',
         'progress_detailed_check': 'Kiểm tra chi tiết',
         
         # Messages
@@ -142,6 +149,11 @@ TRANSLATIONS = {
         'dlg_error': 'Lỗi',
         'dlg_info': 'Thông báo',
         'dlg_warning': 'Cảnh báo',
+        'dlg_scan_results': 'Kết quả quét',
+        'dlg_no_results': 'Chưa có kết quả để lưu',
+        'dlg_open_results_failed': 'Không thể mở kết quả: {error}',
+        'lbl_results_saved': 'Đã lưu {count} file vào {path}',
+        'lbl_results_opened': 'Đã mở {count} file từ {path}',
         
         # Total/Selected labels
         'lbl_total_selected': 'Tổng: {total_count} file, {total_size} | Chọn: {sel_count} file, {sel_size}',
@@ -245,6 +257,8 @@ TÍNH NĂNG AN TOÀN:
         'btn_deselect_all': 'Deselect All',
         'btn_delete_selected': 'Delete Selected',
         'btn_auto_select': 'Auto Select (Keep Newest)',
+        'btn_save_results': 'Save Results',
+        'btn_open_results': 'Open Results',
         
         # File search tab
         'lbl_search_scope': 'Search Scope',
@@ -276,6 +290,9 @@ TÍNH NĂNG AN TOÀN:
         'lbl_no_duplicates': 'No duplicate files found',
         'lbl_found_groups': 'Found {groups} duplicate groups with {files} files total',
         'lbl_found_duplicates': 'Found {groups} duplicate groups ({files} files). Space to free: {size}',
+        'lbl_overlap_skipped': 'Skipped overlaps: {roots} roots, {dirs} folders, {files} files',
+        'lbl_mounts_skipped': 'Skipped {count} mounts: {mounts}',
+        'lbl_hardlinks': '(+{count} hardlinks)',
         
         # Size filter
         'lbl_files_found': 'Files Found',
@@ -310,6 +327,7 @@ TÍNH NĂNG AN TOÀN:
         
         # Progress messages
         'progress_scanning': 'Scanning: {path}',
+        'progress_rate': '{files} files/s, {size}/s',
         'progress_found_files': 'Found {count} files...',
         'progress_grouping': 'Grouping by size...',
         'progress_quick_hash': 'Calculating quick hash ({current}/{total})...',
@@ -319,6 +337,7 @@ TÍNH NĂNG AN TOÀN:
         'progress_found_size': 'Found {count} files. Total size: {size}',
         'progress_no_match': 'No matching files found',
         'progress_quick_compare': 'Quick compare',
+        'progress_partial_compare': 'Partial compare',
         'progress_detailed_check': 'Detailed check',
         
         # Messages
@@ -345,6 +364,11 @@ TÍNH NĂNG AN TOÀN:
         'dlg_error': 'Error',
         'dlg_info': 'Information',
         'dlg_warning': 'Warning',
+        'dlg_scan_results': 'Scan results',
+        'dlg_no_results': 'There are no results to save yet',
+        'dlg_open_results_failed': 'Cannot open results: {error}',
+        'lbl_results_saved': 'Saved {count} files to {path}',
+        'lbl_results_opened': 'Opened {count} files from {path}',
         
         # Total/Selected labels
         'lbl_total_selected': 'Total: {total_count} files, {total_size} | Selected: {sel_count} files, {sel_size}',
@@ -9,6 +9,7 @@ from tkinter import ttk
 import sys
 import os
 import json
+import multiprocessing
 
 # Try to use ttkbootstrap for modern UI
 try:
@@ -394,6 +395,15 @@ class StorageManagerApp(ttkb.Window if USE_BOOTSTRAP else tk.Tk):
                         f"Cache auto-cleanup: removed {total:,} old entries"))
                 
                 cache.close()
+                
+                # Drop directory snapshots not refreshed in 30+ days (the
+                # database is only created by scans that use it)
+                from utils.directory_index import DirectoryIndex
+                if (getattr(config, 'USE_DIRECTORY_INDEX', False) or
+                        os.path.exists(DirectoryIndex.default_path())):
+                    index = DirectoryIndex()
+                    index.cleanup_stale(max_age_days=30)
+                    index.close()
             except Exception:
                 pass  # Silent failure - don't bother user
         
@@ -535,4 +545,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Needed by the packaged exe: sharded scans start worker processes
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,20 @@
+"""
+Shared test setup
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def app_data(tmp_path, monkeypatch):
+    """Keep caches (hash_cache.db, directory index) out of the user's AppData"""
+    path = tmp_path / 'appdata'
+    path.mkdir()
+    monkeypatch.setenv('APPDATA', str(path))
+    return path
@@ -0,0 +1,128 @@
+"""
+Tests for utils.byte_compare.compare_files
+"""
+
+import os
+import threading
+
+import pytest
+
+import config
+from utils import byte_compare
+from utils.byte_compare import compare_files
+from utils.hash_calculator import HashCalculator
+
+CHUNK = 4096
+
+
+def make(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def differing_at(data, offset):
+    changed = bytearray(data)
+    changed[offset] ^= 0xFF
+    return bytes(changed)
+
+
+@pytest.fixture
+def content():
+    return os.urandom(4 * CHUNK)
+
+
+def test_split_on_differing_chunk(tmp_path, content):
+    paths = [
+        make(tmp_path, 'a', content),
+        make(tmp_path, 'b', differing_at(content, 2 * CHUNK + 10)),  # Third chunk
+        make(tmp_path, 'c', content),
+    ]
+
+    identical, bytes_read = compare_files(paths, 'xxh3_128', chunk_size=CHUNK)
+
+    assert identical == [(HashCalculator.calculate_file_hash(paths[0], 'xxh3_128'), [0, 2])]
+    # b is read up to and including the chunk that differs, never past it
+    assert bytes_read == 2 * len(content) + 3 * CHUNK
+
+
+def test_split_into_several_sets(tmp_path, content):
+    other = differing_at(content, 0)
+    paths = [make(tmp_path, name, data) for name, data in
+             (('a', content), ('b', other), ('c', content), ('d', other), ('e', differing_at(content, 1)))]
+
+    identical, _ = compare_files(paths, 'xxh64', chunk_size=CHUNK)
+
+    assert sorted(indices for _, indices in identical) == [[0, 2], [1, 3]]
+    for digest, indices in identical:
+        assert digest == HashCalculator.calculate_file_hash(paths[indices[0]], 'xxh64')
+
+
+def test_eof_together_with_partial_last_chunk(tmp_path):
+    data = os.urandom(3 * CHUNK + 123)
+    paths = [make(tmp_path, 'a', data), make(tmp_path, 'b', data)]
+
+    identical, bytes_read = compare_files(paths, 'sha256', chunk_size=CHUNK)
+
+    assert identical == [(HashCalculator.calculate_file_hash(paths[0], 'sha256'), [0, 1])]
+    assert bytes_read == 2 * len(data)
+
+
+def test_difference_in_last_byte(tmp_path, content):
+    paths = [make(tmp_path, 'a', content), make(tmp_path, 'b', differing_at(content, len(content) - 1))]
+
+    assert compare_files(paths, chunk_size=CHUNK) == ([], 2 * len(content))
+
+
+def test_empty_files(tmp_path):
+    paths = [make(tmp_path, 'a', b''), make(tmp_path, 'b', b'')]
+
+    identical, bytes_read = compare_files(paths, 'xxh64', chunk_size=CHUNK)
+
+    assert identical == [(HashCalculator.calculate_file_hash(paths[0], 'xxh64'), [0, 1])]
+    assert bytes_read == 0
+
+
+def test_unreadable_member_is_left_out(tmp_path, content):
+    paths = [make(tmp_path, 'a', content), str(tmp_path / 'missing'), make(tmp_path, 'c', content)]
+
+    identical, _ = compare_files(paths, chunk_size=CHUNK)
+
+    assert [indices for _, indices in identical] == [[0, 2]]
+
+
+def test_single_readable_file(tmp_path, content):
+    paths = [make(tmp_path, 'a', content), str(tmp_path / 'missing')]
+
+    assert compare_files(paths, chunk_size=CHUNK) == ([], 0)
+
+
+def test_group_larger_than_budget(tmp_path, content, monkeypatch):
+    monkeypatch.setattr(config, 'COMPARE_MAX_OPEN_FILES', 3)
+    paths = [make(tmp_path, str(i), content) for i in range(4)]
+
+    with pytest.raises(ValueError):
+        compare_files(paths, chunk_size=CHUNK)
+
+
+def test_waits_for_open_file_budget(tmp_path, content, monkeypatch):
+    monkeypatch.setattr(config, 'COMPARE_MAX_OPEN_FILES', 3)
+    paths = [make(tmp_path, 'a', content), make(tmp_path, 'b', content)]
+    results = []
+
+    # Another comparison holds 2 of the 3 files
+    byte_compare._open_files.acquire(2, 3)
+    try:
+        worker = threading.Thread(target=lambda: results.append(compare_files(paths, chunk_size=CHUNK)))
+        worker.start()
+        worker.join(0.2)
+        assert worker.is_alive() and not results
+    finally:
+        byte_compare._open_files.release(2)
+    worker.join(5)
+
+    assert not worker.is_alive()
+    assert [indices for _, indices in results[0][0]] == [[0, 1]]
+    # The budget is returned afterwards
+    byte_compare._open_files.acquire(3, 3)
+    byte_compare._open_files.release(3)
@@ -0,0 +1,80 @@
+"""
+Tests for replaying directory listings from DirectoryIndex
+"""
+
+import os
+import time
+
+import pytest
+
+from utils.directory_index import DirectoryIndex
+from utils.exclusion_rules import ExclusionRules
+from utils.file_scanner import FileScanner
+
+AN_HOUR_AGO = time.time() - 3600
+
+
+def age(path, when=AN_HOUR_AGO):
+    """Move a directory's mtime out of the racy window so its listing is stored"""
+    os.utime(path, (when, when))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'tree'
+    for directory in ('a/b', 'c'):
+        (root / directory).mkdir(parents=True)
+    for name, size in (('one', 1), ('a/two', 2), ('a/b/three', 3), ('c/four', 4)):
+        (root / name).write_bytes(b'x' * size)
+    for directory in ('', 'a', 'a/b', 'c'):
+        age(root / directory)
+    return root
+
+
+def scan(tree):
+    """{relative path: (size, mtime_ns)} and the scanner's stats"""
+    scanner = FileScanner(workers=1, use_index=True, exclusions=ExclusionRules(), negative_cache=False)
+    found = {os.path.relpath(path, tree): (stat.st_size, stat.st_mtime_ns)
+             for path, stat in scanner.scan_directory_with_stat(str(tree))}
+    scanner.index.close()
+    return found, scanner.stats
+
+
+def test_warm_replay_matches_cold_scan(tree):
+    cold, cold_stats = scan(tree)
+    warm, warm_stats = scan(tree)
+
+    assert warm == cold
+    assert len(cold) == 4
+    assert (cold_stats.directories_listed, cold_stats.directories_replayed) == (4, 0)
+    assert (warm_stats.directories_listed, warm_stats.directories_replayed) == (0, 4)
+
+
+def test_mtime_change_invalidates(tree):
+    scan(tree)
+    (tree / 'a' / 'five').write_bytes(b'x' * 5)
+    os.remove(tree / 'c' / 'four')
+    # Changed, but still older than the racy window
+    age(tree / 'a', AN_HOUR_AGO + 60)
+    age(tree / 'c', AN_HOUR_AGO + 60)
+
+    found, stats = scan(tree)
+
+    assert sorted(found) == sorted(['one', os.path.join('a', 'two'), os.path.join('a', 'five'),
+                                    os.path.join('a', 'b', 'three')])
+    assert (stats.directories_listed, stats.directories_replayed) == (2, 2)
+
+
+def test_replay_refreshes_last_checked(tree):
+    scan(tree)
+    index = DirectoryIndex()
+    index.conn.execute('UPDATE directory_index SET last_checked = ?', (AN_HOUR_AGO - 60 * 86400,))
+    index.conn.commit()
+
+    assert index.get_listing(str(tree / 'a'), os.stat(tree / 'a').st_mtime_ns) is not None
+    index.flush()
+
+    # Only the replayed listing survives
+    assert index.cleanup_stale(max_age_days=30) == 3
+    assert index.get_listing(str(tree / 'a'), os.stat(tree / 'a').st_mtime_ns) is not None
+    index.close()
@@ -0,0 +1,122 @@
+"""
+Tests for ExclusionRules and pruning during traversal
+"""
+
+import os
+
+import pytest
+
+from utils.exclusion_rules import ExclusionRules
+from utils.file_scanner import FileScanner
+
+
+def kind(rules, path):
+    rule = rules.match(path)
+    return rule.kind if rule is not None else None
+
+
+def test_name():
+    rules = ExclusionRules(['node_modules'])
+
+    assert kind(rules, '/src/app/node_modules') == 'name'
+    assert kind(rules, 'C:\\src\\Node_Modules') == 'name'
+    assert kind(rules, '/src/node_modules_old') is None
+    assert rules.match('/elsewhere', name='NODE_MODULES') is not None
+
+
+def test_full_path():
+    rules = ExclusionRules(['/data/backups'])
+
+    assert kind(rules, '/data/backups') == 'path'
+    assert kind(rules, '/data/backups/') == 'path'
+    assert kind(rules, '/other/data/backups') is None
+    # Below it is pruned with it, and a root below it is excluded too
+    assert rules.excludes_root('/data/backups/2024')
+    assert not rules.excludes_root('/data/backups2')
+
+
+def test_suffix():
+    rules = ExclusionRules(['windows\\temp'])
+
+    assert kind(rules, 'C:\\Windows\\Temp') == 'suffix'
+    assert kind(rules, '/mnt/c/windows/temp') == 'suffix'
+    assert kind(rules, '/mnt/c/mywindows/temp') is None
+    assert kind(rules, '/tmp/temp') is None
+
+
+def test_glob():
+    rules = ExclusionRules(['*.photoslibrary', '*/cache/*'])
+
+    assert kind(rules, '/pics/Family.photoslibrary') == 'glob'
+    assert kind(rules, '/pics/photoslibrary') is None
+    assert kind(rules, '/home/u/cache/thumbs') == 'glob'
+    assert kind(rules, '/home/u/cache') is None
+
+
+def test_regex():
+    rules = ExclusionRules([r're:/\.cache/', 're:build-[0-9]+$'])
+
+    assert kind(rules, '/home/u/.cache/pip') == 'regex'
+    assert kind(rules, '/src/BUILD-42') == 'regex'
+    assert kind(rules, '/src/build-42x') is None
+
+
+@pytest.mark.parametrize('pattern, excluded, kept', [
+    ('(?i)secret', '/home/SECRET', '/home/public'),  # Global flags
+    (r'/(\w+)/\1$', '/x/same/same', '/x/same/other'),  # Numbered backreference
+    ('/(?P<d>[a-z])(?P=d)$', '/x/aa', '/x/ab'),  # Named group and reference
+])
+def test_regex_kept_out_of_combined_pattern(pattern, excluded, kept):
+    rules = ExclusionRules([r're:/(x)y$', 'node_modules'])
+
+    rule = rules.add('re:' + pattern)
+
+    assert rules.match(excluded) is rule
+    assert rules.match(kept) is None
+    # Rules around it keep working
+    assert kind(rules, '/a/xy') == 'regex'
+    assert rules.add('re:/other$') is not None
+    assert kind(rules, '/a/other') == 'regex'
+
+
+def test_invalid_regex():
+    rules = ExclusionRules(['re:(unclosed', 'node_modules'])
+
+    assert [rule.pattern for rule in rules.rules] == ['node_modules']
+    assert rules.add('re:[') is None
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'tree'
+    for directory in ('src/node_modules/pkg', 'src/lib', 'Family.photoslibrary', 'a/node_modules'):
+        (root / directory).mkdir(parents=True)
+        (root / directory / 'file').write_bytes(b'x')
+    return root
+
+
+def test_pruned_subtree_never_listed(tree, monkeypatch):
+    listed = []
+    real_scandir = os.scandir
+
+    def scandir(path):
+        listed.append(os.path.relpath(path, tree))
+        return real_scandir(path)
+    monkeypatch.setattr(os, 'scandir', scandir)
+    rules = ExclusionRules(['node_modules', '*.photoslibrary'])
+
+    scanner = FileScanner(workers=1, use_index=False, exclusions=rules, negative_cache=False)
+    found = sorted(os.path.relpath(path, tree) for path, _ in scanner.scan_directory_with_stat(str(tree)))
+
+    assert found == [os.path.join('src', 'lib', 'file')]
+    assert sorted(listed) == ['.', 'a', 'src', os.path.join('src', 'lib')]
+    assert rules.hit_counts() == [('node_modules', 2), ('*.photoslibrary', 1)]
+
+
+def test_hits_reset_per_scan(tree):
+    rules = ExclusionRules(['node_modules'])
+    scanner = FileScanner(workers=1, use_index=False, exclusions=rules, negative_cache=False)
+
+    for _ in range(2):
+        list(scanner.scan_directory(str(tree)))
+        assert rules.hit_counts() == [('node_modules', 2)]
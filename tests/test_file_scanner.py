@@ -0,0 +1,101 @@
+"""
+Tests for FileScanner's scandir traversal (one metadata call per file)
+"""
+
+import os
+
+import pytest
+
+from utils.exclusion_rules import ExclusionRules
+from utils.file_scanner import FileScanner
+
+
+def new_scanner(**options):
+    options.setdefault('workers', 1)
+    return FileScanner(use_index=False, exclusions=ExclusionRules(), negative_cache=False, **options)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'tree'
+    for directory in ('a/b', 'c', 'outside'):
+        (root / directory).mkdir(parents=True)
+    for name, size in (('one', 1), ('a/two', 20), ('a/b/three', 300), ('c/four', 4000),
+                       ('c/driver.sys', 5), ('outside/five', 5)):
+        (root / name).write_bytes(b'x' * size)
+    os.symlink(root / 'outside', root / 'a' / 'link')  # Symlinked directory
+    os.symlink(root / 'missing', root / 'c' / 'broken')
+    return root
+
+
+def walk_with_stat(root):
+    """What os.walk + os.stat finds, minus symlinks and excluded extensions"""
+    found = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            if os.path.isfile(path) and not name.endswith('.sys'):
+                found[path] = os.stat(path).st_size
+    return found
+
+
+def test_matches_walk_and_stat(tree):
+    scanner = new_scanner()
+
+    found = {path: stat.st_size for path, stat in scanner.scan_directory_with_stat(str(tree))}
+
+    assert found == walk_with_stat(tree)
+    assert str(tree / 'a' / 'link' / 'five') not in found
+
+
+def test_one_stat_per_file(tree, monkeypatch):
+    stat_calls = []
+    real_stat = os.stat
+
+    def counting_stat(path, *args, **kwargs):
+        stat_calls.append(path)
+        return real_stat(path, *args, **kwargs)
+    monkeypatch.setattr(os, 'stat', counting_stat)
+    scanner = new_scanner()
+
+    files = list(scanner.scan_directory(str(tree)))
+
+    # The root is stat-ed once; files are stat-ed through their DirEntry
+    assert stat_calls == [str(tree)]
+    assert scanner.stats.stats_performed == len(files) + 1
+    assert scanner.stats.directories_listed == 5
+
+
+def test_size_filter(tree):
+    scanner = new_scanner()
+
+    found = sorted(os.path.basename(path) for path in scanner.scan_directory(str(tree), 10, 1000))
+
+    assert found == ['three', 'two']
+    assert scanner.files_scanned == 5
+
+
+def test_names_only(tree):
+    scanner = new_scanner()
+
+    found = sorted(name for _, name in scanner.scan_names([str(tree)]))
+
+    assert found == ['five', 'four', 'one', 'three', 'two']
+    assert scanner.stats.stats_performed == 1  # Only the root
+
+
+def test_unreadable_directory_is_skipped(tree, monkeypatch):
+    real_scandir = os.scandir
+    denied = str(tree / 'a' / 'b')
+
+    def scandir(path):
+        if path == denied:
+            raise PermissionError(13, 'Permission denied', path)
+        return real_scandir(path)
+    monkeypatch.setattr(os, 'scandir', scandir)
+    scanner = new_scanner()
+
+    found = sorted(os.path.basename(path) for path in scanner.scan_directory(str(tree)))
+
+    assert found == ['five', 'four', 'one', 'two']
+    assert scanner.stats.to_dict()['errors_by_errno'] == {'EACCES': 1}
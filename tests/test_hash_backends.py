@@ -0,0 +1,73 @@
+"""
+Tests for resolving HASH_ALGORITHM = 'auto' and keeping the choice across runs
+"""
+
+import pytest
+
+import config
+from core.duplicate_finder import DuplicateFinder
+from utils import hash_backends
+
+
+@pytest.fixture
+def fastest(monkeypatch):
+    """Set the backend the next benchmark finds fastest; counts benchmarks run"""
+    state = {'name': 'xxh3_128', 'runs': 0}
+
+    def benchmark(sample_size=None, rounds=3):
+        state['runs'] += 1
+        return {backend.name: 2.0 if backend.name == state['name'] else 1.0
+                for backend in hash_backends.backends()}
+    monkeypatch.setattr(hash_backends, 'benchmark', benchmark)
+    monkeypatch.setattr(hash_backends, '_fastest', None)
+    monkeypatch.setattr(config, 'HASH_ALGORITHM', 'auto')
+    return state
+
+
+def new_process():
+    """Forget the per-process benchmark result, as a restart would"""
+    hash_backends._fastest = None
+
+
+def test_auto_picks_fastest_collision_safe(fastest):
+    fastest['name'] = 'xxh64'  # 64-bit: never picked
+
+    assert hash_backends.resolve_algorithm() not in ('xxh64', 'xxh3_64')
+    fastest['name'] = 'sha256'
+    new_process()
+    assert hash_backends.resolve_algorithm() == 'sha256'
+
+
+def test_previous_choice_is_reused(fastest):
+    assert hash_backends.resolve_algorithm('auto', previous='blake2b') == 'blake2b'
+    assert fastest['runs'] == 0
+    # Unknown or not collision-safe: benchmarked instead
+    new_process()
+    assert hash_backends.resolve_algorithm('auto', previous='gone') == 'xxh3_128'
+    new_process()
+    assert hash_backends.resolve_algorithm('auto', previous='xxh64') == 'xxh3_128'
+
+
+def test_choice_stored_with_hash_cache(fastest):
+    assert DuplicateFinder()._resolve_algorithm() == 'xxh3_128'
+
+    # Another run benchmarks differently: the stored choice is kept
+    new_process()
+    fastest['name'] = 'sha256'
+    assert DuplicateFinder()._resolve_algorithm() == 'xxh3_128'
+    assert fastest['runs'] == 1
+
+
+def test_choice_renewed_when_setting_changes(fastest, monkeypatch):
+    assert DuplicateFinder()._resolve_algorithm() == 'xxh3_128'
+
+    monkeypatch.setattr(config, 'HASH_ALGORITHM', 'blake2b')
+    assert DuplicateFinder()._resolve_algorithm() == 'blake2b'
+
+    # Back to 'auto': benchmarked again
+    monkeypatch.setattr(config, 'HASH_ALGORITHM', 'auto')
+    new_process()
+    fastest['name'] = 'sha256'
+    assert DuplicateFinder()._resolve_algorithm() == 'sha256'
+    new_process()
+    assert DuplicateFinder()._resolve_algorithm() == 'sha256'
@@ -0,0 +1,129 @@
+"""
+Tests for HashCache.rename_tree and HashCache.remove_tree
+"""
+
+import os
+
+import pytest
+
+from utils.hash_cache import HashCache
+
+
+def write(path, content=b'data'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def restore(path, stat):
+    """Recreate a file with the size and mtime the cache recorded for it"""
+    write(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HashCache(str(tmp_path / 'hash_cache.db'))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def files(tmp_path, cache):
+    """Cached files in and below root/a, plus siblings whose names start like it"""
+    root = tmp_path / 'root'
+    paths = {
+        'a': write(str(root / 'a' / 'f1')),
+        'a/b': write(str(root / 'a' / 'b' / 'f2')),
+        'a/b/c': write(str(root / 'a' / 'b' / 'c' / 'f3')),
+        'ab': write(str(root / 'ab' / 'f4')),  # Same prefix, not below a
+        'a_b': write(str(root / 'a_b' / 'f5')),  # '_' is a LIKE wildcard
+        'a%': write(str(root / 'a%' / 'f6')),  # So is '%'
+    }
+    for key, path in paths.items():
+        cache.update_cache(path, f'quick-{key}', f'full-{key}')
+    cache.flush()
+    return str(root), paths
+
+
+def test_remove_tree(cache, files):
+    root, paths = files
+
+    cache.remove_tree(os.path.join(root, 'a'))
+    cache.flush()
+
+    for key in ('a', 'a/b', 'a/b/c'):
+        assert cache.get_cached_hash(paths[key]) is None
+    for key in ('ab', 'a_b', 'a%'):
+        assert cache.get_cached_hash(paths[key]) == (f'quick-{key}', f'full-{key}')
+
+
+def test_remove_tree_trailing_separator(cache, files):
+    root, paths = files
+
+    cache.remove_tree(os.path.join(root, 'a', 'b') + os.sep)
+    cache.flush()
+
+    assert cache.get_cached_hash(paths['a']) == ('quick-a', 'full-a')
+    assert cache.get_cached_hash(paths['a/b/c']) is None
+
+
+def test_rename_tree(cache, files):
+    root, paths = files
+    old_dir = os.path.join(root, 'a')
+    new_dir = os.path.join(root, 'moved')
+    os.rename(old_dir, new_dir)
+
+    cache.rename_tree(old_dir, new_dir)
+    cache.flush()
+
+    assert cache.get_cached_hash(os.path.join(new_dir, 'f1')) == ('quick-a', 'full-a')
+    assert cache.get_cached_hash(os.path.join(new_dir, 'b', 'f2')) == ('quick-a/b', 'full-a/b')
+    assert cache.get_cached_hash(os.path.join(new_dir, 'b', 'c', 'f3')) == ('quick-a/b/c', 'full-a/b/c')
+    for key in ('ab', 'a_b', 'a%'):
+        assert cache.get_cached_hash(paths[key]) == (f'quick-{key}', f'full-{key}')
+
+    # Nothing is left under the old path
+    stat = os.stat(os.path.join(new_dir, 'f1'))
+    restore(paths['a'], stat)
+    assert cache.get_cached_hash(paths['a']) is None
+
+
+def test_rename_tree_replaces_destination(cache, files, tmp_path):
+    root, paths = files
+    old_dir = os.path.join(root, 'a', 'b')
+    new_dir = os.path.join(root, 'ab')
+    # The destination's old files were cached before it was replaced
+    stale = write(os.path.join(new_dir, 'c', 'stale'))
+    cache.update_cache(stale, 'quick-stale', 'full-stale')
+    cache.flush()
+    stats = {path: os.stat(path) for path in (paths['ab'], stale)}
+    os.rename(new_dir, str(tmp_path / 'trash'))
+    os.rename(old_dir, new_dir)
+
+    cache.rename_tree(old_dir, new_dir)
+    cache.flush()
+
+    assert cache.get_cached_hash(os.path.join(new_dir, 'f2')) == ('quick-a/b', 'full-a/b')
+    assert cache.get_cached_hash(os.path.join(new_dir, 'c', 'f3')) == ('quick-a/b/c', 'full-a/b/c')
+    # Same name, size and mtime as the replaced files, but not their hashes
+    for path, stat in stats.items():
+        restore(path, stat)
+        assert cache.get_cached_hash(path) is None
+    assert cache.get_cached_hash(paths['a']) == ('quick-a', 'full-a')
+
+
+def test_rename_file_then_tree(cache, files):
+    root, paths = files
+    old_path = paths['a/b']
+    new_path = os.path.join(root, 'a', 'b', 'renamed')
+    os.rename(old_path, new_path)
+    cache.rename_entry(old_path, new_path)
+    new_dir = os.path.join(root, 'z')
+    os.rename(os.path.join(root, 'a'), new_dir)
+
+    cache.rename_tree(os.path.join(root, 'a'), new_dir)
+    cache.flush()
+
+    assert cache.get_cached_hash(os.path.join(new_dir, 'b', 'renamed')) == ('quick-a/b', 'full-a/b')
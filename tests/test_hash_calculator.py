@@ -0,0 +1,43 @@
+"""
+Tests for HashCalculator.calculate_small_file_hash
+"""
+
+import os
+
+import pytest
+
+from utils.hash_calculator import HashCalculator
+
+
+@pytest.fixture
+def small_file(tmp_path):
+    path = tmp_path / 'small'
+    path.write_bytes(os.urandom(10_000))
+    return str(path)
+
+
+@pytest.mark.skipif(not hasattr(os, 'preadv'), reason='preadv only')
+def test_short_reads(small_file, monkeypatch):
+    real_preadv = os.preadv
+    calls = []
+
+    def short_preadv(fd, buffers, offset):
+        calls.append(offset)
+        return real_preadv(fd, [buffers[0][:1000]], offset)
+    monkeypatch.setattr(os, 'preadv', short_preadv)
+
+    digest = HashCalculator.calculate_small_file_hash(small_file, 10_000, 'xxh3_128')
+
+    assert digest == HashCalculator.calculate_file_hash(small_file, 'xxh3_128')
+    assert calls == list(range(0, 10_001, 1000))
+
+
+@pytest.mark.parametrize('scanned_size', [9_000, 11_000])
+def test_size_changed_since_scan(small_file, scanned_size):
+    digest = HashCalculator.calculate_small_file_hash(small_file, scanned_size, 'xxh64')
+
+    assert digest == HashCalculator.calculate_file_hash(small_file, 'xxh64')
+
+
+def test_missing_file(tmp_path):
+    assert HashCalculator.calculate_small_file_hash(str(tmp_path / 'missing'), 10, 'xxh64') is None
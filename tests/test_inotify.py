@@ -0,0 +1,168 @@
+"""
+Tests for InotifyWatcher._parse on synthetic event buffers
+"""
+
+import os
+import struct
+
+import pytest
+
+from utils import inotify
+from utils.inotify import (IN_ATTRIB, IN_CLOSE_WRITE, IN_CREATE, IN_DELETE, IN_IGNORED,
+                           IN_ISDIR, IN_MOVED_FROM, IN_MOVED_TO, IN_Q_OVERFLOW, InotifyWatcher)
+
+pytestmark = pytest.mark.skipif(not inotify.HAS_INOTIFY, reason='inotify is Linux only')
+
+
+def event(wd, mask, name='', cookie=0):
+    """One raw inotify record; the name is NUL-padded like the kernel does"""
+    encoded = os.fsencode(name)
+    if encoded:
+        encoded += b'\0' * (16 - len(encoded) % 16)
+    return struct.pack('iIII', wd, mask, cookie, len(encoded)) + encoded
+
+
+def kinds(events):
+    return [(e.kind, e.path, e.old_path) for e in events]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'watched'
+    (root / 'sub' / 'deep').mkdir(parents=True)
+    (root / 'other').mkdir()
+    return str(root)
+
+
+@pytest.fixture
+def watcher(tree):
+    watcher = InotifyWatcher(lambda events: None)
+    watcher.watch_tree(tree)
+    yield watcher
+    watcher.stop()
+
+
+def wd_of(watcher, path):
+    return watcher._watches[path]
+
+
+def test_file_events(watcher, tree):
+    wd = wd_of(watcher, tree)
+    data = (event(wd, IN_CREATE, 'a.txt') +
+            event(wd, IN_CLOSE_WRITE, 'a.txt') +
+            event(wd, IN_ATTRIB, 'b.txt') +
+            event(wd, IN_DELETE, 'c.txt'))
+
+    assert kinds(watcher._parse(data)) == [
+        ('created', os.path.join(tree, 'a.txt'), None),
+        ('modified', os.path.join(tree, 'a.txt'), None),
+        ('modified', os.path.join(tree, 'b.txt'), None),
+        ('deleted', os.path.join(tree, 'c.txt'), None),
+    ]
+
+
+def test_name_padding_and_long_names(watcher, tree):
+    wd = wd_of(watcher, tree)
+    name = 'x' * 16  # Exactly one padding block: no NUL inside the name itself
+    data = event(wd, IN_CREATE, name) + event(wd, IN_CREATE, 'tên tệp.txt')
+
+    assert [e.path for e in watcher._parse(data)] == [
+        os.path.join(tree, name),
+        os.path.join(tree, 'tên tệp.txt'),
+    ]
+
+
+def test_attrib_on_directory_is_ignored(watcher, tree):
+    data = event(wd_of(watcher, tree), IN_ATTRIB | IN_ISDIR, 'sub')
+
+    assert watcher._parse(data) == []
+
+
+def test_rename_pair_across_directories(watcher, tree):
+    sub = os.path.join(tree, 'sub')
+    data = (event(wd_of(watcher, tree), IN_MOVED_FROM, 'a.txt', cookie=7) +
+            event(wd_of(watcher, sub), IN_MOVED_TO, 'b.txt', cookie=7))
+
+    assert kinds(watcher._parse(data)) == [
+        ('moved', os.path.join(sub, 'b.txt'), os.path.join(tree, 'a.txt')),
+    ]
+
+
+def test_unpaired_moves(watcher, tree):
+    wd = wd_of(watcher, tree)
+    data = (event(wd, IN_MOVED_FROM, 'gone.txt', cookie=1) +
+            event(wd, IN_MOVED_TO, 'arrived.txt', cookie=2))
+
+    # Moved in from outside = created, moved out = deleted (reported last)
+    assert kinds(watcher._parse(data)) == [
+        ('created', os.path.join(tree, 'arrived.txt'), None),
+        ('deleted', os.path.join(tree, 'gone.txt'), None),
+    ]
+
+
+def test_directory_rename_updates_watches(watcher, tree):
+    old_dir = os.path.join(tree, 'sub')
+    new_dir = os.path.join(tree, 'renamed')
+    deep_wd = wd_of(watcher, os.path.join(old_dir, 'deep'))
+    wd = wd_of(watcher, tree)
+    data = (event(wd, IN_MOVED_FROM | IN_ISDIR, 'sub', cookie=3) +
+            event(wd, IN_MOVED_TO | IN_ISDIR, 'renamed', cookie=3))
+
+    assert kinds(watcher._parse(data)) == [('dir_moved', new_dir, old_dir)]
+    assert old_dir not in watcher.watched
+    assert watcher._paths[deep_wd] == os.path.join(new_dir, 'deep')
+
+    # Later events of the moved directory resolve to its new path
+    later = watcher._parse(event(deep_wd, IN_CREATE, 'f'))
+    assert kinds(later) == [('created', os.path.join(new_dir, 'deep', 'f'), None)]
+
+
+def test_directory_moved_out_is_unwatched(watcher, tree):
+    sub = os.path.join(tree, 'sub')
+    data = event(wd_of(watcher, tree), IN_MOVED_FROM | IN_ISDIR, 'sub', cookie=4)
+
+    assert kinds(watcher._parse(data)) == [('dir_deleted', sub, None)]
+    assert not [path for path in watcher.watched if path.startswith(sub)]
+
+
+def test_created_directory_is_watched(watcher, tree):
+    new_dir = os.path.join(tree, 'new')
+    os.makedirs(os.path.join(new_dir, 'inner'))
+    data = event(wd_of(watcher, tree), IN_CREATE | IN_ISDIR, 'new')
+
+    assert kinds(watcher._parse(data)) == [('dir_created', new_dir, None)]
+    assert new_dir in watcher.watched
+    assert os.path.join(new_dir, 'inner') in watcher.watched
+
+
+def test_ignored_drops_watch(watcher, tree):
+    other = os.path.join(tree, 'other')
+    wd = wd_of(watcher, other)
+
+    assert watcher._parse(event(wd, IN_IGNORED)) == []
+    assert other not in watcher.watched
+    assert wd not in watcher._paths
+
+
+def test_unknown_descriptor_and_truncated_record(watcher, tree):
+    data = event(9999, IN_CREATE, 'x') + event(wd_of(watcher, tree), IN_CREATE, 'y')[:10]
+
+    assert watcher._parse(data) == []
+
+
+def test_overflow_rescans_changed_directories(watcher, tree):
+    other = os.path.join(tree, 'other')
+    sub = os.path.join(tree, 'sub')
+    # A change whose events were lost: other's mtime moves
+    stat = os.stat(other)
+    os.utime(other, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    data = event(-1, IN_Q_OVERFLOW) + event(wd_of(watcher, sub), IN_CREATE, 'f')
+
+    events = watcher._parse(data)
+
+    assert watcher.overflows == 1
+    assert kinds(events) == [
+        ('created', os.path.join(sub, 'f'), None),
+        ('rescan', other, None),
+        ('rescan', sub, None),
+    ]
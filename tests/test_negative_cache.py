@@ -0,0 +1,124 @@
+"""
+Tests for the scanner's negative cache of permission-denied and empty directories
+"""
+
+import errno
+import os
+import time
+
+import pytest
+
+from utils.exclusion_rules import ExclusionRules
+from utils.file_scanner import FileScanner
+
+AN_HOUR_AGO = time.time() - 3600
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """root with a file, a 'locked' directory holding a file and an old 'empty' directory"""
+    root = tmp_path / 'tree'
+    (root / 'locked').mkdir(parents=True)
+    (root / 'empty').mkdir()
+    (root / 'a').write_bytes(b'a')
+    (root / 'locked' / 'b').write_bytes(b'b')
+    os.chmod(root / 'locked', 0)
+    # Out of the racy window, so the empty directory can be remembered
+    for path in (root / 'locked', root / 'empty'):
+        os.utime(path, (AN_HOUR_AGO, AN_HOUR_AGO))
+    return root
+
+
+@pytest.fixture
+def listed(monkeypatch, tree):
+    """Names of the directories passed to os.scandir, which fails with EACCES for
+    mode 000 even though the tests may run as root"""
+    real_scandir = os.scandir
+    calls = []
+
+    def scandir(path):
+        calls.append(os.path.basename(path))
+        if not os.stat(path).st_mode & 0o777:
+            raise PermissionError(errno.EACCES, 'Permission denied', path)
+        return real_scandir(path)
+    monkeypatch.setattr(os, 'scandir', scandir)
+    return calls
+
+
+def scan(tree, **options):
+    scanner = FileScanner(workers=1, use_index=False, exclusions=ExclusionRules(), **options)
+    names = sorted(os.path.relpath(path, tree) for path, _ in scanner.scan_directory_with_stat(str(tree)))
+    return scanner, names
+
+
+def test_denied_directory_skipped_next_scan(tree, listed):
+    scan(tree)
+    listed.clear()
+
+    scanner, names = scan(tree)
+
+    assert names == ['a']
+    assert 'locked' not in listed
+    assert scanner.stats.directories_denied_skipped == 1
+
+
+def test_denied_directory_retried_after_chmod(tree, listed):
+    scan(tree)
+    os.chmod(tree / 'locked', 0o755)  # Moves the ctime only
+    listed.clear()
+
+    scanner, names = scan(tree)
+
+    assert names == ['a', os.path.join('locked', 'b')]
+    assert scanner.stats.directories_denied_skipped == 0
+    # Readable again: forgotten
+    listed.clear()
+    scan(tree)
+    assert 'locked' in listed
+
+
+def test_retry_denied_forces_retry(tree, listed):
+    scan(tree)
+    listed.clear()
+
+    scanner, names = scan(tree, retry_denied=True)
+
+    assert 'locked' in listed
+    assert scanner.stats.directories_denied_skipped == 0
+
+
+def test_empty_directory_skipped_until_changed(tree, listed):
+    scan(tree)
+    listed.clear()
+
+    scanner, _ = scan(tree)
+
+    assert 'empty' not in listed
+    assert scanner.stats.directories_empty_skipped == 1
+
+    (tree / 'empty' / 'new').write_bytes(b'new')
+    scanner, names = scan(tree)
+
+    assert os.path.join('empty', 'new') in names
+    assert scanner.stats.directories_empty_skipped == 0
+
+
+def test_recently_changed_empty_directory_not_remembered(tree, listed):
+    os.utime(tree / 'empty')  # Now: inside the racy window
+    scan(tree)
+    listed.clear()
+
+    scan(tree)
+
+    assert 'empty' in listed
+
+
+def test_disabled(tree, listed):
+    scan(tree, negative_cache=False)
+    scan(tree)
+    listed.clear()
+
+    scanner, _ = scan(tree, negative_cache=False)
+
+    assert {'locked', 'empty'} <= set(listed)
+    assert scanner.negative is None
@@ -0,0 +1,72 @@
+"""
+Tests for the parallel work-stealing walker (FileScanner workers > 1)
+"""
+
+import os
+import threading
+
+import pytest
+
+from utils.exclusion_rules import ExclusionRules
+from utils.file_scanner import FileScanner
+
+
+def new_scanner(workers, patterns=()):
+    return FileScanner(workers=workers, use_index=False, exclusions=ExclusionRules(patterns),
+                       negative_cache=False)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Uneven tree: one deep chain, one wide level, files at every depth"""
+    root = tmp_path / 'tree'
+    deep = root / 'deep'
+    for depth in range(12):
+        deep = deep / f'd{depth}'
+        deep.mkdir(parents=True)
+        (deep / 'file').write_bytes(b'x' * depth)
+    for index in range(40):
+        wide = root / 'wide' / f'w{index}'
+        (wide / 'skip').mkdir(parents=True)
+        (wide / 'skip' / 'file').write_bytes(b's')
+        for number in range(index % 4):
+            (wide / f'f{number}').write_bytes(b'x' * number)
+    return root
+
+
+def scan(tree, workers, patterns=()):
+    scanner = new_scanner(workers, patterns)
+    found = {path: stat.st_size for path, stat in scanner.scan_directory_with_stat(str(tree))}
+    return found, scanner
+
+
+@pytest.mark.parametrize('workers', [2, 8])
+def test_same_results_as_sequential(tree, workers):
+    sequential, sequential_scanner = scan(tree, 1)
+    parallel, parallel_scanner = scan(tree, workers)
+
+    assert parallel == sequential
+    assert len(parallel) == 12 + 60 + 40
+    assert parallel_scanner.files_scanned == sequential_scanner.files_scanned
+    assert parallel_scanner.stats.directories_listed == sequential_scanner.stats.directories_listed
+
+
+def test_same_results_with_exclusions(tree):
+    sequential, _ = scan(tree, 1, ['skip', 'd5'])
+    parallel, scanner = scan(tree, 4, ['skip', 'd5'])
+
+    assert parallel == sequential
+    assert len(parallel) == 5 + 60
+    assert dict(scanner.exclusions.hit_counts()) == {'skip': 40, 'd5': 1}
+
+
+def test_stopping_early_ends_workers(tree):
+    before = threading.active_count()
+    scanner = new_scanner(4)
+
+    entries = scanner.scan_directory(str(tree))
+    first = [next(entries) for _ in range(3)]
+    entries.close()
+
+    assert all(os.path.isfile(path) for path in first)
+    assert threading.active_count() == before
@@ -0,0 +1,121 @@
+"""
+Tests for DuplicateFinder._hash_partial_tiers
+"""
+
+import os
+
+import pytest
+
+import config
+from core.duplicate_finder import DuplicateFinder
+
+TIERS = [4096, 65536]
+SIZE = 200 * 1024  # Longer than every tier
+
+
+@pytest.fixture
+def finder(monkeypatch):
+    monkeypatch.setattr(config, 'PARTIAL_HASH_TIERS', TIERS)
+    monkeypatch.setattr(config, 'SMALL_FILE_THRESHOLD', 1024)
+    return DuplicateFinder(enable_cache=False)
+
+
+@pytest.fixture
+def make(tmp_path, finder):
+    """make(name, data) -> (dir_id, name) entry interned in the finder's scanner"""
+    dir_id = finder.scanner.directories.intern(str(tmp_path))
+
+    def make(name, data):
+        (tmp_path / name).write_bytes(data)
+        return (dir_id, name)
+    return make
+
+
+def differing_at(data, offset):
+    changed = bytearray(data)
+    changed[offset] ^= 0xFF
+    return bytes(changed)
+
+
+def groups(result):
+    """Result as {key length: sorted member names}, for groups that are still colliding"""
+    return sorted((len(key), sorted(name for _, name in entries)) for key, entries in result.items())
+
+
+def test_group_of_four(finder, make):
+    data = os.urandom(SIZE)
+    entries = [
+        make('a', data),
+        make('a2', data),
+        make('in_first', differing_at(data, 1000)),  # Inside tier 1
+        make('in_second', differing_at(data, 4096)),  # First byte of tier 2
+        make('past_tiers', differing_at(data, 100_000)),  # Outside every tier
+    ]
+
+    result = finder._hash_partial_tiers({(SIZE, 'q'): entries}, set())
+
+    # One hash per tier appended to the key; only the tiers can tell past_tiers apart
+    assert groups(result) == [(4, ['a', 'a2', 'past_tiers'])]
+    assert [(stat['prefix'], stat['files'], stat['eliminated']) for stat in finder.tier_stats] == [
+        (4096, 5, 1), (65536, 4, 1)]
+
+
+def test_tier_boundary(finder, make):
+    data = os.urandom(SIZE)
+    entries = [make('a', data), make('last_of_tier', differing_at(data, 4095)),
+               make('after_tier', differing_at(data, 65536))]
+
+    result = finder._hash_partial_tiers({(SIZE, 'q'): entries}, set())
+
+    assert groups(result) == [(4, ['a', 'after_tier'])]
+
+
+def test_group_of_two_eliminated(finder, make):
+    data = os.urandom(SIZE)
+    entries = [make('a', data), make('b', differing_at(data, 2000))]
+
+    assert finder._hash_partial_tiers({(SIZE, 'q'): entries}, set()) == {}
+
+
+def test_group_of_three_with_unreadable_member(finder, make, tmp_path):
+    data = os.urandom(SIZE)
+    entries = [make('a', data), make('gone', data), make('b', data)]
+    os.remove(tmp_path / 'gone')
+
+    result = finder._hash_partial_tiers({(SIZE, 'q'): entries}, set())
+
+    assert groups(result) == [(4, ['a', 'b'])]
+
+
+def test_unreadable_member_leaves_one(finder, make, tmp_path):
+    data = os.urandom(SIZE)
+    entries = [make('a', data), make('gone', data)]
+    os.remove(tmp_path / 'gone')
+
+    assert finder._hash_partial_tiers({(SIZE, 'q'): entries}, set()) == {}
+
+
+def test_groups_skip_tiers_they_fit_in(finder, make):
+    medium = 10_000  # Past tier 1, inside tier 2
+    data = os.urandom(medium)
+    small = os.urandom(4096)  # Not longer than tier 1: straight to the full hash
+    candidates = {
+        (medium, 'q1'): [make('m1', data), make('m2', data)],
+        (4096, 'q2'): [make('s1', small), make('s2', differing_at(small, 10))],
+    }
+
+    result = finder._hash_partial_tiers(candidates, set())
+
+    assert groups(result) == [(2, ['s1', 's2']), (3, ['m1', 'm2'])]
+
+
+def test_fully_cached_group_is_skipped(finder, make):
+    data = os.urandom(SIZE)
+    cached = [make('a', data), make('b', differing_at(data, 10))]
+    other = [make('c', data), make('d', data)]
+
+    result = finder._hash_partial_tiers({(SIZE, 'q1'): cached, (SIZE, 'q2'): other},
+                                        set(cached) | {other[0]})
+
+    assert result[(SIZE, 'q1')] == cached
+    assert groups(result) == [(2, ['a', 'b']), (4, ['c', 'd'])]
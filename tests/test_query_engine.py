@@ -0,0 +1,125 @@
+"""
+Tests for QueryEngine: one traversal feeding several queries
+"""
+
+import os
+
+import pytest
+
+from core.duplicate_finder import DuplicateFinder
+from core.file_type_filter import FileTypeFilter
+from core.query_engine import NameQuery, QueryEngine, SizeBucketQuery
+from core.size_filter import SizeFilter
+from utils.exclusion_rules import ExclusionRules
+from utils.file_scanner import FileScanner
+
+
+def new_scanner():
+    return FileScanner(workers=1, use_index=False, exclusions=ExclusionRules(), negative_cache=False)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'tree'
+    (root / 'a').mkdir(parents=True)
+    (root / 'b').mkdir()
+    files = {
+        'a/big.mp4': b'v' * 3000, 'b/big_copy.mp4': b'v' * 3000, 'a/photo.jpg': b'p' * 1500,
+        'b/photo.jpg': b'q' * 1500, 'a/notes.txt': b'n' * 10, 'b/small.png': b's' * 200,
+    }
+    for name, data in files.items():
+        (root / name).write_bytes(data)
+    os.link(root / 'a' / 'photo.jpg', root / 'b' / 'photo_link.jpg')
+    return root
+
+
+def paths(results):
+    return sorted(record.path for record in results)
+
+
+def by_hash(duplicates):
+    return sorted(sorted(record.path for record in files) for files in duplicates.values())
+
+
+@pytest.fixture
+def listed(monkeypatch):
+    """Directories passed to os.scandir"""
+    real_scandir = os.scandir
+    calls = []
+
+    def scandir(path):
+        calls.append(path)
+        return real_scandir(path)
+    monkeypatch.setattr(os, 'scandir', scandir)
+    return calls
+
+
+def test_single_pass_matches_separate_scans(tree, listed):
+    roots = [str(tree)]
+    size_filter = SizeFilter()
+    size_filter.scanner = new_scanner()
+    type_filter = FileTypeFilter()
+    type_filter.scanner = new_scanner()
+    separate_finder = DuplicateFinder(enable_cache=False)
+    separate_finder.scanner = new_scanner()
+    separate = (size_filter.find_files_by_size(roots, 'larger_than', 1, 'KB'),
+                type_filter.find_files_by_types(roots, {'images', 'videos'}),
+                separate_finder.find_duplicates(roots, min_size=100))
+    separate_listings = len(listed)
+    listed.clear()
+
+    finder = DuplicateFinder(enable_cache=False)
+    finder.scanner = new_scanner()
+    engine = QueryEngine(finder.scanner)
+    large = engine.add(SizeFilter.size_query('larger_than', 1, 'KB'))
+    media = engine.add(FileTypeFilter.type_query({'images', 'videos'}))
+    buckets = engine.add(SizeBucketQuery(min_size=100))
+    engine.run(roots)
+    duplicates = finder.find_duplicates_in(buckets)
+
+    assert paths(large.results) == paths(separate[0])
+    assert paths(media.results) == paths(separate[1])
+    assert sorted(record['group'] for record in media.results) == sorted(record['group'] for record in separate[1])
+    assert by_hash(duplicates) == by_hash(separate[2]) == [[str(tree / 'a' / 'big.mp4'),
+                                                           str(tree / 'b' / 'big_copy.mp4')]]
+    # One walk instead of three
+    assert separate_listings == 3 * len(listed) == 9
+
+
+def test_hardlinks_per_query(tree):
+    engine = QueryEngine(new_scanner())
+    media = engine.add(FileTypeFilter.type_query({'images'}))
+    buckets = engine.add(SizeBucketQuery(min_size=100))
+
+    engine.run([str(tree)])
+
+    # The filter sees the inode once, the bucketing every path of it (one per bucket)
+    linked = {str(tree / 'a' / 'photo.jpg'), str(tree / 'b' / 'photo_link.jpg')}
+    assert len(linked.intersection(paths(media.results))) == 1
+    assert len(media.results) == 3
+    [entries] = buckets.inode_entries.values()
+    assert sorted(name for _, name in entries) == ['photo.jpg', 'photo_link.jpg']
+    assert len(buckets.size_groups[1500]) == 2
+
+
+def test_size_ranges_per_query(tree):
+    engine = QueryEngine(new_scanner())
+    small = engine.add(SizeFilter.size_query('smaller_than', 500, 'B'))
+    large = engine.add(SizeFilter.size_query('larger_than', 2000, 'B'))
+
+    engine.run([str(tree)])
+
+    assert [os.path.basename(path) for path in paths(small.results)] == ['notes.txt', 'small.png']
+    assert [os.path.basename(path) for path in paths(large.results)] == ['big.mp4', 'big_copy.mp4']
+
+
+def test_names_only_run(tree):
+    scanner = new_scanner()
+    engine = QueryEngine(scanner)
+    query = engine.add(NameQuery(lambda name: name.endswith('.jpg')))
+
+    engine.run([str(tree)])
+
+    assert sorted(record.filename for record in query.results) == ['photo.jpg', 'photo.jpg', 'photo_link.jpg']
+    assert scanner.stats.stats_performed == 1  # The root only
+    assert [record.size for record in query.resolve()] == [1500, 1500, 1500]
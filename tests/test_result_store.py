@@ -0,0 +1,85 @@
+"""
+Tests for ColumnarResults sort, top-k and filter, with and without NumPy
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from utils import result_store
+from utils.path_table import DirectoryTable
+from utils.result_store import ColumnarResults
+
+# (path, size, modified, group)
+ROWS = [
+    ('/d1/a', 300, 5.0, 'video'),
+    ('/d2/b', 100, 1.0, 'image'),
+    ('/d3/c', 300, 3.0, 'image'),
+    ('/d1/d', 0, 4.0, None),
+    ('/d2/e', 5_000_000_000, 2.0, 'video'),  # Larger than 32 bits
+]
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'arrays'])
+def results(request, monkeypatch):
+    if request.param and not result_store.HAS_NUMPY:
+        pytest.skip('NumPy not installed')
+    monkeypatch.setattr(result_store, 'HAS_NUMPY', request.param)
+    results = ColumnarResults(DirectoryTable())
+    for path, size, modified, group in ROWS:
+        results.append(path, SimpleNamespace(st_size=size, st_mtime=modified, st_ctime=modified), group)
+    return results
+
+
+def names(results, indices=None):
+    if indices is None:
+        indices = range(len(results))
+    return [results.names[index] for index in indices]
+
+
+def test_rows(results):
+    record = results[-1]
+
+    assert (record.path, record.size, record.group) == ('/d2/e', 5_000_000_000, 'video')
+    assert results[3].group is None
+    assert [record.filename for record in results] == ['a', 'b', 'c', 'd', 'e']
+    assert results.sum() == 5_000_000_700
+
+
+def test_argsort_multiple_keys(results):
+    assert names(results, results.argsort('size')) == ['d', 'b', 'a', 'c', 'e']
+    # Ties keep their order; descending keeps it too
+    assert names(results, results.argsort('-size')) == ['e', 'a', 'c', 'b', 'd']
+    assert names(results, results.argsort('group', '-size')) == ['d', 'c', 'b', 'e', 'a']
+    assert names(results, results.argsort('-group', 'modified')) == ['e', 'a', 'b', 'c', 'd']
+
+
+def test_unsigned_columns_descending(results):
+    # dir_id is unsigned: /d1 -> 0, /d2 -> 1, /d3 -> 2
+    assert names(results, results.argsort('-dir_id', 'size')) == ['c', 'b', 'e', 'd', 'a']
+    assert names(results, results.top_k(2, 'dir_id')) == ['c', 'b']
+
+
+def test_top_k(results):
+    assert names(results, results.top_k(2)) == ['e', 'a']
+    assert names(results, results.top_k(2, largest=False)) == ['d', 'b']
+    assert names(results, results.top_k(10, 'modified')) == ['a', 'd', 'c', 'e', 'b']
+    assert list(results.top_k(0)) == []
+
+
+def test_filter(results):
+    filtered = results.filter(results.mask('size', 100, 1000))
+
+    assert names(filtered) == ['a', 'b', 'c']
+    assert filtered.group(2) == 'image'
+    assert filtered[0].path == '/d1/a'
+    assert names(results.filter(results.mask('modified', min_value=4.0))) == ['a', 'd']
+    assert len(results.filter(results.mask('size', min_value=10 ** 12))) == 0
+
+
+def test_sort_then_filter(results):
+    largest_first = results.sort('-size')
+    filtered = largest_first.filter(largest_first.mask('size', max_value=300))
+
+    assert names(filtered) == ['a', 'c', 'b', 'd']
+    assert [record.size for record in filtered] == [300, 300, 100, 0]
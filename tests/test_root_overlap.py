@@ -0,0 +1,82 @@
+"""
+Tests for collapsing overlapping scan roots and visiting each inode once
+"""
+
+import os
+
+import pytest
+
+from utils.exclusion_rules import ExclusionRules
+from utils.file_scanner import FileScanner
+
+
+def new_scanner(workers=1):
+    return FileScanner(workers=workers, use_index=False, exclusions=ExclusionRules(),
+                       negative_cache=False)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'tree'
+    (root / 'a' / 'b').mkdir(parents=True)
+    (root / 'c').mkdir()
+    for name in ('one', 'a/two', 'a/b/three', 'c/four'):
+        (root / name).write_bytes(name.encode())
+    return root
+
+
+def test_normalize_roots(tmp_path):
+    base = str(tmp_path)
+    a = os.path.join(base, 'a')
+
+    roots, skipped = FileScanner.normalize_roots([
+        os.path.join(a, 'b'), a + os.sep, os.path.join(base, 'ab'), os.path.join(a, '.'),
+        os.path.join(a, 'x', '..', 'c'),
+    ])
+
+    assert roots == [a, os.path.join(base, 'ab')]
+    assert skipped == [os.path.join(a, 'b'), os.path.join(a, '.'), os.path.join(a, 'x', '..', 'c')]
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_nested_roots_scanned_once(tree, workers):
+    scanner = new_scanner(workers)
+
+    found = [path for path, _ in scanner.scan_roots_with_stat([str(tree / 'a'), str(tree), str(tree / 'a')])]
+
+    assert sorted(found) == sorted(str(tree / name) for name in ('one', 'a/two', 'a/b/three', 'c/four'))
+    assert scanner.overlap_skipped['roots'] == 2
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_same_directory_through_another_path(tree, tmp_path, workers):
+    # A symlinked root reaches the same directories (same st_dev, st_ino)
+    os.symlink(tree / 'a', tmp_path / 'alias')
+    scanner = new_scanner(workers)
+
+    found = [path for path, _ in scanner.scan_roots_with_stat([str(tree), str(tmp_path / 'alias')])]
+
+    assert len(found) == 4
+    assert scanner.overlap_skipped == {'roots': 0, 'directories': 1, 'files': 0}
+
+
+def test_hardlinks_yielded_once(tree):
+    os.link(tree / 'one', tree / 'c' / 'one_link')
+    os.link(tree / 'one', tree / 'a' / 'b' / 'one_link')
+    scanner = new_scanner()
+
+    found = [path for path, _ in scanner.scan_roots_with_stat([str(tree)])]
+
+    assert len(found) == 4
+    assert sum(os.path.basename(path).startswith('one') for path in found) == 1
+    assert scanner.overlap_skipped['files'] == 2
+
+
+def test_hardlinks_kept_on_request(tree):
+    os.link(tree / 'one', tree / 'c' / 'one_link')
+    scanner = new_scanner()
+
+    found = [path for path, _ in scanner.scan_roots_with_stat([str(tree)], unique_inodes=False)]
+
+    assert len(found) == 5
+    assert scanner.overlap_skipped['files'] == 0
@@ -0,0 +1,113 @@
+"""
+Tests for saving and reopening .smscan snapshots
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from utils import scan_snapshot
+from utils.file_record import FileRecord
+from utils.path_table import DirectoryTable
+from utils.result_store import ColumnarResults
+from utils.scan_snapshot import ScanSnapshot, save_snapshot
+
+UNDECODABLE = b'caf\xe9.txt'.decode('utf-8', 'surrogateescape')  # Latin-1 name on Linux
+
+
+def stat(size, modified):
+    return SimpleNamespace(st_size=size, st_mtime=modified, st_ctime=modified + 0.5)
+
+
+@pytest.fixture
+def results():
+    results = ColumnarResults(DirectoryTable())
+    results.append('/home/u/a.jpg', stat(10, 1.25), 'images')
+    results.append('/home/u/docs/b.pdf', stat(5_000_000_000, 2.0), 'documents')
+    results.append('/srv/' + UNDECODABLE, stat(0, 3.0))
+    # Filtered down, so the source table has directories no row uses
+    results.append('/unused/c', stat(1, 1.0))
+    return results.filter([True, True, True, False])
+
+
+def rows(results):
+    return [(record.path, record.size, record.modified, record.created, record.group) for record in results]
+
+
+def test_results_round_trip(tmp_path, results):
+    path = str(tmp_path / 'scan.smscan')
+
+    assert save_snapshot(path, results, meta={'roots': ['/home', '/srv']}) == 3
+
+    with ScanSnapshot(path) as snapshot:
+        assert snapshot.row_count == 3
+        assert snapshot.meta == {'roots': ['/home', '/srv']}
+        assert not snapshot.has_duplicates
+        assert rows(snapshot.results) == rows(results)
+        assert list(snapshot.results.directories.paths) == ['/home/u', '/home/u/docs', '/srv']
+        # Reopened results sort and filter like the originals
+        reopened = snapshot.results
+        assert [reopened.names[index] for index in reopened.argsort('-size')] == ['b.pdf', 'a.jpg', UNDECODABLE]
+
+
+def test_records_and_duplicates_round_trip(tmp_path):
+    records = [FileRecord('/d/one', 1, 1.0, 1.0), FileRecord('/d/two', 2, 2.0, 2.0)]
+    first, second, third = (FileRecord(path, 100, 5.0, 5.0) for path in ('/x/a', '/y/a', '/z/a'))
+    first.hash = second.hash = third.hash = 'h1'
+    first.nlink, first.hardlinks = 2, ['/x/a_link']
+    duplicates = {'h1': [first, second, third],
+                  'h2': [FileRecord('/x/b', 7, 1.0, 1.0), FileRecord('/y/b', 7, 1.0, 1.0)]}
+    path = str(tmp_path / 'dups.smscan')
+
+    assert save_snapshot(path, records, duplicates) == 7
+
+    with ScanSnapshot(path) as snapshot:
+        assert snapshot.has_duplicates and snapshot.duplicate_count == 2
+        assert [record.path for record in snapshot.results][:2] == ['/d/one', '/d/two']
+        reopened = snapshot.duplicates()
+        h1 = reopened['h1']
+        assert [(record.path, record.size, record.hash) for record in h1] == [
+            ('/x/a', 100, 'h1'), ('/y/a', 100, 'h1'), ('/z/a', 100, 'h1')]
+        assert (h1[0].nlink, h1[0].hardlinks) == (2, ['/x/a_link'])
+        assert (h1[1].nlink, h1[1].hardlinks) == (None, [])
+        assert [record.path for record in reopened['h2']] == ['/x/b', '/y/b']
+    # Materialized records outlive the snapshot
+    assert h1[2].path == '/z/a'
+
+
+def test_empty_snapshot(tmp_path):
+    path = str(tmp_path / 'empty.smscan')
+
+    assert save_snapshot(path) == 0
+
+    with ScanSnapshot(path) as snapshot:
+        assert len(snapshot.results) == 0
+        assert snapshot.duplicates() == {}
+
+
+def test_unknown_sections_are_skipped(tmp_path, results, monkeypatch):
+    path = str(tmp_path / 'scan.smscan')
+    # A section this version doesn't know, written in place of the metadata
+    monkeypatch.setattr(scan_snapshot, 'META', b'XTRA')
+    save_snapshot(path, results, meta={'ignored': True})
+    monkeypatch.undo()
+
+    with ScanSnapshot(path) as snapshot:
+        assert snapshot.meta == {}
+        assert rows(snapshot.results) == rows(results)
+
+
+@pytest.mark.parametrize('damage, message', [
+    (lambda data: b'NOTASNAP' + data[8:], 'Not a scan snapshot'),
+    (lambda data: data[:-20], 'Truncated'),  # Inside the last section header
+    (lambda data: data[:scan_snapshot.HEADER.size], 'Truncated'),  # No sections
+    (lambda data: data[:8] + (scan_snapshot.VERSION + 1).to_bytes(4, 'little') + data[12:], 'newer'),
+    (lambda data: data[:10], 'Not a scan snapshot'),
+])
+def test_damaged_file(tmp_path, results, damage, message):
+    path = tmp_path / 'scan.smscan'
+    save_snapshot(str(path), results)
+    path.write_bytes(damage(path.read_bytes()))
+
+    with pytest.raises(ValueError, match=message):
+        ScanSnapshot(str(path))
@@ -0,0 +1,111 @@
+"""
+Tests for per-device sharding: plan_shards and ShardedScan worker processes
+"""
+
+import multiprocessing
+import os
+
+import pytest
+
+from utils.exclusion_rules import ExclusionRules
+from utils.file_scanner import FileScanner
+from utils.mounts import MountEntry, MountTable
+from utils.sharded_scan import ShardedScan, plan_shards
+
+
+@pytest.fixture
+def devices(monkeypatch):
+    """devices[path] = fake st_dev reported by os.stat for that directory"""
+    fake = {}
+    real_stat = os.stat
+
+    def stat(path, *args, **kwargs):
+        result = real_stat(path, *args, **kwargs)
+        device = fake.get(os.fspath(path))
+        if device is None:
+            return result
+        fields = list(result)
+        fields[2] = device  # st_dev
+        return os.stat_result(fields)
+    monkeypatch.setattr(os, 'stat', stat)
+    return fake
+
+
+@pytest.fixture
+def drives(tmp_path, devices):
+    """Two roots on different devices; c has a disk, a tmpfs and an excluded disk below it"""
+    paths = {}
+    for name in ('c', 'c/disk', 'c/ram', 'c/skip/disk', 'd'):
+        path = tmp_path / name
+        path.mkdir(parents=True)
+        paths[name] = str(path)
+    devices.update({paths['c']: 1, paths['d']: 2, paths['c/disk']: 3, paths['c/skip/disk']: 4,
+                    paths['c/ram']: 5})
+    mounts = MountTable([MountEntry('/dev/sdb1', paths['c/disk'], 'ext4'),
+                         MountEntry('tmpfs', paths['c/ram'], 'tmpfs'),
+                         MountEntry('/dev/sdc1', paths['c/skip/disk'], 'ext4')])
+    return paths, mounts
+
+
+def test_roots_grouped_by_device(drives, tmp_path, devices):
+    paths, _ = drives
+    other = tmp_path / 'other'
+    other.mkdir()
+    devices[str(other)] = 1
+
+    shards = plan_shards([paths['c'], paths['d'], str(other)], MountTable())
+
+    assert shards == [[paths['c'], str(other)], [paths['d']]]
+
+
+def test_storage_submounts_get_shards(drives):
+    paths, mounts = drives
+
+    shards = plan_shards([paths['c'], paths['d']], mounts, ExclusionRules(['skip']))
+
+    # The tmpfs is walked by c's worker, the excluded disk by nobody
+    assert shards == [[paths['c']], [paths['c/disk']], [paths['d']]]
+    assert plan_shards([paths['c']], mounts, ExclusionRules(['skip']),
+                       include_submounts=False) == [[paths['c']]]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    roots = []
+    for root in ('x', 'y'):
+        for directory in ('a', 'a/b', 'skip'):
+            path = tmp_path / root / directory
+            path.mkdir(parents=True)
+            for index in range(3):
+                (path / f'f{index}').write_bytes(b'x' * index)
+        roots.append(str(tmp_path / root))
+    return roots
+
+
+def new_scanner():
+    return FileScanner(workers=2, use_index=False, exclusions=ExclusionRules(['skip']),
+                       negative_cache=False)
+
+
+def test_workers_match_in_process_scan(tree):
+    expected = new_scanner()
+    in_process = {path: stat.st_size for path, stat in expected.scan_roots_with_stat(tree)}
+    scanner = new_scanner()
+    join = scanner.directories.join
+
+    found = {join(dir_id, name): stat.st_size
+             for dir_id, name, stat in ShardedScan(scanner, [[tree[0]], [tree[1]]]).run(min_size=1)}
+
+    assert found == {path: size for path, size in in_process.items() if size >= 1}
+    assert scanner.files_scanned == expected.files_scanned == 12
+    assert scanner.stats.directories_listed == expected.stats.directories_listed == 6
+    assert scanner.exclusions.hit_counts() == [('skip', 2)]
+
+
+def test_closing_stops_workers(tree):
+    entries = ShardedScan(new_scanner(), [[tree[0]], [tree[1]]], max_processes=1).run()
+
+    next(entries)
+    entries.close()
+
+    assert multiprocessing.active_children() == []
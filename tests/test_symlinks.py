@@ -0,0 +1,78 @@
+"""
+Tests for following symlinked directories with loop detection
+"""
+
+import os
+
+import pytest
+
+from utils.exclusion_rules import ExclusionRules
+from utils.file_scanner import FileScanner
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """
+    root/                       scanned
+        file
+        sub/file
+        to_ext -> ext/a         outside the root
+        to_ext_again -> ext/a   same target
+        to_root -> root         back into the root
+        broken -> missing
+    ext/a/file
+    ext/a/loop -> ext/a         cycle outside the root
+    ext/a/up -> ext             parent of a followed target
+    """
+    root = tmp_path / 'root'
+    ext = tmp_path / 'ext'
+    (root / 'sub').mkdir(parents=True)
+    (ext / 'a').mkdir(parents=True)
+    for path in (root / 'file', root / 'sub' / 'file', ext / 'a' / 'file', ext / 'other'):
+        path.write_bytes(b'x')
+    os.symlink(ext / 'a', root / 'to_ext')
+    os.symlink(ext / 'a', root / 'to_ext_again')
+    os.symlink(root, root / 'to_root')
+    os.symlink(tmp_path / 'missing', root / 'broken')
+    os.symlink(ext / 'a', ext / 'a' / 'loop')
+    os.symlink(ext, ext / 'a' / 'up')
+    return root
+
+
+def scan(root, workers=1, follow_symlinks=True):
+    scanner = FileScanner(workers=workers, use_index=False, exclusions=ExclusionRules(),
+                          negative_cache=False, follow_symlinks=follow_symlinks)
+    found = sorted(os.path.relpath(path, root) for path, _ in scanner.scan_roots_with_stat([str(root)]))
+    return found, scanner.stats
+
+
+def test_not_followed_by_default(tree):
+    found, stats = scan(tree, follow_symlinks=False)
+
+    assert found == ['file', os.path.join('sub', 'file')]
+    assert (stats.links_followed, stats.links_skipped, stats.links_broken) == (0, 0, 0)
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_each_target_once(tree, workers):
+    found, stats = scan(tree, workers)
+
+    # ext/a through one of its two links, ext through a's 'up' link; each once
+    via_link = [path for path in found if path.startswith('to_ext')]
+    prefix = via_link[0].split(os.sep)[0]
+    assert sorted(via_link) == sorted(os.path.join(prefix, *parts) for parts in
+                                      (('file',), ('up', 'other')))
+    assert [path for path in found if not path.startswith('to_ext')] == ['file', os.path.join('sub', 'file')]
+    # Followed: to_ext(_again) and up. Skipped: the other link to ext/a, loop
+    # and to_root; ext/a below up is a directory visited already, not a link
+    assert (stats.links_followed, stats.links_skipped, stats.links_broken) == (2, 3, 1)
+
+
+def test_link_root_walked_once(tree, tmp_path):
+    # A root given through a symlink: links back into it are not followed
+    os.symlink(tree, tmp_path / 'alias')
+
+    found, stats = scan(tmp_path / 'alias')
+
+    assert 'file' in found
+    assert not any(path.startswith('to_root') for path in found)
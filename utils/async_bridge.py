@@ -0,0 +1,65 @@
+"""
+Bounded hand-off from worker threads to an asyncio event loop
+"""
+
+import asyncio
+import threading
+from typing import Any, Optional
+
+import config
+
+
+class AsyncChannel:
+    """Bounded queue from worker threads to one asyncio consumer
+    
+    put() runs on a worker thread and blocks while maxsize items are waiting,
+    so a slow async consumer throttles the scan instead of letting results
+    pile up in memory. close() (from the consumer, e.g. on cancellation)
+    makes blocked and future put() calls return False so workers can stop.
+    """
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: Optional[int] = None):
+        """
+        Initialize channel
+        
+        Args:
+            loop: Event loop of the consumer
+            maxsize: Max items in flight (None = config.ASYNC_QUEUE_SIZE)
+        """
+        if maxsize is None:
+            maxsize = getattr(config, 'ASYNC_QUEUE_SIZE', 64)
+        self.loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = threading.Semaphore(max(1, maxsize))
+        self.closed = False
+    
+    def put(self, item: Any) -> bool:
+        """
+        Hand an item to the consumer (worker thread side, blocks when full)
+        
+        Returns:
+            True if delivered, False if the channel was closed
+        """
+        while not self.closed:
+            if self._slots.acquire(timeout=0.1):
+                if self.closed:
+                    self._slots.release()
+                    return False
+                try:
+                    self.loop.call_soon_threadsafe(self._queue.put_nowait, item)
+                except RuntimeError:
+                    # Event loop already closed
+                    self.closed = True
+                    return False
+                return True
+        return False
+    
+    async def get(self) -> Any:
+        """Wait for the next item (consumer side)"""
+        item = await self._queue.get()
+        self._slots.release()
+        return item
+    
+    def close(self):
+        """Stop accepting items; blocked producers return False"""
+        self.closed = True
@@ -0,0 +1,136 @@
+"""
+Lockstep byte comparison of same-size files
+"""
+
+import threading
+from typing import List, Optional, Tuple
+
+import config
+from utils.hash_calculator import HashCalculator
+
+
+class _OpenFileBudget:
+    """Files held open by all comparisons at once (config.COMPARE_MAX_OPEN_FILES)"""
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._in_use = 0
+    
+    def acquire(self, count: int, limit: int):
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_use + count <= limit)
+            self._in_use += count
+    
+    def release(self, count: int):
+        with self._condition:
+            self._in_use -= count
+            self._condition.notify_all()
+
+
+_open_files = _OpenFileBudget()
+
+
+def max_open_files() -> int:
+    """Largest group compare_files() accepts"""
+    return max(2, getattr(config, 'COMPARE_MAX_OPEN_FILES', 16))
+
+
+def _fill(f, view: memoryview) -> int:
+    """Read until view is full or EOF; bytes read"""
+    total = 0
+    while total < len(view):
+        count = f.readinto(view[total:])
+        if not count:
+            break
+        total += count
+    return total
+
+
+def compare_files(paths: List[str], algorithm: str = config.HASH_ALGORITHM,
+                  chunk_size: Optional[int] = None) -> Tuple[List[Tuple[str, List[int]]], int]:
+    """
+    Split same-size files into sets of identical content
+    
+    All files are read in lockstep, one chunk at a time. After every chunk a
+    set splits by content and files left on their own are closed, so a file
+    that differs is never read past the first differing chunk. Each set keeps
+    one running hash of the bytes it shares (copied when it splits), so an
+    identical set also gets the full-file digest calculate_file_hash() would
+    produce, without reading its files twice.
+    
+    Files are opened only while a global budget of
+    config.COMPARE_MAX_OPEN_FILES allows, shared by all threads.
+    
+    Args:
+        paths: Files of equal size (at most max_open_files())
+        algorithm: Hash algorithm of the returned digests
+        chunk_size: Bytes compared per step (None = config.COMPARE_CHUNK_SIZE)
+    
+    Returns:
+        ([(digest, indices into paths)] for every set of 2+ identical files,
+        bytes read). Files that fail to open or read are left out.
+    """
+    limit = max_open_files()
+    if len(paths) > limit:
+        raise ValueError(f"Cannot compare {len(paths)} files at once (limit {limit})")
+    if chunk_size is None:
+        chunk_size = getattr(config, 'COMPARE_CHUNK_SIZE', 1024 * 1024)
+    
+    _open_files.acquire(len(paths), limit)
+    files = {}
+    try:
+        for index, path in enumerate(paths):
+            try:
+                # Unbuffered: aligned chunk_size reads straight into our buffers
+                files[index] = open(path, 'rb', buffering=0)
+            except OSError:
+                pass
+        buffers = {index: bytearray(chunk_size) for index in files}
+        
+        def close(index):
+            files.pop(index).close()
+            buffers.pop(index)
+        
+        identical = []
+        bytes_read = 0
+        sets = [(HashCalculator.new_hash(algorithm), list(files))] if len(files) >= 2 else []
+        while sets:
+            next_sets = []
+            for hash_obj, members in sets:
+                # Group members by this chunk's content: [(first member, data, members)]
+                splits = []
+                for index in members:
+                    try:
+                        count = _fill(files[index], memoryview(buffers[index]))
+                    except OSError:
+                        close(index)
+                        continue
+                    bytes_read += count
+                    data = buffers[index] if count == chunk_size else buffers[index][:count]
+                    for split in splits:
+                        if split[1] == data:
+                            split[2].append(index)
+                            break
+                    else:
+                        splits.append((index, data, [index]))
+                
+                for first, data, same in splits:
+                    if len(same) < 2:
+                        close(first)
+                        continue
+                    if not data:
+                        # End of file reached together: identical
+                        identical.append((hash_obj.hexdigest(), same))
+                        for index in same:
+                            close(index)
+                        continue
+                    split_hash = hash_obj.copy() if len(splits) > 1 else hash_obj
+                    split_hash.update(data)
+                    next_sets.append((split_hash, same))
+            sets = next_sets
+        
+        return identical, bytes_read
+    finally:
+        for f in files.values():
+            f.close()
+        _open_files.release(len(paths))
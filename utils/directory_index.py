@@ -0,0 +1,368 @@
+"""
+Directory snapshot index using SQLite for persistent storage
+Caches directory listings (child entries + file stat) keyed by path and directory mtime,
+plus a negative cache of directories that could not be listed (permission denied)
+or were empty
+"""
+
+import marshal
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+# Directories modified this recently are not stored: a change made within the
+# filesystem's mtime granularity (2s on FAT) would not bump the mtime again
+RACY_WINDOW_SECONDS = 2.0
+
+# Commit every N stored listings so other scanners are not locked out for long
+COMMIT_INTERVAL = 500
+
+# Listing format version (bump when the stored tuple layout changes)
+LISTING_VERSION = 2
+
+
+class DirectoryIndex:
+    """Manages a persistent snapshot of directory listings using SQLite
+    
+    A directory whose mtime is unchanged since it was indexed has the same set
+    of children, so its listing can be replayed without scandir or per-file stat.
+    Note: editing a file in place does not change its directory's mtime, so sizes
+    and timestamps replayed from the index can lag behind such edits.
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize directory index
+        
+        Args:
+            db_path: Path to SQLite database file
+        """
+        if db_path is None:
+            db_path = self.default_path()
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        
+        self.db_path = db_path
+        self.conn = None
+        self.db_lock = threading.Lock()  # Thread-safe database access
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+        # Paths replayed since the last flush, whose last_checked is refreshed then
+        self._replayed: List[str] = []
+        self._init_database()
+    
+    @staticmethod
+    def default_path() -> str:
+        """Default database location: next to hash_cache.db (AppData/StorageManager/)"""
+        app_data = os.getenv('APPDATA', os.path.expanduser('~'))
+        return os.path.join(app_data, 'StorageManager', 'directory_index.db')
+    
+    def _init_database(self):
+        """Initialize database and create tables"""
+        # Allow multi-threaded access (we handle thread safety with locks)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        cursor = self.conn.cursor()
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS directory_index (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                listing BLOB NOT NULL,
+                last_checked REAL NOT NULL
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_dir_last_checked
+            ON directory_index(last_checked)
+        ''')
+        
+        # Negative cache: directories that failed with EACCES/EPERM at this
+        # mtime and ctime (chmod/chown/ACL changes only move the ctime)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS denied_directories (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                ctime_ns INTEGER,
+                errno INTEGER NOT NULL,
+                last_checked REAL NOT NULL
+            )
+        ''')
+        
+        # Negative cache: directories that were empty at this mtime and ctime
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS empty_directories (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                ctime_ns INTEGER NOT NULL,
+                last_checked REAL NOT NULL
+            )
+        ''')
+        
+        self._migrate_denied_table(cursor)
+        self.conn.commit()
+    
+    def _migrate_denied_table(self, cursor):
+        """Add ctime_ns to an older negative cache (its rows never match, so they are retried)"""
+        cursor.execute('PRAGMA table_info(denied_directories)')
+        if 'ctime_ns' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute('ALTER TABLE denied_directories ADD COLUMN ctime_ns INTEGER')
+    
+    def get_listing(self, dirpath: str, mtime_ns: int) -> Optional[Tuple[list, list]]:
+        """
+        Get the indexed listing of a directory if its mtime is unchanged
+        
+        Args:
+            dirpath: Directory path
+            mtime_ns: Current directory mtime in nanoseconds
+        
+        Returns:
+            Tuple of (files, dirs) if index hit, None if miss.
+            files is a list of (name, stat_result), dirs a list of (name, is_symlink)
+        """
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    SELECT listing FROM directory_index
+                    WHERE path = ? AND mtime_ns = ? AND version = ?
+                ''', (dirpath, mtime_ns, LISTING_VERSION))
+                row = cursor.fetchone()
+            
+            if not row:
+                self.misses += 1
+                return None
+            
+            raw_files, dirs = marshal.loads(row[0])
+            files = [(name, os.stat_result(fields)) for name, fields in raw_files]
+            self.hits += 1
+            with self.db_lock:
+                self._replayed.append(dirpath)
+                touch_now = len(self._replayed) >= COMMIT_INTERVAL
+            if touch_now:
+                self.flush()
+            return files, dirs
+        
+        except (sqlite3.Error, ValueError, EOFError, TypeError):
+            self.misses += 1
+            return None
+    
+    def store_listing(self, dirpath: str, mtime_ns: int,
+                      files: List[Tuple[str, os.stat_result]],
+                      dirs: List[Tuple[str, bool]]):
+        """
+        Store a directory listing (batched - call flush() when done)
+        
+        Args:
+            dirpath: Directory path
+            mtime_ns: Directory mtime in nanoseconds at listing time
+            files: List of (name, stat_result) for files
+            dirs: List of (name, is_symlink) for subdirectories
+        """
+        current_time = time.time()
+        if current_time - mtime_ns / 1e9 < RACY_WINDOW_SECONDS:
+            return
+        
+        try:
+            raw_files = [
+                (name, tuple(st) + (st.st_atime, st.st_mtime, st.st_ctime,
+                                    st.st_atime_ns, st.st_mtime_ns, st.st_ctime_ns))
+                for name, st in files
+            ]
+            listing = marshal.dumps((raw_files, dirs))
+            
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO directory_index
+                    (path, mtime_ns, version, listing, last_checked)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (dirpath, mtime_ns, LISTING_VERSION, listing, current_time))
+                
+                self._pending_writes += 1
+                if self._pending_writes >= COMMIT_INTERVAL:
+                    self.conn.commit()
+                    self._pending_writes = 0
+        
+        except (sqlite3.Error, ValueError):
+            # Silently fail - index is optional
+            pass
+    
+    def denied_directories(self) -> Dict[str, Tuple[int, Optional[int]]]:
+        """
+        Load the negative cache (read once per scan, then checked in memory)
+        
+        Returns:
+            Dictionary mapping directory path to its (mtime_ns, ctime_ns) when
+            listing was denied
+        """
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('SELECT path, mtime_ns, ctime_ns FROM denied_directories')
+                return {path: (mtime_ns, ctime_ns) for path, mtime_ns, ctime_ns in cursor.fetchall()}
+        except sqlite3.Error:
+            return {}
+    
+    def store_denied(self, dirpath: str, mtime_ns: int, ctime_ns: int, error: int):
+        """
+        Remember a directory that could not be listed (batched - call flush() when done)
+        
+        Args:
+            dirpath: Directory path
+            mtime_ns: Directory mtime in nanoseconds when listing failed
+            ctime_ns: Directory ctime in nanoseconds when listing failed
+            error: errno of the failure
+        """
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO denied_directories
+                    (path, mtime_ns, ctime_ns, errno, last_checked)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (dirpath, mtime_ns, ctime_ns, error, time.time()))
+                self._pending_writes += 1
+        except sqlite3.Error:
+            pass
+    
+    def remove_denied(self, dirpath: str):
+        """Forget a directory that can be listed again (batched)"""
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('DELETE FROM denied_directories WHERE path = ?', (dirpath,))
+                self._pending_writes += 1
+        except sqlite3.Error:
+            pass
+    
+    def empty_directories(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Load the directories that were empty (read once per scan, like denied_directories())
+        
+        Returns:
+            Dictionary mapping directory path to its (mtime_ns, ctime_ns) when it was empty
+        """
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('SELECT path, mtime_ns, ctime_ns FROM empty_directories')
+                return {path: (mtime_ns, ctime_ns) for path, mtime_ns, ctime_ns in cursor.fetchall()}
+        except sqlite3.Error:
+            return {}
+    
+    def store_empty(self, dirpath: str, mtime_ns: int, ctime_ns: int):
+        """
+        Remember a directory that has no entries (batched - call flush() when done)
+        
+        Args:
+            dirpath: Directory path
+            mtime_ns: Directory mtime in nanoseconds while it was empty
+            ctime_ns: Directory ctime in nanoseconds while it was empty
+        """
+        if time.time() - mtime_ns / 1e9 < RACY_WINDOW_SECONDS:
+            return
+        
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO empty_directories
+                    (path, mtime_ns, ctime_ns, last_checked)
+                    VALUES (?, ?, ?, ?)
+                ''', (dirpath, mtime_ns, ctime_ns, time.time()))
+                self._pending_writes += 1
+        except sqlite3.Error:
+            pass
+    
+    def remove_empty(self, dirpath: str):
+        """Forget a directory that has entries again (batched)"""
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('DELETE FROM empty_directories WHERE path = ?', (dirpath,))
+                self._pending_writes += 1
+        except sqlite3.Error:
+            pass
+    
+    def _touch_replayed(self):
+        """Refresh last_checked of the replayed listings (caller holds db_lock)"""
+        if self._replayed:
+            now = time.time()
+            self.conn.executemany(
+                'UPDATE directory_index SET last_checked = ? WHERE path = ?',
+                [(now, path) for path in self._replayed]
+            )
+            self._replayed = []
+    
+    def flush(self):
+        """Commit all pending index updates to database"""
+        try:
+            with self.db_lock:
+                self._touch_replayed()
+                self.conn.commit()
+                self._pending_writes = 0
+        except sqlite3.Error:
+            pass
+    
+    def cleanup_stale(self, max_age_days: int = 30):
+        """
+        Remove index entries not refreshed in max_age_days
+        
+        Args:
+            max_age_days: Maximum age in days
+        
+        Returns:
+            Number of deleted entries
+        """
+        try:
+            cutoff_time = time.time() - (max_age_days * 24 * 60 * 60)
+            
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    DELETE FROM directory_index
+                    WHERE last_checked < ?
+                ''', (cutoff_time,))
+                deleted_count = cursor.rowcount
+                for table in ('denied_directories', 'empty_directories'):
+                    cursor.execute(f'''
+                        DELETE FROM {table}
+                        WHERE last_checked < ?
+                    ''', (cutoff_time,))
+                    deleted_count += cursor.rowcount
+                self.conn.commit()
+            
+            return deleted_count
+        
+        except sqlite3.Error as e:
+            print(f"Directory index cleanup error: {e}")
+            return 0
+    
+    def clear_all(self):
+        """Clear the entire index"""
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('DELETE FROM directory_index')
+                cursor.execute('DELETE FROM denied_directories')
+                cursor.execute('DELETE FROM empty_directories')
+                self.conn.commit()
+                cursor.execute('VACUUM')
+        except sqlite3.Error as e:
+            print(f"Directory index clear error: {e}")
+    
+    def close(self):
+        """Close database connection"""
+        if self.conn:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+    
+    def __del__(self):
+        """Destructor - ensure connection is closed"""
+        self.close()
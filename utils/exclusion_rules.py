@@ -0,0 +1,284 @@
+"""
+Compiled directory exclusion rules evaluated during traversal
+"""
+
+import fnmatch
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import config
+
+
+# Characters that make a pattern a glob instead of a literal name or path
+GLOB_CHARS = frozenset('*?[')
+
+# Prefix that marks a pattern as a regular expression
+REGEX_PREFIX = 're:'
+
+# Regex constructs that change meaning (or fail) inside the combined alternation:
+# global inline flags, group references by number or name, named groups
+_STANDALONE_REGEX = re.compile(r'\(\?[aiLmsux]+\)|\\[1-9]|\(\?P[<=]|\(\?\(|\(\?<(?![=!])')
+
+_REGEX_FLAGS = re.IGNORECASE | re.DOTALL
+
+
+class ExclusionRule:
+    """A single exclusion pattern and how many directories it pruned"""
+    
+    __slots__ = ('pattern', 'kind', 'hits')
+    
+    def __init__(self, pattern: str, kind: str):
+        self.pattern = pattern
+        self.kind = kind  # 'name', 'suffix', 'path', 'glob' or 'regex'
+        self.hits = 0
+    
+    def __repr__(self):
+        return f"ExclusionRule({self.kind}:{self.pattern!r}, hits={self.hits})"
+
+
+class ExclusionRules:
+    """Directory exclusion patterns compiled into one matcher
+    
+    Pattern syntax (matching is case-insensitive, '/' and '\\' are equivalent):
+        'node_modules'       directory name anywhere
+        'windows\\temp'       trailing path components anywhere ('.../windows/temp')
+        'D:\\Backups'         absolute path: that directory and everything below it
+        '*.photoslibrary'    glob on the directory name
+        '*/cache/*'          glob on the full path (when it contains a separator)
+        're:/\\.cache/'       regular expression searched in the full path
+    
+    Names and suffixes are dict lookups, absolute paths a set lookup, and all
+    glob/regex rules are folded into two combined regexes, so checking an entry
+    costs about the same regardless of how many rules there are. Directories are
+    checked before they are listed, so an excluded subtree is never read.
+    Regexes with inline global flags or group references can't be combined and
+    are matched on their own.
+    """
+    
+    def __init__(self, patterns: Iterable[str] = ()):
+        """
+        Compile exclusion patterns
+        
+        Args:
+            patterns: Exclusion patterns (see class docstring for the syntax)
+        """
+        self.rules: List[ExclusionRule] = []
+        self._names: Dict[str, ExclusionRule] = {}
+        self._suffixes: Dict[str, List[Tuple[str, ExclusionRule]]] = {}
+        self._paths: Dict[str, ExclusionRule] = {}
+        self._name_patterns: List[Tuple[str, ExclusionRule]] = []
+        self._path_patterns: List[Tuple[str, ExclusionRule]] = []
+        self._standalone: List[Tuple[re.Pattern, ExclusionRule]] = []
+        self._name_regex = None
+        self._path_regex = None
+        self._hits_lock = threading.Lock()
+        
+        for pattern in patterns:
+            self.add(pattern, compile_now=False)
+        self._compile()
+    
+    def __getstate__(self):
+        # Picklable for scan worker processes (the lock is recreated)
+        state = self.__dict__.copy()
+        del state['_hits_lock']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._hits_lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls) -> 'ExclusionRules':
+        """Rules from config.EXCLUDED_DIRS plus config.EXCLUDED_PATTERNS"""
+        patterns = list(getattr(config, 'EXCLUDED_DIRS', ()))
+        patterns.extend(getattr(config, 'EXCLUDED_PATTERNS', ()))
+        return cls(patterns)
+    
+    @staticmethod
+    def _key(path: str) -> str:
+        """Comparable form of a path: lowercase, '/' separators, no trailing '/'"""
+        key = path.replace('\\', '/').lower()
+        return key.rstrip('/') or key
+    
+    def add(self, pattern: str, compile_now: bool = True) -> Optional[ExclusionRule]:
+        """
+        Add one exclusion pattern
+        
+        Args:
+            pattern: Exclusion pattern
+            compile_now: Rebuild the combined regexes (False when adding in bulk)
+        
+        Returns:
+            The new rule, or None if the pattern is empty or an invalid regex
+        """
+        if not pattern:
+            return None
+        
+        if pattern.startswith(REGEX_PREFIX):
+            expression = pattern[len(REGEX_PREFIX):]
+            try:
+                re.compile(expression)
+            except re.error as e:
+                print(f"Invalid exclusion regex {expression!r}: {e}")
+                return None
+            rule = ExclusionRule(expression, 'regex')
+            wrapped = f'.*?(?:{expression})'
+            if self._combinable(wrapped):
+                self._path_patterns.append((wrapped, rule))
+            else:
+                self._standalone.append((re.compile(expression, _REGEX_FLAGS), rule))
+        
+        elif GLOB_CHARS.intersection(pattern):
+            key = self._key(pattern)
+            rule = ExclusionRule(pattern, 'glob')
+            if '/' in key:
+                self._path_patterns.append((fnmatch.translate(key), rule))
+            else:
+                self._name_patterns.append((fnmatch.translate(key), rule))
+        
+        elif os.path.isabs(pattern) or re.match(r'^[a-zA-Z]:[\\/]', pattern):
+            rule = ExclusionRule(pattern, 'path')
+            self._paths[self._key(os.path.normpath(pattern))] = rule
+        
+        else:
+            key = self._key(pattern).strip('/')
+            if '/' in key:
+                rule = ExclusionRule(pattern, 'suffix')
+                last = key.rsplit('/', 1)[1]
+                self._suffixes.setdefault(last, []).append(('/' + key, rule))
+            else:
+                rule = self._names.get(key)
+                if rule is not None:
+                    return rule
+                rule = ExclusionRule(pattern, 'name')
+                self._names[key] = rule
+        
+        self.rules.append(rule)
+        if compile_now:
+            self._compile()
+        return rule
+    
+    @staticmethod
+    def _combinable(expression: str) -> bool:
+        """Check that a wrapped regex keeps its meaning as one group of the alternation"""
+        if _STANDALONE_REGEX.search(expression):
+            return False
+        try:
+            re.compile(f'(?P<_x0>{expression})', _REGEX_FLAGS)
+        except re.error:
+            return False
+        return True
+    
+    def _compile(self):
+        """Fold glob/regex rules into one alternation per target (name or path)"""
+        def combine(patterns):
+            if not patterns:
+                return None, {}
+            groups = {f'_x{index}': rule for index, (_, rule) in enumerate(patterns)}
+            alternation = '|'.join(
+                f'(?P<_x{index}>{expression})' for index, (expression, _) in enumerate(patterns)
+            )
+            return re.compile(alternation, _REGEX_FLAGS), groups
+        
+        self._name_regex, self._name_groups = combine(self._name_patterns)
+        self._path_regex, self._path_groups = combine(self._path_patterns)
+    
+    def match(self, path: str, name: Optional[str] = None) -> Optional[ExclusionRule]:
+        """
+        Find the rule that excludes a directory (no hit is counted)
+        
+        Args:
+            path: Full directory path
+            name: Directory name, if already known (saves a basename())
+        
+        Returns:
+            The matching rule, or None if the directory is not excluded
+        """
+        path_key = None
+        if name is None:
+            path_key = self._key(path)
+            name_key = path_key.rsplit('/', 1)[-1]
+        else:
+            name_key = name.lower()
+        
+        rule = self._names.get(name_key)
+        if rule is not None:
+            return rule
+        
+        if self._name_regex is not None:
+            found = self._name_regex.match(name_key)
+            if found:
+                return self._name_groups[found.lastgroup]
+        
+        suffixes = self._suffixes.get(name_key)
+        
+        # Rules below need the full path key - build it only when they can apply
+        if not (suffixes or self._paths or self._path_regex is not None or self._standalone):
+            return None
+        
+        if path_key is None:
+            path_key = self._key(path)
+        
+        for suffix, rule in suffixes or ():
+            if path_key.endswith(suffix) or path_key == suffix[1:]:
+                return rule
+        
+        if self._paths:
+            rule = self._paths.get(path_key)
+            if rule is not None:
+                return rule
+        
+        if self._path_regex is not None:
+            found = self._path_regex.match(path_key)
+            if found:
+                return self._path_groups[found.lastgroup]
+        
+        for regex, rule in self._standalone:
+            if regex.search(path_key):
+                return rule
+        
+        return None
+    
+    def excludes(self, path: str, name: Optional[str] = None) -> bool:
+        """Check a directory during traversal, counting a hit on the matching rule"""
+        rule = self.match(path, name)
+        if rule is None:
+            return False
+        with self._hits_lock:
+            rule.hits += 1
+        return True
+    
+    def excludes_root(self, path: str) -> bool:
+        """
+        Check a scan root: the root itself, or an absolute-path rule on one of
+        its parents (traversal never checks directories above the root)
+        """
+        if self.excludes(path):
+            return True
+        
+        if self._paths:
+            path_key = self._key(os.path.normpath(path))
+            while '/' in path_key:
+                path_key = path_key.rsplit('/', 1)[0]
+                rule = self._paths.get(path_key) or self._paths.get(path_key + '/')
+                if rule is not None:
+                    with self._hits_lock:
+                        rule.hits += 1
+                    return True
+        
+        return False
+    
+    def reset_hits(self):
+        """Zero all hit counters (called at the start of each scan)"""
+        with self._hits_lock:
+            for rule in self.rules:
+                rule.hits = 0
+    
+    def hit_counts(self) -> List[Tuple[str, int]]:
+        """(pattern, hits) for rules that pruned something, most hits first"""
+        return sorted(
+            ((rule.pattern, rule.hits) for rule in self.rules if rule.hits),
+            key=lambda item: item[1], reverse=True
+        )
@@ -0,0 +1,150 @@
+"""
+Compact file record used for scan results
+"""
+
+import os
+from typing import Any, Iterator, Optional
+
+from utils.path_table import DirectoryTable, shared_directories
+
+
+class FileRecord:
+    """Per-file scan result with dict-style read access (info['size'], info.get('group'))
+    
+    Uses __slots__ instead of a per-file dict. The path is stored as a directory
+    id into a DirectoryTable (the scan's, or the shared one for records built
+    from a path) plus the basename, and rebuilt on access; 'extension' is
+    derived from the basename. Optional fields that were never set behave like
+    missing dict keys.
+    """
+    
+    __slots__ = ('dir_id', 'filename', 'size', 'modified', 'created',
+                 'group', 'hash', 'nlink', 'hardlinks', 'error', 'directories')
+    
+    # Settable through info[key] (slots plus the 'path' property)
+    WRITABLE = frozenset(__slots__) - {'directories'} | {'path'}
+    
+    # Keys available through info[key], in the order of the old dict layout
+    KEYS = ('path', 'name', 'size', 'modified', 'created', 'extension',
+            'group', 'hash', 'nlink', 'hardlinks', 'error')
+    
+    def __init__(self, path: str,
+                 size: Optional[int] = None,
+                 modified: Optional[float] = None,
+                 created: Optional[float] = None,
+                 error: Optional[str] = None,
+                 directories: Optional[DirectoryTable] = None):
+        self.directories = directories if directories is not None else shared_directories
+        self.dir_id, self.filename = self.directories.split(path)
+        self.size = size
+        self.modified = modified
+        self.created = created
+        self.group = None
+        self.hash = None
+        self.nlink = None
+        self.hardlinks = None
+        self.error = error
+    
+    @classmethod
+    def from_stat(cls, path: str, stat: os.stat_result,
+                  directories: Optional[DirectoryTable] = None) -> 'FileRecord':
+        """Build a record from a path and its stat result"""
+        return cls(path, stat.st_size, stat.st_mtime, stat.st_ctime, directories=directories)
+    
+    @classmethod
+    def from_entry(cls, dir_id: int, filename: str, stat: os.stat_result,
+                   directories: Optional[DirectoryTable] = None) -> 'FileRecord':
+        """Build a record from a directory id already interned in directories
+        (None = the shared table), basename and stat"""
+        record = cls.__new__(cls)
+        record.directories = directories if directories is not None else shared_directories
+        record.dir_id = dir_id
+        record.filename = filename
+        record.size = stat.st_size
+        record.modified = stat.st_mtime
+        record.created = stat.st_ctime
+        record.group = record.hash = record.nlink = record.hardlinks = record.error = None
+        return record
+    
+    @classmethod
+    def from_name(cls, dir_id: int, filename: str,
+                  directories: Optional[DirectoryTable] = None) -> 'FileRecord':
+        """Build a record without stat information (see load_stat())"""
+        record = cls.__new__(cls)
+        record.directories = directories if directories is not None else shared_directories
+        record.dir_id = dir_id
+        record.filename = filename
+        record.size = record.modified = record.created = None
+        record.group = record.hash = record.nlink = record.hardlinks = record.error = None
+        return record
+    
+    def load_stat(self) -> bool:
+        """
+        Fill size and times from os.stat() (records built with from_name())
+        
+        Returns:
+            True on success; False if the file is gone or unreadable (error is set)
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            self.error = str(e)
+            return False
+        self.size = stat.st_size
+        self.modified = stat.st_mtime
+        self.created = stat.st_ctime
+        return True
+    
+    @property
+    def path(self) -> str:
+        return self.directories.join(self.dir_id, self.filename)
+    
+    @path.setter
+    def path(self, value: str):
+        self.dir_id, self.filename = self.directories.split(value)
+    
+    @property
+    def directory(self) -> str:
+        return self.directories.path(self.dir_id)
+    
+    @property
+    def name(self) -> str:
+        return self.filename
+    
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.filename)[1].lower()
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+    
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.WRITABLE:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.KEYS and getattr(self, key) is not None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """dict.get() equivalent"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def keys(self) -> Iterator[str]:
+        """Keys that are set on this record"""
+        return (key for key in self.KEYS if getattr(self, key) is not None)
+    
+    def to_dict(self) -> dict:
+        """Convert to a plain dict (for export/serialization)"""
+        return {key: getattr(self, key) for key in self.keys()}
+    
+    def __repr__(self):
+        return f"FileRecord({self.to_dict()!r})"
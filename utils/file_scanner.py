@@ -2,28 +2,132 @@
 File scanner utility for traversing directories safely
 """
 
+import asyncio
+import copy
+import errno
 import os
+import queue
 import string
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Generator, Callable, Optional, List
+from typing import AsyncIterator, Generator, Callable, Optional, List, Tuple, Union
 import config
+from utils.async_bridge import AsyncChannel
+from utils.directory_index import DirectoryIndex
+from utils.exclusion_rules import ExclusionRules
+from utils.file_record import FileRecord
+from utils.mounts import MountTable
+from utils.path_table import DirectoryTable
+from utils.progress import ProgressChannel
+from utils.scan_stats import ScanStats
+from utils.sharded_scan import ShardedScan, plan_shards
 
 
 class FileScanner:
     """Safe file scanner that respects system boundaries"""
     
-    def __init__(self, progress_callback: Optional[Callable] = None):
+    def __init__(self, progress_callback: Optional[Union[Callable, ProgressChannel]] = None,
+                 workers: Optional[int] = None,
+                 use_index: Optional[bool] = None,
+                 exclusions: Optional[ExclusionRules] = None,
+                 one_filesystem: Optional[bool] = None,
+                 sharded: Optional[bool] = None,
+                 follow_symlinks: Optional[bool] = None,
+                 retry_denied: Optional[bool] = None,
+                 negative_cache: Optional[bool] = None):
         """
         Initialize file scanner
         
         Args:
-            progress_callback: Optional callback function for progress updates
+            progress_callback: ProgressChannel to report to, or a legacy
+                               callback(files_count, current_file) that is
+                               called at most every config.PROGRESS_INTERVAL
+            workers: Number of directory-listing threads (None = config.SCAN_WORKERS,
+                     1 = sequential walker)
+            use_index: Replay unchanged directories from the persistent snapshot
+                       index (None = config.USE_DIRECTORY_INDEX)
+            exclusions: Directory exclusion rules (None = config.EXCLUDED_DIRS
+                        plus config.EXCLUDED_PATTERNS)
+            one_filesystem: Don't cross into other mounted filesystems
+                            (None = config.ONE_FILESYSTEM)
+            sharded: Scan roots on different devices in parallel worker
+                     processes, one per device (None = config.SHARDED_SCAN)
+            follow_symlinks: Descend into symlinked directories, each target
+                             once (None = config.FOLLOW_SYMLINKS)
+            retry_denied: List directories again that were permission-denied
+                          last time and have not changed since
+                          (None = config.RETRY_DENIED_DIRS)
+            negative_cache: Skip directories that were permission-denied or
+                            empty last time and have not changed since
+                            (None = config.NEGATIVE_CACHE)
         """
-        self.progress_callback = progress_callback
+        if isinstance(progress_callback, ProgressChannel):
+            self.progress = progress_callback
+        else:
+            self.progress = ProgressChannel()
+            if progress_callback is not None:
+                def scan_listener(event):
+                    if event.phase == 'scan':
+                        progress_callback(event.files, event.current)
+                self.progress.add_listener(scan_listener)
+        self.workers = max(1, workers if workers is not None else getattr(config, 'SCAN_WORKERS', 1))
         self.files_scanned = 0
         self.cancelled = False
-        # Pre-compute lowercase excluded dirs for faster matching
-        self._excluded_lower = {ex.lower() for ex in config.EXCLUDED_DIRS}
+        # Directories listed, stat calls, errors and slowest directories of the last scan
+        self.stats = ScanStats()
+        if use_index is None:
+            use_index = getattr(config, 'USE_DIRECTORY_INDEX', False)
+        self.index = DirectoryIndex() if use_index else None
+        # Negative cache, stored in the index database even when replay is off:
+        # path -> (mtime_ns, ctime_ns) of directories denied or empty before
+        if negative_cache is None:
+            negative_cache = getattr(config, 'NEGATIVE_CACHE', True)
+        self.negative = (self.index or DirectoryIndex()) if negative_cache else None
+        if retry_denied is None:
+            retry_denied = getattr(config, 'RETRY_DENIED_DIRS', False)
+        self.retry_denied = retry_denied
+        self._denied = {}
+        self._empty = {}
+        # Directory paths are interned once; files are yielded as (dir_id, name, stat)
+        self.directories = DirectoryTable()
+        # Per-scan (st_dev, st_ino) tracking, active during scan_roots*()
+        self._visited_dirs = None
+        self._visited_files = None
+        self._visited_lock = threading.Lock()
+        self.overlap_skipped = {'roots': 0, 'directories': 0, 'files': 0}
+        # Compiled directory exclusions, checked before a directory is listed
+        self.exclusions = exclusions if exclusions is not None else ExclusionRules.from_config()
+        # Mount boundaries: pseudo filesystems are always skipped, other devices
+        # too in one-filesystem mode. Skipped mounts: list of (path, fs_type)
+        if one_filesystem is None:
+            one_filesystem = getattr(config, 'ONE_FILESYSTEM', False)
+        self.one_filesystem = one_filesystem
+        self.mounts = MountTable()
+        self.skipped_mounts = []
+        self._root_dev = None
+        # Sharded worker (see scan_shard): one_filesystem keeps it off other
+        # storage devices, but memory-backed mounts below its roots and followed
+        # symlink targets are walked; devices entered that way are kept in _entered_devs
+        self.shard_worker = False
+        self._entered_devs = set()
+        # Name-only traversal (scan_names): files are listed without stat()
+        self._names_only = False
+        if sharded is None:
+            sharded = getattr(config, 'SHARDED_SCAN', False)
+        self.sharded = sharded
+        # Symlinked directories: followed only on request, each target (st_dev, st_ino)
+        # once and never into a scan root (those are walked anyway)
+        if follow_symlinks is None:
+            follow_symlinks = getattr(config, 'FOLLOW_SYMLINKS', False)
+        self.follow_symlinks = follow_symlinks
+        self.other_roots: List[str] = []  # Roots scanned elsewhere (other shards), treated like own roots
+        self._root_realpaths: List[str] = []
+        self._followed_links = set()
+        # Per-root copies running during ascan(), cancelled together with this one
+        self._children = []
         # Pre-compute excluded files (system critical)
         self._excluded_files = {f.lower() for f in getattr(config, 'EXCLUDED_FILES', set())}
         # Pre-compute excluded extensions (dangerous file types)
@@ -71,6 +175,8 @@ class FileScanner:
     def cancel(self):
         """Cancel the current scanning operation"""
         self.cancelled = True
+        for child in list(self._children):
+            child.cancel()
     
     def is_safe_directory(self, path: str) -> bool:
         """
@@ -82,79 +188,560 @@ class FileScanner:
         Returns:
             True if safe to scan, False otherwise
         """
-        # Just check the folder name itself (fast)
-        folder_name = os.path.basename(path).lower()
-        return folder_name not in self._excluded_lower
+        return not self.exclusions.excludes_root(path)
     
-    def _is_dirname_safe(self, dirname: str) -> bool:
-        """Quick check if a directory name is safe (for filtering in os.walk)"""
-        return dirname.lower() not in self._excluded_lower
+    def _begin_scan(self):
+        """Reset per-scan counters"""
+        self.files_scanned = 0
+        self.cancelled = False
+        self.exclusions.reset_hits()
+        self.stats.reset()
+        if self.negative is not None:
+            self._denied = self.negative.denied_directories()
+            self._empty = self.negative.empty_directories()
+        self._root_realpaths = []
+        self._followed_links = set()
+        self._register_roots(self.other_roots)
+        self.progress.start('scan')
+        # Re-read per scan: drives and network shares come and go
+        self.mounts = MountTable.load()
+        self.skipped_mounts = []
     
-    def scan_directory(self, root_path: str, 
-                      min_size: int = 0, 
-                      max_size: Optional[int] = None) -> Generator[str, None, None]:
+    def _skip_mount(self, path: str):
+        """Record a mount point that was not scanned"""
+        entry = self.mounts.get(path)
+        self.skipped_mounts.append((path, entry.fs_type if entry else ''))
+    
+    @staticmethod
+    def normalize_roots(directories: List[str]) -> Tuple[List[str], List[str]]:
         """
-        Scan directory and yield file paths
+        Normalize scan roots and collapse duplicates and nested roots
         
         Args:
-            root_path: Root directory to scan
-            min_size: Minimum file size in bytes
-            max_size: Maximum file size in bytes (None for no limit)
+            directories: Directory paths as entered by the user
             
-        Yields:
-            Full file paths
+        Returns:
+            Tuple of (roots, skipped): roots to scan (in input order) and roots
+            dropped because they are equal to or inside another root
         """
-        self.files_scanned = 0
-        self.cancelled = False
+        normalized = []
+        for directory in directories:
+            path = os.path.normpath(os.path.abspath(directory))
+            normalized.append((path, os.path.normcase(path)))
+        
+        # Decide shortest first so a parent root always wins over its children
+        kept_keys = []
+        skipped_keys = set()
+        for path, key in sorted(normalized, key=lambda item: len(item[1])):
+            if key in kept_keys:
+                continue  # Repeated root - handled below
+            for parent in kept_keys:
+                prefix = parent if parent.endswith(os.sep) else parent + os.sep
+                if key.startswith(prefix):
+                    skipped_keys.add(key)
+                    break
+            else:
+                kept_keys.append(key)
+        
+        roots = []
+        skipped = []
+        emitted = set()
+        for (path, key), original in zip(normalized, directories):
+            if key in skipped_keys or key in emitted:
+                skipped.append(original)
+            else:
+                roots.append(path)
+                emitted.add(key)
+        
+        return roots, skipped
+    
+    def _claim_directory(self, dir_stat: os.stat_result) -> bool:
+        """Mark a directory visited for this scan; False if already visited"""
+        # DirEntry-derived stats on Windows carry no inode (0) - can't track those
+        if not dir_stat.st_ino:
+            return True
+        
+        key = (dir_stat.st_dev, dir_stat.st_ino)
+        with self._visited_lock:
+            if key in self._visited_dirs:
+                self.overlap_skipped['directories'] += 1
+                return False
+            self._visited_dirs.add(key)
+        return True
+    
+    def _drop_seen_inodes(self, files: List[Tuple[int, str, os.stat_result]]) -> List[Tuple[int, str, os.stat_result]]:
+        """Drop files whose (st_dev, st_ino) was already yielded in this scan"""
+        unique = []
+        with self._visited_lock:
+            for entry in files:
+                stat = entry[2]
+                # Only multi-link files can be reached twice once directories are unique
+                if stat.st_nlink > 1 and stat.st_ino:
+                    key = (stat.st_dev, stat.st_ino)
+                    if key in self._visited_files:
+                        self.overlap_skipped['files'] += 1
+                        continue
+                    self._visited_files.add(key)
+                unique.append(entry)
+        return unique
+    
+    def _read_directory(self, dirpath: str) -> Optional[Tuple[list, list]]:
+        """
+        Read a single directory with os.scandir (one pass, no extra stat calls)
+        
+        DirEntry.is_dir()/is_file()/is_symlink() are answered from the directory
+        listing itself and DirEntry.stat() is cached on the entry (free on Windows),
+        so each file costs at most one metadata call instead of os.walk + os.stat.
+        
+        Args:
+            dirpath: Directory to read
+            
+        Returns:
+            Tuple of (files, dirs): files is a list of (name, stat_result) for safe
+            regular files (stat_result is None in name-only mode), dirs is a list
+            of (name, is_symlink) for subdirectories. None if the directory can't
+            be listed.
+        """
+        files = []
+        dirs = []
+        seen = 0
+        stat_calls = 0
+        names_only = self._names_only
+        follow_symlinks = self.follow_symlinks
+        started = time.perf_counter()
+        
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    seen += 1
+                    try:
+                        if entry.is_dir():
+                            dirs.append((entry.name, entry.is_symlink()))
+                        elif entry.is_file():
+                            # Skip system-critical files (.sys, .drv, pagefile.sys, etc.)
+                            if not self._is_file_safe(entry.name):
+                                continue
+                            if names_only:
+                                files.append((entry.name, None))
+                            else:
+                                stat_calls += 1
+                                files.append((entry.name, entry.stat()))
+                        elif follow_symlinks and entry.is_symlink() and not os.path.exists(entry.path):
+                            self.stats.record_link('broken')
+                    except OSError as e:
+                        # Skip entries we can't access
+                        self.stats.record_error(entry.path, e)
+                        continue
+        except OSError as e:
+            # Skip directories we can't list (same as os.walk without onerror)
+            self.stats.record_error(dirpath, e)
+            if e.errno in (errno.EACCES, errno.EPERM) and self.negative is not None:
+                dir_stat = self._negative_stat(dirpath)
+                if dir_stat is not None:
+                    self.negative.store_denied(dirpath, dir_stat.st_mtime_ns, dir_stat.st_ctime_ns, e.errno)
+            return None
+        
+        # Failed listings are errors, not listed (or slow) directories
+        self.stats.record_directory(dirpath, time.perf_counter() - started, seen, stat_calls)
+        if self.negative is not None:
+            self._update_negative(dirpath, seen)
+        return files, dirs
+    
+    def _negative_stat(self, dirpath: str) -> Optional[os.stat_result]:
+        """Stat a directory for the negative cache (None if it is gone)"""
+        self.stats.record_stat()
+        try:
+            return os.stat(dirpath)
+        except OSError:
+            return None
+    
+    def _update_negative(self, dirpath: str, seen: int):
+        """
+        Keep the negative cache in step with a directory that was just listed:
+        readable again, empty (keyed by its mtime and ctime), or no longer empty
+        """
+        if dirpath in self._denied:
+            self.negative.remove_denied(dirpath)
+        if seen:
+            if dirpath in self._empty:
+                self.negative.remove_empty(dirpath)
+            return
+        # Stat after listing: an entry added in between leaves a recent mtime,
+        # which store_empty() refuses (racy window)
+        dir_stat = self._negative_stat(dirpath)
+        if dir_stat is not None:
+            self.negative.store_empty(dirpath, dir_stat.st_mtime_ns, dir_stat.st_ctime_ns)
+    
+    def _skip_negative(self, dirpath: str, dir_stat: Optional[os.stat_result]) -> bool:
+        """
+        Check the negative cache: True for a directory that was permission-denied
+        (unless retrying those) or empty last time and is unchanged since. A
+        permission change moves the ctime only, so both times have to match.
+        """
+        denied = None if self.retry_denied else self._denied.get(dirpath)
+        empty = self._empty.get(dirpath)
+        if denied is None and empty is None:
+            return False
+        if dir_stat is None:
+            dir_stat = self._negative_stat(dirpath)
+            if dir_stat is None:
+                return False
+        
+        times = (dir_stat.st_mtime_ns, dir_stat.st_ctime_ns)
+        if times == denied:
+            self.stats.record_denied_skip()
+            return True
+        if times == empty:
+            self.stats.record_empty_skip()
+            return True
+        return False
+    
+    def _indexed_read_directory(self, dirpath: str, dir_mtime_ns: int) -> Optional[Tuple[list, list]]:
+        """Replay a directory from the snapshot index if its mtime is unchanged"""
+        listing = self.index.get_listing(dirpath, dir_mtime_ns)
+        if listing is not None:
+            self.stats.record_replay()
+        else:
+            listing = self._read_directory(dirpath)
+            if listing is not None:
+                self.index.store_listing(dirpath, dir_mtime_ns, *listing)
         
+        return listing
+    
+    def _list_directory(self, dirpath: str) -> Tuple[List[Tuple[int, str, os.stat_result]], List[str]]:
+        """
+        List a single directory (from the snapshot index when enabled)
+        
+        Args:
+            dirpath: Directory to list
+            
+        Returns:
+            Tuple of (files, subdirs): files is a list of (dir_id, name, stat_result)
+            for safe regular files, with dirpath interned once in self.directories;
+            subdirs is a list of safe subdirectory paths
+        """
+        # The index stores stat results, so name-only listings bypass it
+        use_index = self.index is not None and not self._names_only
+        dir_stat = None
+        if use_index or self._visited_dirs is not None or self._root_dev is not None:
+            self.stats.record_stat()
+            try:
+                dir_stat = os.stat(dirpath)
+            except OSError as e:
+                self.stats.record_error(dirpath, e)
+                return [], []
+            
+            # One-filesystem mode: a different device means we crossed a mount
+            if (self._root_dev is not None and dir_stat.st_dev != self._root_dev and
+                    not self._may_enter_device(dirpath, dir_stat.st_dev)):
+                self._skip_mount(dirpath)
+                return [], []
+            
+            # Same directory reached through another root or a bind mount
+            if self._visited_dirs is not None and not self._claim_directory(dir_stat):
+                return [], []
+        
+        # Denied or empty last time and unchanged since (negative cache)
+        if (self._denied or self._empty) and self._skip_negative(dirpath, dir_stat):
+            return [], []
+        
+        if use_index:
+            listing = self._indexed_read_directory(dirpath, dir_stat.st_mtime_ns)
+        else:
+            listing = self._read_directory(dirpath)
+        
+        if listing is None:
+            return [], []
+        
+        file_entries, dir_entries = listing
+        join = os.path.join
+        
+        files = []
+        if file_entries:
+            dir_id = self.directories.intern(dirpath)
+            files = [(dir_id, name, stat) for name, stat in file_entries]
+        if self._visited_files is not None:
+            files = self._drop_seen_inodes(files)
+        
+        # Symlinked directories are skipped (same as os.walk) unless following
+        # is on, and excluded subtrees are pruned here so they are never listed
+        excludes = self.exclusions.excludes
+        mounts = self.mounts
+        subdirs = []
+        for name, is_symlink in dir_entries:
+            if is_symlink and not self.follow_symlinks:
+                continue
+            subdir = join(dirpath, name)
+            if excludes(subdir, name):
+                continue
+            if is_symlink and not self._follow_link(subdir):
+                continue
+            # Pseudo filesystems are recognized from the mount table, without a stat
+            if mounts:
+                mount = mounts.get(subdir)
+                if mount is not None and mounts.is_pseudo(mount):
+                    self._skip_mount(subdir)
+                    continue
+            subdirs.append(subdir)
+        
+        return files, subdirs
+    
+    def _may_enter_device(self, dirpath: str, device: int) -> bool:
+        """Sharded worker: check a directory on another device than its root"""
+        if device in self._entered_devs:
+            return True
+        if not self.shard_worker:
+            return False
+        mount = self.mounts.get(dirpath)
+        if mount is None or self.mounts.is_storage(mount):
+            return False
+        self._entered_devs.add(device)
+        return True
+    
+    def _register_roots(self, roots: List[str]):
+        """Remember scan roots (resolved) so symlinks into them are not followed"""
+        for root in roots:
+            real = os.path.normcase(os.path.realpath(root))
+            if real not in self._root_realpaths:
+                self._root_realpaths.append(real)
+    
+    def _follow_link(self, link_path: str) -> bool:
+        """Decide whether to descend into a symlinked directory (counted in self.stats)"""
+        try:
+            target_stat = os.stat(link_path)
+            target = os.path.normcase(os.path.realpath(link_path))
+        except OSError:
+            self.stats.record_link('broken')
+            return False
+        
+        # Inside a scan root: walked through its real path already (or soon)
+        for root in self._root_realpaths:
+            prefix = root if root.endswith(os.sep) else root + os.sep
+            if target == root or target.startswith(prefix):
+                self.stats.record_link('skipped')
+                return False
+        if not self.is_safe_directory(target):
+            self.stats.record_link('skipped')
+            return False
+        
+        # Each target directory once: also breaks link cycles outside the roots
+        key = (target_stat.st_dev, target_stat.st_ino)
+        with self._visited_lock:
+            if key in self._followed_links:
+                self.stats.record_link('skipped')
+                return False
+            self._followed_links.add(key)
+        if self.shard_worker:
+            # Walked by this worker: its device passes the one-filesystem check
+            self._entered_devs.add(target_stat.st_dev)
+        self.stats.record_link('followed')
+        return True
+    
+    def _walk(self, root_path: str) -> Generator[Tuple[int, str, os.stat_result], None, None]:
+        """Yield (dir_id, name, stat) for every safe file, using the configured walker"""
+        if self.workers > 1:
+            return self._walk_parallel(root_path)
+        return self._walk_sequential(root_path)
+    
+    def _walk_sequential(self, root_path: str) -> Generator[Tuple[int, str, os.stat_result], None, None]:
+        """
+        Depth-first scandir traversal yielding (dir_id, name, stat) for every safe file.
+        Visits directories in the same order as os.walk(topdown=True).
+        """
+        stack = [root_path]
+        
+        while stack:
+            if self.cancelled:
+                break
+            
+            dirpath = stack.pop()
+            files, subdirs = self._list_directory(dirpath)
+            
+            yield from files
+            
+            # Reverse so the first subdirectory is visited first
+            stack.extend(reversed(subdirs))
+    
+    def _walk_parallel(self, root_path: str) -> Generator[Tuple[int, str, os.stat_result], None, None]:
+        """
+        Parallel scandir traversal with work stealing (order is not deterministic).
+        
+        Each worker thread owns a deque of directories: it pushes the subdirectories
+        it discovers and pops the newest one (depth-first, cache friendly). An idle
+        worker steals the oldest directory from another worker's deque, which is
+        usually the root of a large unexplored subtree. Listed files are streamed
+        to this generator through a bounded queue, so a slow consumer throttles
+        the workers instead of buffering the whole drive in memory.
+        """
+        worker_count = self.workers
+        deques = [deque() for _ in range(worker_count)]
+        deques[0].append(root_path)
+        pending = [1]  # Directories queued or being listed
+        work_cond = threading.Condition()
+        stop = threading.Event()
+        results = queue.Queue(maxsize=getattr(config, 'SCAN_QUEUE_SIZE', 256))
+        done_marker = object()
+        
+        def take_directory(index):
+            """Pop from own deque, otherwise steal; None when the walk is over"""
+            with work_cond:
+                while True:
+                    if stop.is_set() or self.cancelled:
+                        return None
+                    own = deques[index]
+                    if own:
+                        return own.pop()
+                    for offset in range(1, worker_count):
+                        victim = deques[(index + offset) % worker_count]
+                        if victim:
+                            return victim.popleft()
+                    if pending[0] == 0:
+                        return None
+                    work_cond.wait(0.1)
+        
+        def put_result(item) -> bool:
+            """Blocking put that gives up once the consumer has stopped"""
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def worker(index):
+            try:
+                while True:
+                    dirpath = take_directory(index)
+                    if dirpath is None:
+                        break
+                    try:
+                        files, subdirs = self._list_directory(dirpath)
+                        if subdirs:
+                            with work_cond:
+                                pending[0] += len(subdirs)
+                                deques[index].extend(reversed(subdirs))
+                                work_cond.notify_all()
+                        if files and not put_result(files):
+                            break
+                    finally:
+                        with work_cond:
+                            pending[0] -= 1
+                            if pending[0] == 0:
+                                work_cond.notify_all()
+            finally:
+                put_result(done_marker)
+        
+        threads = [
+            threading.Thread(target=worker, args=(i,), daemon=True, name=f"scan-worker-{i}")
+            for i in range(worker_count)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        try:
+            active = worker_count
+            while active:
+                if self.cancelled:
+                    break
+                try:
+                    item = results.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is done_marker:
+                    active -= 1
+                    continue
+                yield from item
+        finally:
+            # Stop workers (also on cancel or early close) and unblock pending puts
+            stop.set()
+            with work_cond:
+                work_cond.notify_all()
+            for thread in threads:
+                while thread.is_alive():
+                    try:
+                        results.get_nowait()
+                    except queue.Empty:
+                        thread.join(0.05)
+    
+    def _enter_root(self, root_path: str) -> bool:
+        """Check a root before walking it; False if it can't be scanned"""
         if not self.is_safe_directory(root_path):
+            return False
+        
+        self.stats.add_root(root_path)
+        self._register_roots([root_path])
+        self.stats.record_stat()
+        try:
+            root_stat = os.stat(root_path)
+        except OSError as e:
+            # Missing or unreadable root: nothing below it can be scanned
+            self.stats.record_root_error(root_path, e)
+            return False
+        self._root_dev = root_stat.st_dev if self.one_filesystem else None
+        self._entered_devs = set()
+        return True
+    
+    def _scan(self, root_path: str,
+              min_size: int = 0,
+              max_size: Optional[int] = None) -> Generator[Tuple[int, str, os.stat_result], None, None]:
+        """Shared scan loop: counting, progress reporting and size filtering"""
+        if not self._enter_root(root_path):
             return
         
+        progress = self.progress
         try:
-            for dirpath, dirnames, filenames in os.walk(root_path):
+            for entry in self._walk(root_path):
+                stat = entry[2]
                 if self.cancelled:
                     break
                 
-                # Filter out unsafe directories (just check name, not full path)
-                dirnames[:] = [d for d in dirnames if self._is_dirname_safe(d)]
+                file_size = stat.st_size
+                
+                # Count ALL files scanned (before filtering)
+                self.files_scanned += 1
+                
+                # Coalesced: listeners/readers see it at most every PROGRESS_INTERVAL
+                progress.advance(1, file_size, entry[1])
+                
+                # Filter by size
+                if file_size < min_size:
+                    continue
+                
+                if max_size is not None and file_size > max_size:
+                    continue
+                
+                yield entry
                 
-                for filename in filenames:
-                    if self.cancelled:
-                        break
-                    
-                    # Skip system-critical files (.sys, .drv, pagefile.sys, etc.)
-                    if not self._is_file_safe(filename):
-                        continue
-                    
-                    filepath = os.path.join(dirpath, filename)
-                    
-                    try:
-                        # Check if file is accessible and meets size criteria
-                        stat = os.stat(filepath)
-                        file_size = stat.st_size
-                        
-                        # Count ALL files scanned (before filtering)
-                        self.files_scanned += 1
-                        
-                        # Report progress every 500 files (reduced overhead)
-                        if self.progress_callback and self.files_scanned % 500 == 0:
-                            self.progress_callback(self.files_scanned, filepath)
-                        
-                        # Filter by size
-                        if file_size < min_size:
-                            continue
-                        
-                        if max_size is not None and file_size > max_size:
-                            continue
-                        
-                        yield filepath
-                        
-                    except (OSError, PermissionError):
-                        # Skip files we can't access
-                        continue
-                        
         except Exception as e:
             print(f"Error scanning {root_path}: {e}")
+            self.stats.record_root_error(root_path, e)
+        finally:
+            # Commit index and negative cache updates from this scan (batch commit)
+            if self.negative is not None:
+                self.negative.flush()
+            progress.flush()
+            self.stats.finish()
+            self._root_dev = None
+    
+    def scan_directory(self, root_path: str, 
+                      min_size: int = 0, 
+                      max_size: Optional[int] = None) -> Generator[str, None, None]:
+        """
+        Scan directory and yield file paths
+        
+        Args:
+            root_path: Root directory to scan
+            min_size: Minimum file size in bytes
+            max_size: Maximum file size in bytes (None for no limit)
+            
+        Yields:
+            Full file paths
+        """
+        self._begin_scan()
+        
+        for entry in self._scan(root_path, min_size, max_size):
+            yield self.entry_path(entry)
     
     def scan_directory_with_stat(self, root_path: str, 
                                   min_size: int = 0, 
@@ -166,53 +753,264 @@ class FileScanner:
         Yields:
             Tuple of (filepath, stat_result)
         """
-        self.files_scanned = 0
-        self.cancelled = False
+        self._begin_scan()
         
-        if not self.is_safe_directory(root_path):
+        join = self.directories.join
+        for dir_id, name, stat in self._scan(root_path, min_size, max_size):
+            yield (join(dir_id, name), stat)
+    
+    def scan_roots_entries(self, directories: List[str],
+                           min_size: int = 0,
+                           max_size: Optional[int] = None,
+                           unique_inodes: bool = True) -> Generator[tuple, None, None]:
+        """
+        Scan several roots as one scan, visiting each physical file once.
+        
+        Nested and repeated roots are collapsed (see normalize_roots), directories
+        are tracked by (st_dev, st_ino) so bind mounts and overlapping roots are
+        walked once, and hardlinked files are yielded for their first path only.
+        Skipped counts are available in self.overlap_skipped afterwards.
+        In sharded mode, roots on two or more devices are scanned in parallel
+        worker processes (see ShardedScan) and files arrive in no fixed order.
+        
+        Args:
+            directories: Root directories to scan
+            min_size: Minimum file size in bytes
+            max_size: Maximum file size in bytes (None for no limit)
+            unique_inodes: Yield hardlinked files once (False = every path, for
+                           callers that group hardlinks themselves)
+            
+        Yields:
+            Tuple of (dir_id, name, stat_result); the directory path is interned
+            in self.directories (see entry_path())
+        """
+        self._begin_scan()
+        
+        roots, skipped = self.normalize_roots(directories)
+        self.overlap_skipped = {'roots': len(skipped), 'directories': 0, 'files': 0}
+        self._register_roots(roots)
+        
+        if self.sharded:
+            shards = plan_shards(roots, self.mounts, self.exclusions,
+                                 include_submounts=not self.one_filesystem)
+            if len(shards) > 1:
+                yield from ShardedScan(self, shards).run(min_size, max_size, unique_inodes)
+                return
+        
+        self._visited_dirs = set()
+        self._visited_files = set() if unique_inodes else None
+        
+        try:
+            for root in roots:
+                if self.cancelled:
+                    break
+                yield from self._scan(root, min_size, max_size)
+        finally:
+            self._visited_dirs = None
+            self._visited_files = None
+    
+    def scan_names(self, directories: List[str],
+                   match: Optional[Callable[[str], bool]] = None) -> Generator[Tuple[int, str], None, None]:
+        """
+        Name-only scan: list directories without stat-ing their files
+        
+        Files are recognized from the directory entry type (d_type on Linux,
+        the find data on Windows), so a directory costs one listing and files
+        cost nothing beyond it; symlinks and entries of unknown type are the
+        only ones stat-ed. Sizes, times and inode checks are not available:
+        stat the matches later (FileRecord.load_stat()). Overlapping roots
+        are still collapsed, but directories are not tracked by inode, the
+        directory index is not used and roots are not sharded.
+        
+        Args:
+            directories: Root directories to scan
+            match: Optional match(name) -> True to yield the file
+        
+        Yields:
+            Tuple of (dir_id, name) for every matching safe file
+        """
+        self._begin_scan()
+        
+        roots, skipped = self.normalize_roots(directories)
+        self.overlap_skipped = {'roots': len(skipped), 'directories': 0, 'files': 0}
+        self._register_roots(roots)
+        self._names_only = True
+        try:
+            for root in roots:
+                if self.cancelled:
+                    break
+                yield from self._scan_names(root, match)
+        finally:
+            self._names_only = False
+    
+    def _scan_names(self, root_path: str,
+                    match: Optional[Callable[[str], bool]]) -> Generator[Tuple[int, str], None, None]:
+        """scan_names() loop for one root: counting, progress and matching"""
+        if not self._enter_root(root_path):
             return
         
+        progress = self.progress
         try:
-            for dirpath, dirnames, filenames in os.walk(root_path):
+            for dir_id, name, _ in self._walk(root_path):
                 if self.cancelled:
                     break
-                
-                # Filter out unsafe directories (just check name, not full path)
-                dirnames[:] = [d for d in dirnames if self._is_dirname_safe(d)]
-                
-                for filename in filenames:
-                    if self.cancelled:
-                        break
-                    
-                    # Skip system-critical files (.sys, .drv, pagefile.sys, etc.)
-                    if not self._is_file_safe(filename):
-                        continue
-                    
-                    filepath = os.path.join(dirpath, filename)
-                    
-                    try:
-                        stat = os.stat(filepath)
-                        file_size = stat.st_size
-                        
-                        self.files_scanned += 1
-                        
-                        if self.progress_callback and self.files_scanned % 500 == 0:
-                            self.progress_callback(self.files_scanned, filepath)
-                        
-                        if file_size < min_size:
-                            continue
-                        if max_size is not None and file_size > max_size:
-                            continue
-                        
-                        yield (filepath, stat)
-                        
-                    except (OSError, PermissionError):
-                        continue
-                        
+                self.files_scanned += 1
+                progress.advance(1, 0, name)
+                if match is None or match(name):
+                    yield (dir_id, name)
         except Exception as e:
             print(f"Error scanning {root_path}: {e}")
+            self.stats.record_root_error(root_path, e)
+        finally:
+            progress.flush()
+            self.stats.finish()
+            self._root_dev = None
+    
+    def scan_roots_with_stat(self, directories: List[str],
+                             min_size: int = 0,
+                             max_size: Optional[int] = None,
+                             unique_inodes: bool = True) -> Generator[tuple, None, None]:
+        """Same as scan_roots_entries() but yields (filepath, stat_result)"""
+        join = self.directories.join
+        for dir_id, name, stat in self.scan_roots_entries(directories, min_size, max_size,
+                                                          unique_inodes):
+            yield (join(dir_id, name), stat)
+    
+    def _root_scanner(self) -> 'FileScanner':
+        """
+        Copy of this scanner for one root of a concurrent scan: shares the index,
+        exclusions, progress channel, mount table and visited sets, but has its
+        own cancel flag, file count and root device
+        """
+        child = copy.copy(self)
+        child.cancelled = False
+        child.files_scanned = 0
+        child._root_dev = None
+        child._children = []
+        return child
+    
+    async def ascan(self, directories: List[str],
+                    min_size: int = 0,
+                    max_size: Optional[int] = None,
+                    max_concurrent_roots: Optional[int] = None,
+                    queue_size: Optional[int] = None) -> AsyncIterator[FileRecord]:
+        """
+        Async version of scan_roots_records(): async for record in scanner.ascan(roots)
+        
+        Each root is walked on a worker thread (up to max_concurrent_roots at
+        once, each with its own directory-listing threads) and records are
+        handed to the event loop in batches through a bounded queue, so a slow
+        consumer pauses the walkers instead of buffering the drive in memory.
+        Cancelling the consuming task, breaking out of the loop or calling
+        cancel() stops all root walkers.
+        
+        Args:
+            directories: Root directories to scan
+            min_size: Minimum file size in bytes
+            max_size: Maximum file size in bytes (None for no limit)
+            max_concurrent_roots: Roots walked at the same time
+                                  (None = config.ASYNC_MAX_ROOTS)
+            queue_size: Batches buffered between walkers and the consumer
+                        (None = config.ASYNC_QUEUE_SIZE)
+        
+        Yields:
+            FileRecord for every file, each physical file once (see scan_roots_entries)
+        """
+        if max_concurrent_roots is None:
+            max_concurrent_roots = getattr(config, 'ASYNC_MAX_ROOTS', 2)
+        batch_size = getattr(config, 'ASYNC_BATCH_SIZE', 256)
+        
+        loop = asyncio.get_running_loop()
+        channel = AsyncChannel(loop, queue_size)
+        done_marker = object()
+        count_lock = threading.Lock()
+        
+        self._begin_scan()
+        roots, skipped = self.normalize_roots(directories)
+        self.overlap_skipped = {'roots': len(skipped), 'directories': 0, 'files': 0}
+        self._register_roots(roots)
+        self._visited_dirs = set()
+        self._visited_files = set()
+        
+        def scan_root(root):
+            child = self._root_scanner()
+            self._children.append(child)
+            if self.cancelled:
+                child.cancelled = True
+            batch = []
+            try:
+                for entry in child._scan(root, min_size, max_size):
+                    batch.append(entry)
+                    if len(batch) >= batch_size:
+                        if not channel.put(batch):
+                            child.cancel()
+                            break
+                        batch = []
+                if batch:
+                    channel.put(batch)
+            finally:
+                self._children.remove(child)
+                with count_lock:
+                    self.files_scanned += child.files_scanned
+                channel.put(done_marker)
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrent_roots, len(roots) or 1)),
+                                      thread_name_prefix='ascan-root')
+        futures = [executor.submit(scan_root, root) for root in roots]
+        remaining = len(futures)
+        
+        try:
+            while remaining:
+                item = await channel.get()
+                if item is done_marker:
+                    remaining -= 1
+                    continue
+                for dir_id, name, stat in item:
+                    yield FileRecord.from_entry(dir_id, name, stat, self.directories)
+                if self.cancelled:
+                    break
+        finally:
+            # Stop walkers on cancel/break/error, then wait for them to exit
+            channel.close()
+            if remaining:
+                self.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            await asyncio.gather(*(asyncio.wrap_future(future) for future in futures),
+                                 return_exceptions=True)
+            self._visited_dirs = None
+            self._visited_files = None
+    
+    def scan_roots_records(self, directories: List[str],
+                           min_size: int = 0,
+                           max_size: Optional[int] = None) -> Generator[FileRecord, None, None]:
+        """Same as scan_roots_entries() but yields FileRecords (no path strings built)"""
+        for dir_id, name, stat in self.scan_roots_entries(directories, min_size, max_size):
+            yield FileRecord.from_entry(dir_id, name, stat, self.directories)
+    
+    def scan_roots(self, directories: List[str],
+                   min_size: int = 0,
+                   max_size: Optional[int] = None) -> Generator[str, None, None]:
+        """Same as scan_roots_entries() but yields file paths only"""
+        for entry in self.scan_roots_entries(directories, min_size, max_size):
+            yield self.entry_path(entry)
+    
+    def new_directory_table(self) -> DirectoryTable:
+        """
+        Intern the next scan's directories into a fresh table
+        
+        Records and result stores keep a reference to the table they were
+        interned in, so the old one is freed with the results of its scan
+        instead of growing for the life of the process. Called by QueryEngine
+        at the start of every run.
+        """
+        self.directories = DirectoryTable()
+        return self.directories
+    
+    def entry_path(self, entry: Tuple[int, str, os.stat_result]) -> str:
+        """Full path of a (dir_id, name, stat) scan entry"""
+        return self.directories.join(entry[0], entry[1])
     
-    def get_file_info(self, filepath: str, cached_stat: Optional[os.stat_result] = None) -> dict:
+    def get_file_info(self, filepath: str, cached_stat: Optional[os.stat_result] = None) -> FileRecord:
         """
         Get detailed file information
         
@@ -221,20 +1019,10 @@ class FileScanner:
             cached_stat: Optional pre-fetched stat result to avoid duplicate syscall
             
         Returns:
-            Dictionary with file information
+            FileRecord with file information (read like a dict: info['size'])
         """
         try:
             stat = cached_stat if cached_stat else os.stat(filepath)
-            return {
-                'path': filepath,
-                'name': os.path.basename(filepath),
-                'size': stat.st_size,
-                'modified': stat.st_mtime,
-                'created': stat.st_ctime,
-                'extension': os.path.splitext(filepath)[1].lower()
-            }
+            return FileRecord.from_stat(filepath, stat, self.directories)
         except (OSError, PermissionError) as e:
-            return {
-                'path': filepath,
-                'error': str(e)
-            }
+            return FileRecord(filepath, error=str(e), directories=self.directories)
@@ -0,0 +1,169 @@
+"""
+Registry of digest algorithms used for full-file hashing
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+import xxhash
+
+import config
+
+# BLAKE3 is optional - registered when the blake3 package is installed
+try:
+    import blake3
+    HAS_BLAKE3 = True
+except ImportError:
+    blake3 = None
+    HAS_BLAKE3 = False
+
+
+class HashBackend:
+    """A named digest algorithm
+    
+    collision_safe: the digest is wide enough (128+ bits) that two different
+    files sharing it by accident is not a practical concern, so a match can be
+    reported as a duplicate. Only these backends are picked by 'auto'.
+    """
+    
+    def __init__(self, name: str, factory: Callable, digest_bits: int,
+                 collision_safe: Optional[bool] = None):
+        """
+        Initialize backend
+        
+        Args:
+            name: Algorithm id, recorded with every digest
+            factory: Returns a new hash object (update/hexdigest/copy)
+            digest_bits: Digest width in bits
+            collision_safe: Usable by 'auto' (None = digest_bits >= 128)
+        """
+        self.name = name
+        self.factory = factory
+        self.digest_bits = digest_bits
+        self.collision_safe = collision_safe if collision_safe is not None else digest_bits >= 128
+    
+    def new(self):
+        """Empty hash object"""
+        return self.factory()
+    
+    def __repr__(self):
+        return f"HashBackend({self.name!r}, {self.digest_bits} bits)"
+
+
+_backends: Dict[str, HashBackend] = {}
+_fastest: Optional[str] = None  # Backend 'auto' stands for (benchmarked once per process)
+_fastest_lock = threading.Lock()
+
+
+def register_backend(name: str, factory: Callable, digest_bits: int,
+                     collision_safe: Optional[bool] = None) -> HashBackend:
+    """Add (or replace) a backend; see HashBackend for the arguments"""
+    global _fastest
+    backend = HashBackend(name, factory, digest_bits, collision_safe)
+    _backends[name] = backend
+    _fastest = None  # Candidates changed: benchmark again
+    return backend
+
+
+def backends() -> List[HashBackend]:
+    """All registered backends"""
+    return list(_backends.values())
+
+
+def get_backend(name: str) -> HashBackend:
+    """
+    Backend for an algorithm id
+    
+    Names that are not registered but known to hashlib (md5, sha1, ...) still
+    work; they are never picked by 'auto'.
+    
+    Raises:
+        ValueError: Unknown algorithm
+    """
+    backend = _backends.get(name)
+    if backend is not None:
+        return backend
+    probe = hashlib.new(name)  # ValueError if unknown
+    return HashBackend(name, lambda: hashlib.new(name), probe.digest_size * 8, False)
+
+
+def benchmark(sample_size: Optional[int] = None, rounds: int = 3) -> Dict[str, float]:
+    """
+    Measure each backend's throughput on this CPU
+    
+    Args:
+        sample_size: Bytes hashed per round (None = config.HASH_BENCHMARK_SIZE)
+        rounds: Rounds per backend (the best one counts)
+    
+    Returns:
+        Algorithm id -> bytes per second
+    """
+    if sample_size is None:
+        sample_size = getattr(config, 'HASH_BENCHMARK_SIZE', 4 * 1024 * 1024)
+    data = memoryview(os.urandom(sample_size))
+    results = {}
+    for backend in backends():
+        best = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            hash_obj = backend.new()
+            hash_obj.update(data)
+            hash_obj.hexdigest()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[backend.name] = sample_size / max(best, 1e-9)
+    return results
+
+
+def fastest_backend(previous: Optional[str] = None) -> str:
+    """
+    Fastest collision-safe backend, benchmarked on first use
+    
+    Args:
+        previous: Choice of an earlier run (e.g. stored with the hash cache),
+                  taken instead of benchmarking while it is still a registered
+                  collision-safe backend, so 'auto' does not flip between
+                  backends of similar speed from one run to the next
+    """
+    global _fastest
+    with _fastest_lock:
+        backend = _backends.get(previous) if previous else None
+        if backend is not None and backend.collision_safe:
+            _fastest = previous
+        elif _fastest is None:
+            rates = benchmark()
+            safe = [name for name in rates if _backends[name].collision_safe]
+            _fastest = max(safe, key=rates.get)
+        return _fastest
+
+
+def resolve_algorithm(name: Optional[str] = None, previous: Optional[str] = None) -> str:
+    """Algorithm id for name (None = config.HASH_ALGORITHM, 'auto' = fastest_backend(previous))"""
+    if name is None:
+        name = getattr(config, 'HASH_ALGORITHM', 'auto')
+    if name == 'auto':
+        return fastest_backend(previous)
+    return name
+
+
+def tag_digest(algorithm: str, hexdigest: str) -> str:
+    """Digest with its algorithm id ('xxh3_128:...'), so only like compares with like"""
+    return f"{algorithm}:{hexdigest}"
+
+
+def digest_algorithm(digest: Optional[str]) -> Optional[str]:
+    """Algorithm id of a digest made by tag_digest() (None for untagged digests)"""
+    if not digest or ':' not in digest:
+        return None
+    return digest.split(':', 1)[0]
+
+
+register_backend('xxh64', xxhash.xxh64, 64)
+register_backend('xxh3_64', xxhash.xxh3_64, 64)
+register_backend('xxh3_128', xxhash.xxh3_128, 128)
+register_backend('blake2b', hashlib.blake2b, 512)
+register_backend('sha256', hashlib.sha256, 256)
+if HAS_BLAKE3:
+    register_backend('blake3', blake3.blake3, 256)
@@ -1,6 +1,7 @@
 """
 Hash cache manager using SQLite for persistent storage
 Caches file hashes based on path, size, and mtime
+Paths are stored as (directory id, file name), each directory path once
 """
 
 import sqlite3
@@ -31,6 +32,7 @@ class HashCache:
         self.db_path = db_path
         self.conn = None
         self.db_lock = threading.Lock()  # Thread-safe database access
+        self._dir_ids = {}  # Directory path -> directories.id (in-memory lookup)
         self._init_database()
     
     def _init_database(self):
@@ -39,31 +41,100 @@ class HashCache:
         self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         cursor = self.conn.cursor()
         
+        # Create directory table (each directory path stored once)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS directories (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE
+            )
+        ''')
+        
         # Create cache table
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS file_cache (
-                path TEXT PRIMARY KEY,
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                dir_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
                 size INTEGER NOT NULL,
                 mtime REAL NOT NULL,
                 quick_hash TEXT,
                 full_hash TEXT,
-                last_checked REAL NOT NULL
-            )
+                last_checked REAL NOT NULL,
+                PRIMARY KEY (dir_id, name)
+            ) WITHOUT ROWID
         ''')
         
         # Create indexes for performance
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_size_mtime 
-            ON file_cache(size, mtime)
+            CREATE INDEX IF NOT EXISTS idx_hashes_last_checked 
+            ON file_hashes(last_checked)
         ''')
         
+        # Settings that cached hashes depend on (e.g. the algorithm 'auto' picked)
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_last_checked 
-            ON file_cache(last_checked)
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
         ''')
         
+        self._migrate_path_table(cursor)
         self.conn.commit()
     
+    def _migrate_path_table(self, cursor):
+        """Move rows from the old full-path file_cache table, then drop it"""
+        cursor.execute('''
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name = 'file_cache'
+        ''')
+        if not cursor.fetchone():
+            return
+        
+        cursor.execute('''
+            SELECT path, size, mtime, quick_hash, full_hash, last_checked
+            FROM file_cache
+        ''')
+        rows = []
+        for path, size, mtime, quick_hash, full_hash, last_checked in cursor.fetchall():
+            dirpath, name = os.path.split(path)
+            rows.append((self._get_dir_id(cursor, dirpath, create=True), name,
+                         size, mtime, quick_hash, full_hash, last_checked))
+        
+        cursor.executemany('''
+            INSERT OR REPLACE INTO file_hashes
+            (dir_id, name, size, mtime, quick_hash, full_hash, last_checked)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        cursor.execute('DROP TABLE file_cache')
+    
+    def _get_dir_id(self, cursor, dirpath: str, create: bool = False) -> Optional[int]:
+        """
+        Get the id of a directory path (call with db_lock held)
+        
+        Args:
+            cursor: Database cursor
+            dirpath: Directory path
+            create: Insert the directory if it is not known yet
+            
+        Returns:
+            Directory id, or None if unknown and create is False
+        """
+        dir_id = self._dir_ids.get(dirpath)
+        if dir_id is not None:
+            return dir_id
+        
+        cursor.execute('SELECT id FROM directories WHERE path = ?', (dirpath,))
+        row = cursor.fetchone()
+        if row:
+            dir_id = row[0]
+        elif create:
+            cursor.execute('INSERT INTO directories (path) VALUES (?)', (dirpath,))
+            dir_id = cursor.lastrowid
+        else:
+            return None
+        
+        self._dir_ids[dirpath] = dir_id
+        return dir_id
+    
     def get_cached_hash(self, filepath: str) -> Optional[Tuple[str, str]]:
         """
         Get cached hash if file hasn't changed
@@ -79,14 +150,19 @@ class HashCache:
             stat = os.stat(filepath)
             file_size = stat.st_size
             file_mtime = stat.st_mtime
+            dirpath, name = os.path.split(filepath)
             
             with self.db_lock:  # Thread-safe access
                 cursor = self.conn.cursor()
+                dir_id = self._get_dir_id(cursor, dirpath)
+                if dir_id is None:
+                    return None
+                
                 cursor.execute('''
                     SELECT quick_hash, full_hash 
-                    FROM file_cache 
-                    WHERE path = ? AND size = ? AND mtime = ?
-                ''', (filepath, file_size, file_mtime))
+                    FROM file_hashes 
+                    WHERE dir_id = ? AND name = ? AND size = ? AND mtime = ?
+                ''', (dir_id, name, file_size, file_mtime))
                 
                 result = cursor.fetchone()
             
@@ -115,20 +191,139 @@ class HashCache:
             file_size = stat.st_size
             file_mtime = stat.st_mtime
             current_time = time.time()
+            dirpath, name = os.path.split(filepath)
             
             with self.db_lock:  # Thread-safe access
                 cursor = self.conn.cursor()
+                dir_id = self._get_dir_id(cursor, dirpath, create=True)
                 cursor.execute('''
-                    INSERT OR REPLACE INTO file_cache 
-                    (path, size, mtime, quick_hash, full_hash, last_checked)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (filepath, file_size, file_mtime, quick_hash, full_hash, current_time))
+                    INSERT OR REPLACE INTO file_hashes 
+                    (dir_id, name, size, mtime, quick_hash, full_hash, last_checked)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (dir_id, name, file_size, file_mtime, quick_hash, full_hash, current_time))
                 # NO commit here - batched for performance
-            
+        
         except (OSError, sqlite3.Error) as e:
             # Silently fail - cache is optional
             pass
     
+    def remove_entry(self, filepath: str):
+        """
+        Forget a deleted or rewritten file (batched - call flush() when done)
+        
+        Args:
+            filepath: Path to file
+        """
+        dirpath, name = os.path.split(filepath)
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                dir_id = self._get_dir_id(cursor, dirpath)
+                if dir_id is not None:
+                    cursor.execute('DELETE FROM file_hashes WHERE dir_id = ? AND name = ?',
+                                   (dir_id, name))
+        except sqlite3.Error:
+            pass
+    
+    def rename_entry(self, old_path: str, new_path: str):
+        """
+        Keep the hashes of a moved file (batched - call flush() when done)
+        
+        Args:
+            old_path: Path before the move
+            new_path: Path after the move
+        """
+        old_dir, old_name = os.path.split(old_path)
+        new_dir, new_name = os.path.split(new_path)
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                old_dir_id = self._get_dir_id(cursor, old_dir)
+                if old_dir_id is None:
+                    return
+                new_dir_id = self._get_dir_id(cursor, new_dir, create=True)
+                cursor.execute('DELETE FROM file_hashes WHERE dir_id = ? AND name = ?',
+                               (new_dir_id, new_name))
+                cursor.execute('''
+                    UPDATE file_hashes SET dir_id = ?, name = ?
+                    WHERE dir_id = ? AND name = ?
+                ''', (new_dir_id, new_name, old_dir_id, old_name))
+        except sqlite3.Error:
+            pass
+    
+    @staticmethod
+    def _subtree_pattern(dirpath: str) -> str:
+        """LIKE pattern (escape '!') matching every path below a directory"""
+        prefix = dirpath.rstrip('/\\') + os.sep
+        return prefix.replace('!', '!!').replace('%', '!%').replace('_', '!_') + '%'
+    
+    def remove_tree(self, dirpath: str):
+        """
+        Forget all files in and below a deleted directory (batched)
+        
+        Args:
+            dirpath: Directory path
+        """
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    DELETE FROM file_hashes WHERE dir_id IN (
+                        SELECT id FROM directories WHERE path = ? OR path LIKE ? ESCAPE '!'
+                    )
+                ''', (dirpath, self._subtree_pattern(dirpath)))
+        except sqlite3.Error:
+            pass
+    
+    def rename_tree(self, old_dir: str, new_dir: str):
+        """
+        Keep the hashes of all files below a moved directory (batched)
+        
+        Args:
+            old_dir: Directory path before the move
+            new_dir: Directory path after the move
+        """
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                # Whatever was cached under the destination is gone now
+                cursor.execute('''
+                    DELETE FROM file_hashes WHERE dir_id IN (
+                        SELECT id FROM directories WHERE path = ? OR path LIKE ? ESCAPE '!'
+                    )
+                ''', (new_dir, self._subtree_pattern(new_dir)))
+                cursor.execute('''
+                    DELETE FROM directories WHERE path = ? OR path LIKE ? ESCAPE '!'
+                ''', (new_dir, self._subtree_pattern(new_dir)))
+                cursor.execute('''
+                    UPDATE directories SET path = ? || substr(path, ?)
+                    WHERE path = ? OR path LIKE ? ESCAPE '!'
+                ''', (new_dir, len(old_dir) + 1, old_dir, self._subtree_pattern(old_dir)))
+                self._dir_ids.clear()
+        except sqlite3.Error:
+            pass
+    
+    def get_meta(self, key: str) -> Optional[str]:
+        """Stored setting, or None if not set"""
+        try:
+            with self.db_lock:
+                cursor = self.conn.cursor()
+                cursor.execute('SELECT value FROM meta WHERE key = ?', (key,))
+                row = cursor.fetchone()
+            return row[0] if row else None
+        except sqlite3.Error:
+            return None
+    
+    def set_meta(self, key: str, value: str):
+        """Store a setting (committed right away)"""
+        try:
+            with self.db_lock:
+                self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                  (key, value))
+                self.conn.commit()
+        except sqlite3.Error:
+            pass
+    
     def flush(self):
         """Commit all pending cache updates to database"""
         try:
@@ -149,11 +344,12 @@ class HashCache:
             
             cursor = self.conn.cursor()
             cursor.execute('''
-                DELETE FROM file_cache 
+                DELETE FROM file_hashes 
                 WHERE last_checked < ?
             ''', (cutoff_time,))
             
             deleted_count = cursor.rowcount
+            self._delete_unused_directories(cursor)
             self.conn.commit()
             
             return deleted_count
@@ -174,30 +370,40 @@ class HashCache:
         """
         try:
             cursor = self.conn.cursor()
-            cursor.execute('SELECT path FROM file_cache')
+            cursor.execute('''
+                SELECT f.dir_id, f.name, d.path
+                FROM file_hashes f JOIN directories d ON d.id = f.dir_id
+            ''')
             
-            orphaned_paths = []
-            for (file_path,) in cursor.fetchall():
-                if not os.path.exists(file_path):
-                    orphaned_paths.append(file_path)
+            orphaned_keys = []
+            for dir_id, name, dirpath in cursor.fetchall():
+                if not os.path.exists(os.path.join(dirpath, name)):
+                    orphaned_keys.append((dir_id, name))
             
-            if orphaned_paths:
+            if orphaned_keys:
                 # Delete in batches
-                for i in range(0, len(orphaned_paths), batch_size):
-                    batch = orphaned_paths[i:i + batch_size]
-                    placeholders = ','.join('?' * len(batch))
-                    cursor.execute(f'''
-                        DELETE FROM file_cache 
-                        WHERE path IN ({placeholders})
-                    ''', batch)
+                for i in range(0, len(orphaned_keys), batch_size):
+                    cursor.executemany('''
+                        DELETE FROM file_hashes 
+                        WHERE dir_id = ? AND name = ?
+                    ''', orphaned_keys[i:i + batch_size])
+                self._delete_unused_directories(cursor)
                 self.conn.commit()
             
-            return len(orphaned_paths)
+            return len(orphaned_keys)
             
         except sqlite3.Error as e:
             print(f"Orphan cleanup error: {e}")
             return 0
     
+    def _delete_unused_directories(self, cursor):
+        """Remove directory rows no cached file refers to any more"""
+        cursor.execute('''
+            DELETE FROM directories
+            WHERE id NOT IN (SELECT DISTINCT dir_id FROM file_hashes)
+        ''')
+        self._dir_ids.clear()
+    
     def vacuum(self):
         """Compact database to reclaim space"""
         try:
@@ -217,7 +423,7 @@ class HashCache:
             cursor = self.conn.cursor()
             
             # Total entries
-            cursor.execute('SELECT COUNT(*) FROM file_cache')
+            cursor.execute('SELECT COUNT(*) FROM file_hashes')
             total_entries = cursor.fetchone()[0]
             
             # Cache size
@@ -241,7 +447,9 @@ class HashCache:
         """Clear entire cache"""
         try:
             cursor = self.conn.cursor()
-            cursor.execute('DELETE FROM file_cache')
+            cursor.execute('DELETE FROM file_hashes')
+            cursor.execute('DELETE FROM directories')
+            self._dir_ids.clear()
             self.conn.commit()
             
             # Vacuum to reclaim space
@@ -2,45 +2,177 @@
 Hash calculator for file comparison
 """
 
-import hashlib
+import mmap
 import os
+import threading
 from typing import Optional
 import xxhash
 
 import config
+from utils.hash_backends import get_backend, resolve_algorithm
+
+
+# One reusable read buffer per hashing thread (see _read_buffer)
+_buffers = threading.local()
+
+
+def _read_buffer(size: int) -> memoryview:
+    """This thread's read buffer of exactly size bytes, allocated once"""
+    view = getattr(_buffers, 'view', None)
+    if view is None or len(view) != size:
+        view = memoryview(bytearray(size))
+        _buffers.view = view
+    return view
+
+
+def _small_file_buffer() -> memoryview:
+    """This thread's buffer for whole small files (SMALL_FILE_THRESHOLD + 1 bytes)"""
+    size = config.SMALL_FILE_THRESHOLD + 1
+    view = getattr(_buffers, 'small', None)
+    if view is None or len(view) != size:
+        view = memoryview(bytearray(size))
+        _buffers.small = view
+    return view
 
 
 class HashCalculator:
     """Calculate file hashes for duplicate detection"""
     
+    @staticmethod
+    def new_hash(algorithm: str = config.HASH_ALGORITHM):
+        """Empty hash object for a registered backend, 'auto' or any hashlib name"""
+        return get_backend(resolve_algorithm(algorithm)).new()
+    
     @staticmethod
     def calculate_file_hash(filepath: str, 
                            algorithm: str = config.HASH_ALGORITHM,
-                           chunk_size: int = config.CHUNK_SIZE) -> Optional[str]:
+                           chunk_size: int = config.CHUNK_SIZE,
+                           use_mmap: Optional[bool] = None) -> Optional[str]:
         """
         Calculate hash of file content
         
+        Chunks are read with readinto() into a buffer owned by the calling
+        thread, so hashing a file allocates nothing per chunk. Files of at least
+        config.MMAP_MIN_SIZE can instead be memory-mapped and hashed in one call.
+        
         Args:
             filepath: Path to file
-            algorithm: Hash algorithm to use (sha256, md5, etc.)
+            algorithm: Hash algorithm to use (see utils.hash_backends; 'auto', sha256, md5, etc.)
             chunk_size: Size of chunks to read
+            use_mmap: Memory-map large files (None = config.HASH_USE_MMAP)
             
         Returns:
             Hash string or None if error
         """
+        if use_mmap is None:
+            use_mmap = getattr(config, 'HASH_USE_MMAP', False)
+        
         try:
-            # Use xxHash for ultra-fast hashing
-            if algorithm == 'xxh64':
-                hash_obj = xxhash.xxh64()
-            else:
-                hash_obj = hashlib.new(algorithm)
+            hash_obj = HashCalculator.new_hash(algorithm)
             
-            with open(filepath, 'rb') as f:
+            # Unbuffered: readinto() fills our buffer directly, no copy through
+            # the io.BufferedReader buffer
+            with open(filepath, 'rb', buffering=0) as f:
+                if use_mmap and os.fstat(f.fileno()).st_size >= getattr(config, 'MMAP_MIN_SIZE', 0):
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        hash_obj.update(mapped)
+                    return hash_obj.hexdigest()
+                
+                view = _read_buffer(chunk_size)
                 while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
+                    count = f.readinto(view)
+                    if not count:
+                        break
+                    hash_obj.update(view if count == chunk_size else view[:count])
+            
+            return hash_obj.hexdigest()
+        except (OSError, PermissionError, IOError, ValueError):
+            # ValueError: mmap of a file that shrank to zero bytes
+            return None
+    
+    @staticmethod
+    def calculate_small_file_hash(filepath: str, size: int,
+                                  algorithm: str = config.HASH_ALGORITHM) -> Optional[str]:
+        """
+        Calculate hash of a file below config.SMALL_FILE_THRESHOLD
+        
+        The whole file is read with pread (one call unless the OS returns it
+        short) into a buffer owned by the calling thread. Same result as
+        calculate_file_hash(); a file whose size changed since it was scanned
+        is handed to it.
+        
+        Args:
+            filepath: Path to file
+            size: File size from the scan
+            algorithm: Hash algorithm to use
+        
+        Returns:
+            Hash string or None if error
+        """
+        view = _small_file_buffer()
+        if size >= len(view):
+            return HashCalculator.calculate_file_hash(filepath, algorithm)
+        
+        try:
+            hash_obj = HashCalculator.new_hash(algorithm)
+            fd = os.open(filepath, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                # One byte more than expected tells a file that grew
+                wanted = view[:size + 1]
+                count = 0
+                if hasattr(os, 'preadv'):
+                    while count < len(wanted):
+                        read = os.preadv(fd, [wanted[count:]], count)
+                        if not read:
+                            break
+                        count += read
+                else:  # Windows: no pread, a fresh descriptor reads from 0
+                    with open(fd, 'rb', buffering=0, closefd=False) as f:
+                        while count < len(wanted):
+                            read = f.readinto(wanted[count:])
+                            if not read:
+                                break
+                            count += read
+            finally:
+                os.close(fd)
+            
+            if count != size:
+                return HashCalculator.calculate_file_hash(filepath, algorithm)
+            hash_obj.update(view[:count])
+            return hash_obj.hexdigest()
+        except (OSError, PermissionError, IOError):
+            return None
+    
+    @staticmethod
+    def calculate_range_hash(filepath: str, start: int, end: int,
+                             chunk_size: int = config.CHUNK_SIZE) -> Optional[str]:
+        """
+        Calculate hash of the bytes [start, end) of a file
+        
+        Used by the progressive partial-hash tiers: files already known to agree
+        up to start only need the next range compared.
+        
+        Args:
+            filepath: Path to file
+            start: First byte offset
+            end: Offset after the last byte (clamped to the file size)
+            chunk_size: Size of chunks to read
+        
+        Returns:
+            Hash string or None if error
+        """
+        try:
+            hash_obj = xxhash.xxh64()
+            with open(filepath, 'rb', buffering=0) as f:
+                f.seek(start)
+                view = _read_buffer(chunk_size)
+                remaining = end - start
+                while remaining > 0:
+                    count = f.readinto(view if remaining >= chunk_size else view[:remaining])
+                    if not count:
                         break
-                    hash_obj.update(chunk)
+                    hash_obj.update(view[:count])
+                    remaining -= count
             
             return hash_obj.hexdigest()
         except (OSError, PermissionError, IOError):
@@ -0,0 +1,354 @@
+"""
+Linux inotify directory watcher (ctypes, no extra dependency)
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import config
+
+# inotify exists on Linux only; HAS_INOTIFY is False elsewhere or if libc lacks it
+try:
+    if not sys.platform.startswith('linux'):
+        raise OSError('inotify is Linux only')
+    _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    _libc.inotify_init1.argtypes = [ctypes.c_int]
+    _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    _libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    HAS_INOTIFY = True
+except (OSError, AttributeError):
+    _libc = None
+    HAS_INOTIFY = False
+
+
+# Event bits (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_UNMOUNT = 0x00002000
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Close-after-write instead of every write(): one event per saved file
+WATCH_MASK = (IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+              IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW |
+              IN_EXCL_UNLINK)
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+
+class WatchEvent:
+    """One change below a watched root, in terms of paths
+    
+    kind is one of:
+        'created'  - file created or moved in (path)
+        'modified' - file written or its metadata changed (path)
+        'deleted'  - file deleted or moved out (path)
+        'moved'    - file renamed inside the watched tree (old_path -> path)
+        'dir_created', 'dir_deleted', 'dir_moved' - same for directories
+        'rescan'   - events were lost; list path again (a directory)
+    """
+    
+    __slots__ = ('kind', 'path', 'old_path')
+    
+    def __init__(self, kind: str, path: str, old_path: Optional[str] = None):
+        self.kind = kind
+        self.path = path
+        self.old_path = old_path
+    
+    def __repr__(self):
+        if self.old_path:
+            return f"WatchEvent({self.kind!r}, {self.old_path!r} -> {self.path!r})"
+        return f"WatchEvent({self.kind!r}, {self.path!r})"
+
+
+class InotifyWatcher:
+    """Watches directory trees with inotify and reports batches of WatchEvents
+    
+    Every directory gets its own watch (inotify is not recursive); new
+    directories are watched as they appear. Rename pairs are matched by
+    cookie within one read. When the kernel queue overflows, or the watch
+    limit (fs.inotify.max_user_watches) is reached, affected directories are
+    reported as 'rescan' events so the consumer can list them again instead
+    of trusting the lost events.
+    """
+    
+    def __init__(self, callback: Callable[[List[WatchEvent]], None],
+                 exclude: Optional[Callable[[str, str], bool]] = None):
+        """
+        Initialize watcher
+        
+        Args:
+            callback: callback(events), called from the watcher thread per batch
+            exclude: Optional exclude(dirpath, name) -> True to leave a
+                     subdirectory unwatched (e.g. ExclusionRules.match)
+        """
+        if not HAS_INOTIFY:
+            raise OSError(errno.ENOSYS, 'inotify is not available on this system')
+        self.callback = callback
+        self.exclude = exclude
+        self.fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._paths: Dict[int, str] = {}  # watch descriptor -> directory path
+        self._watches: Dict[str, int] = {}  # directory path -> watch descriptor
+        self._mtimes: Dict[str, int] = {}  # directory path -> st_mtime_ns last seen (overflow check)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.limit_reached = False  # Some directories could not be watched
+        self.overflows = 0
+    
+    def watch_tree(self, root: str) -> int:
+        """
+        Watch a directory and everything below it
+        
+        Returns:
+            Number of directories newly watched
+        """
+        added = 0
+        stack = [root]
+        while stack:
+            dirpath = stack.pop()
+            if not self._add_watch(dirpath):
+                continue
+            added += 1
+            try:
+                with os.scandir(dirpath) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False) and not (
+                                    self.exclude and self.exclude(entry.path, entry.name)):
+                                stack.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return added
+    
+    def _add_watch(self, dirpath: str) -> bool:
+        with self._lock:
+            if dirpath in self._watches:
+                return False
+            wd = _libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOSPC and not self.limit_reached:
+                    self.limit_reached = True
+                    print(f"inotify watch limit reached at {dirpath} "
+                          f"(raise fs.inotify.max_user_watches)")
+                return False
+            # A re-used descriptor (same inode under a new path) replaces the old path
+            old_path = self._paths.get(wd)
+            if old_path is not None:
+                self._watches.pop(old_path, None)
+            self._paths[wd] = dirpath
+            self._watches[dirpath] = wd
+        self._record_mtime(dirpath)
+        return True
+    
+    def _record_mtime(self, dirpath: str):
+        try:
+            self._mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            self._mtimes.pop(dirpath, None)
+    
+    def unwatch_tree(self, dirpath: str):
+        """Stop watching a directory tree that was deleted or moved out"""
+        prefix = dirpath + os.sep
+        with self._lock:
+            for path in [p for p in self._watches if p == dirpath or p.startswith(prefix)]:
+                wd = self._watches.pop(path)
+                self._paths.pop(wd, None)
+                self._mtimes.pop(path, None)
+                # Watches follow the inode: one moved out would keep reporting
+                _libc.inotify_rm_watch(self.fd, wd)
+    
+    def _rename_tree(self, old_dir: str, new_dir: str):
+        """Watches follow the inode: update paths of a directory moved inside the tree"""
+        prefix = old_dir + os.sep
+        with self._lock:
+            for path in [p for p in self._watches if p == old_dir or p.startswith(prefix)]:
+                wd = self._watches.pop(path)
+                new_path = new_dir + path[len(old_dir):]
+                self._watches[new_path] = wd
+                self._paths[wd] = new_path
+    
+    @property
+    def watched(self) -> List[str]:
+        """Currently watched directories"""
+        with self._lock:
+            return list(self._watches)
+    
+    def start(self):
+        """Start the watcher thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='inotify-watcher')
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the watcher thread and close the inotify descriptor"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+    
+    def _run(self):
+        poller = select.poll()
+        poller.register(self.fd, select.POLLIN)
+        # Let bursts (an unzip, a copy) accumulate into one batch
+        delay_ms = int(getattr(config, 'WATCH_BATCH_DELAY', 0.2) * 1000)
+        while not self._stop.is_set():
+            if not poller.poll(100):
+                continue
+            self._stop.wait(delay_ms / 1000)
+            data = self._read_all()
+            if data:
+                events = self._parse(data)
+                if events:
+                    try:
+                        self.callback(events)
+                    except Exception as e:
+                        print(f"Watcher callback error: {e}")
+    
+    def _read_all(self) -> bytes:
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+    
+    def _parse(self, data: bytes) -> List[WatchEvent]:
+        """Turn raw inotify records into WatchEvents (rename pairs matched by cookie)"""
+        raw: List[Tuple[int, str, int]] = []  # (mask, path, cookie)
+        offset = 0
+        overflow = False
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            dirpath = self._paths.get(wd)
+            if dirpath is None:
+                continue
+            if mask & IN_IGNORED:
+                with self._lock:
+                    if self._watches.get(dirpath) == wd:
+                        del self._watches[dirpath]
+                    self._paths.pop(wd, None)
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_UNMOUNT):
+                continue  # Reported by the parent directory's watch
+            raw.append((mask, os.path.join(dirpath, name) if name else dirpath, cookie))
+        
+        moved_from = {cookie: (mask, path) for mask, path, cookie in raw
+                      if mask & IN_MOVED_FROM and cookie}
+        paired = set()
+        events = []
+        for mask, path, cookie in raw:
+            is_dir = bool(mask & IN_ISDIR)
+            if mask & IN_MOVED_TO:
+                source = moved_from.get(cookie)
+                if source is not None:
+                    paired.add(cookie)
+                    if is_dir:
+                        self._rename_tree(source[1], path)
+                        events.append(WatchEvent('dir_moved', path, source[1]))
+                    else:
+                        events.append(WatchEvent('moved', path, source[1]))
+                    continue
+                if is_dir:
+                    self.watch_tree(path)
+                    events.append(WatchEvent('dir_created', path))
+                else:
+                    events.append(WatchEvent('created', path))
+            elif mask & IN_MOVED_FROM:
+                continue  # Handled below once all pairs are known
+            elif mask & IN_CREATE:
+                if is_dir:
+                    # Files created before the watch was added are found by listing it
+                    self.watch_tree(path)
+                    events.append(WatchEvent('dir_created', path))
+                else:
+                    events.append(WatchEvent('created', path))
+            elif mask & IN_DELETE:
+                if is_dir:
+                    self.unwatch_tree(path)
+                    events.append(WatchEvent('dir_deleted', path))
+                else:
+                    events.append(WatchEvent('deleted', path))
+            elif mask & (IN_CLOSE_WRITE | IN_ATTRIB) and not is_dir:
+                events.append(WatchEvent('modified', path))
+        
+        # Moved out of the watched tree (no matching IN_MOVED_TO in this read)
+        for cookie, (mask, path) in moved_from.items():
+            if cookie in paired:
+                continue
+            if mask & IN_ISDIR:
+                self.unwatch_tree(path)
+                events.append(WatchEvent('dir_deleted', path))
+            else:
+                events.append(WatchEvent('deleted', path))
+        
+        if overflow:
+            self.overflows += 1
+            events.extend(self._overflow_rescans(events))
+        else:
+            for dirpath in {os.path.dirname(event.path) for event in events}:
+                self._record_mtime(dirpath)
+        return events
+    
+    def _overflow_rescans(self, events: List[WatchEvent]) -> List[WatchEvent]:
+        """
+        Directories to list again after the kernel queue overflowed
+        
+        Lost events can't be recovered, but any create, delete or rename
+        changes the parent directory's mtime: directories whose mtime moved
+        since it was last recorded are rescanned, plus every directory that
+        had events in this batch.
+        """
+        rescan = {os.path.dirname(event.path) for event in events}
+        for dirpath in self.watched:
+            try:
+                mtime_ns = os.stat(dirpath).st_mtime_ns
+            except OSError:
+                continue
+            if mtime_ns != self._mtimes.get(dirpath):
+                rescan.add(dirpath)
+            self._mtimes[dirpath] = mtime_ns
+        return [WatchEvent('rescan', dirpath) for dirpath in sorted(rescan)]
@@ -0,0 +1,105 @@
+"""
+Mount table reader used to keep scans off pseudo and foreign filesystems
+"""
+
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+import config
+
+
+# Kernel mount table (Linux); other systems have no equivalent file
+MOUNTS_FILE = '/proc/self/mounts'
+
+# Space, tab, newline and backslash are written as octal escapes (\040 etc.)
+_OCTAL_ESCAPE = re.compile(r'\\([0-7]{3})')
+
+
+class MountEntry(NamedTuple):
+    """One line of the mount table"""
+    device: str
+    mount_point: str
+    fs_type: str
+
+
+class MountTable:
+    """Mount points by path, read once per scan"""
+    
+    def __init__(self, entries: Optional[List[MountEntry]] = None):
+        self.entries = entries or []
+        # Later mounts shadow earlier ones on the same path
+        self.by_path: Dict[str, MountEntry] = {entry.mount_point: entry for entry in self.entries}
+        self.pseudo_types = frozenset(getattr(config, 'PSEUDO_FILESYSTEMS', ()))
+    
+    @classmethod
+    def load(cls, path: str = MOUNTS_FILE) -> 'MountTable':
+        """
+        Read the mount table
+        
+        Args:
+            path: Mount table file
+        
+        Returns:
+            MountTable (empty if the file doesn't exist or can't be read)
+        """
+        entries = []
+        try:
+            with open(path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 3:
+                        continue
+                    device, mount_point, fs_type = (
+                        _OCTAL_ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), field)
+                        for field in fields[:3]
+                    )
+                    entries.append(MountEntry(device, os.path.normpath(mount_point), fs_type))
+        except OSError:
+            pass
+        return cls(entries)
+    
+    def __bool__(self):
+        return bool(self.entries)
+    
+    def get(self, mount_point: str) -> Optional[MountEntry]:
+        """Mount entry for a directory, if it is a mount point"""
+        return self.by_path.get(mount_point)
+    
+    def is_pseudo(self, entry: MountEntry) -> bool:
+        """Check if a mount is a kernel/virtual filesystem (no user files on disk)"""
+        return entry.fs_type in self.pseudo_types
+    
+    @staticmethod
+    def is_storage(entry: MountEntry) -> bool:
+        """Check if a mount has its own storage: a block device or a network share"""
+        device = entry.device
+        return device.startswith('/dev/') or device.startswith('//') or ':' in device
+    
+    def submounts(self, root: str) -> List[MountEntry]:
+        """
+        Mounts below a directory that a scan of it could reach
+        
+        Pseudo mounts and everything mounted below one are left out, since
+        traversal never enters them.
+        
+        Args:
+            root: Directory path
+        
+        Returns:
+            Mount entries, parents before children
+        """
+        root = os.path.normpath(root)
+        prefix = root if root.endswith(os.sep) else root + os.sep
+        pseudo_points = [entry.mount_point for entry in self.by_path.values() if self.is_pseudo(entry)]
+        found = []
+        for mount_point in sorted(self.by_path):
+            if mount_point == root or not mount_point.startswith(prefix):
+                continue
+            entry = self.by_path[mount_point]
+            if self.is_pseudo(entry):
+                continue
+            if any(mount_point.startswith(point.rstrip(os.sep) + os.sep) for point in pseudo_points):
+                continue
+            found.append(entry)
+        return found
@@ -0,0 +1,53 @@
+"""
+Interned directory table for compact path storage
+"""
+
+import os
+import threading
+from typing import Dict, List, Tuple
+
+
+class DirectoryTable:
+    """Interns directory paths: each distinct directory is stored once and
+    referenced by a small integer id, so a file path can be kept as
+    (dir_id, basename) and rebuilt with join() only when needed"""
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.paths: List[str] = []
+        self._lock = threading.Lock()  # Interning from scan/hash worker threads
+    
+    def intern(self, dirpath: str) -> int:
+        """Get the id of a directory, adding it if new"""
+        # Lock-free fast path: dict lookups are atomic
+        dir_id = self._ids.get(dirpath)
+        if dir_id is None:
+            with self._lock:
+                dir_id = self._ids.get(dirpath)
+                if dir_id is None:
+                    dir_id = len(self.paths)
+                    self.paths.append(dirpath)
+                    self._ids[dirpath] = dir_id
+        return dir_id
+    
+    def split(self, filepath: str) -> Tuple[int, str]:
+        """Split a file path into (dir_id, basename)"""
+        dirpath, name = os.path.split(filepath)
+        return self.intern(dirpath), name
+    
+    def path(self, dir_id: int) -> str:
+        """Get the directory path for an id"""
+        return self.paths[dir_id]
+    
+    def join(self, dir_id: int, name: str) -> str:
+        """Rebuild a full file path from (dir_id, basename)"""
+        return os.path.join(self.paths[dir_id], name)
+    
+    def __len__(self):
+        return len(self.paths)
+
+
+# Table for records and result stores built from plain paths outside a scan.
+# Scans intern into their own table (FileScanner.new_directory_table()), which
+# is freed together with the results that refer to it
+shared_directories = DirectoryTable()
@@ -0,0 +1,156 @@
+"""
+Time-based, coalescing progress channel shared by scans and hash phases
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional
+
+import config
+
+
+class ProgressEvent:
+    """Snapshot of a progress channel at one point in time"""
+    
+    __slots__ = ('phase', 'files', 'bytes', 'total', 'current',
+                 'elapsed', 'files_per_sec', 'bytes_per_sec')
+    
+    def __init__(self, phase: str, files: int, bytes_done: int, total: Optional[int],
+                 current: Optional[str], elapsed: float,
+                 files_per_sec: float, bytes_per_sec: float):
+        self.phase = phase  # 'scan', 'quick_hash', 'full_hash', ...
+        self.files = files  # Files processed in this phase
+        self.bytes = bytes_done  # Total size of those files
+        self.total = total  # Files expected in this phase (None = unknown)
+        self.current = current  # Name of the latest file
+        self.elapsed = elapsed  # Seconds since the phase started
+        self.files_per_sec = files_per_sec
+        self.bytes_per_sec = bytes_per_sec
+    
+    @property
+    def percentage(self) -> Optional[int]:
+        if not self.total:
+            return None
+        return int(self.files / self.total * 100)
+    
+    def __repr__(self):
+        return (f"ProgressEvent({self.phase!r}, files={self.files}, total={self.total}, "
+                f"{self.files_per_sec:.0f} files/s, {self.bytes_per_sec:.0f} B/s)")
+
+
+class ProgressChannel:
+    """Progress state written by a worker and read at a fixed time interval
+    
+    Producers only bump counters under a lock (advance() is a few attribute
+    updates), so reporting every file costs almost nothing. Readers never see
+    individual updates: either they poll snapshot() on their own clock (the GUI
+    uses Tk after()), or listeners are called at most once per interval with
+    the latest state. Fast disks no longer flood the event queue, and a stalled
+    network mount still shows elapsed time and a falling rate.
+    
+    Any thread may advance or read (concurrent root scans share one channel).
+    """
+    
+    def __init__(self, listener: Optional[Callable[[ProgressEvent], None]] = None,
+                 interval: Optional[float] = None):
+        """
+        Initialize progress channel
+        
+        Args:
+            listener: Optional callback(ProgressEvent), called from the producer
+                      thread at most once per interval
+            interval: Seconds between emitted events (None = config.PROGRESS_INTERVAL)
+        """
+        self.interval = interval if interval is not None else getattr(config, 'PROGRESS_INTERVAL', 0.25)
+        self._listeners: List[Callable[[ProgressEvent], None]] = []
+        if listener is not None:
+            self._listeners.append(listener)
+        self._lock = threading.Lock()  # Guards counters and rate sampling
+        self.start('idle')
+    
+    def add_listener(self, listener: Callable[[ProgressEvent], None]):
+        """Add a callback(ProgressEvent)"""
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[ProgressEvent], None]):
+        """Remove a callback added with add_listener()"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def start(self, phase: str, total: Optional[int] = None):
+        """
+        Begin a new phase (resets counters and rates)
+        
+        Args:
+            phase: Phase name
+            total: Files expected in this phase (None = unknown)
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.phase = phase
+            self.total = total
+            self.files = 0
+            self.bytes = 0
+            self.current = None
+            self._started = now
+            self._next_emit = now + self.interval
+            self._sample = (now, 0, 0)
+            self._files_rate = 0.0
+            self._bytes_rate = 0.0
+    
+    def advance(self, files: int = 1, size: int = 0, current: Optional[str] = None):
+        """
+        Record processed files (producer side, cheap enough to call per file)
+        
+        Args:
+            files: Number of files processed
+            size: Total size of those files in bytes
+            current: Name of the latest file
+        """
+        with self._lock:
+            self.files += files
+            self.bytes += size
+            if current is not None:
+                self.current = current
+        
+        if self._listeners:
+            now = time.monotonic()
+            if now >= self._next_emit:
+                self._next_emit = now + self.interval
+                self._emit()
+    
+    def flush(self):
+        """Send the latest state to listeners now (end of a phase)"""
+        if self._listeners:
+            self._next_emit = time.monotonic() + self.interval
+            self._emit()
+    
+    def _emit(self):
+        event = self.snapshot()
+        for listener in list(self._listeners):
+            listener(event)
+    
+    def snapshot(self) -> ProgressEvent:
+        """
+        Get the latest state with files/sec and bytes/sec
+        
+        Rates are measured over the last interval and smoothed, so a stall
+        shows up as a falling rate instead of a frozen one.
+        """
+        now = time.monotonic()
+        with self._lock:
+            files, bytes_done = self.files, self.bytes
+            sample_time, sample_files, sample_bytes = self._sample
+            elapsed = now - sample_time
+            if elapsed >= self.interval:
+                files_rate = (files - sample_files) / elapsed
+                bytes_rate = (bytes_done - sample_bytes) / elapsed
+                if sample_files or sample_bytes:
+                    # Exponential smoothing keeps the display from jumping
+                    files_rate = (self._files_rate + files_rate) / 2
+                    bytes_rate = (self._bytes_rate + bytes_rate) / 2
+                self._files_rate, self._bytes_rate = files_rate, bytes_rate
+                self._sample = (now, files, bytes_done)
+            
+            return ProgressEvent(self.phase, files, bytes_done, self.total, self.current,
+                                 now - self._started, self._files_rate, self._bytes_rate)
@@ -0,0 +1,302 @@
+"""
+Columnar, array-backed storage for large scan result sets
+"""
+
+import heapq
+import os
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from utils.file_record import FileRecord
+from utils.path_table import DirectoryTable, shared_directories
+
+# NumPy is optional - used for vectorized operations when installed
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+
+class ColumnarResults:
+    """Scan results stored column by column instead of one object per file
+    
+    Numeric columns live in compact arrays (8 bytes per value), directories are
+    interned through a DirectoryTable and only the basename is kept per file.
+    Sort, filter, top-k and sum run over whole columns (vectorized with NumPy
+    when available). Rows are materialized as FileRecord only when accessed,
+    so existing code that iterates results and reads info['size'] keeps working.
+    
+    Columns: 'size', 'modified', 'created', 'dir_id', 'group'
+    """
+    
+    def __init__(self, directories: Optional[DirectoryTable] = None):
+        """
+        Initialize an empty result store
+        
+        Args:
+            directories: Directory table for the dir_id column
+                         (None = the process-wide shared table)
+        """
+        self.directories = directories if directories is not None else shared_directories
+        self.sizes = array('q')
+        self.modified = array('d')
+        self.created = array('d')
+        self.dir_ids = array('I')
+        self.group_ids = array('H')
+        self.names: List[str] = []
+        self.groups: List[str] = ['']  # Group id 0 = no group
+        self._group_index: Dict[str, int] = {'': 0}
+    
+    def _group_id(self, group: Optional[str]) -> int:
+        if not group:
+            return 0
+        group_id = self._group_index.get(group)
+        if group_id is None:
+            group_id = len(self.groups)
+            self._group_index[group] = group_id
+            self.groups.append(group)
+        return group_id
+    
+    def append(self, filepath: str, stat: os.stat_result, group: Optional[str] = None):
+        """Add a file from its path and stat result"""
+        dirpath, name = os.path.split(filepath)
+        self.sizes.append(stat.st_size)
+        self.modified.append(stat.st_mtime)
+        self.created.append(stat.st_ctime)
+        self.dir_ids.append(self.directories.intern(dirpath))
+        self.group_ids.append(self._group_id(group))
+        self.names.append(name)
+    
+    def append_entry(self, dir_id: int, name: str, stat: os.stat_result,
+                     group: Optional[str] = None):
+        """Add a file whose directory is already interned in this store's table"""
+        self.sizes.append(stat.st_size)
+        self.modified.append(stat.st_mtime)
+        self.created.append(stat.st_ctime)
+        self.dir_ids.append(dir_id)
+        self.group_ids.append(self._group_id(group))
+        self.names.append(name)
+    
+    def append_record(self, record: FileRecord):
+        """Add a file from a FileRecord"""
+        if record.directories is self.directories:
+            dir_id, name = record.dir_id, record.filename
+        else:
+            dir_id, name = self.directories.split(record.path)
+        self.sizes.append(record.size)
+        self.modified.append(record.modified)
+        self.created.append(record.created)
+        self.dir_ids.append(dir_id)
+        self.group_ids.append(self._group_id(record.group))
+        self.names.append(name)
+    
+    def clear(self):
+        """Remove all rows (the directory table is kept)"""
+        for column in (self.sizes, self.modified, self.created, self.dir_ids, self.group_ids):
+            del column[:]
+        self.names.clear()
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def path(self, index: int) -> str:
+        """Full path of a row (rebuilt from directory id + name)"""
+        return os.path.join(self.directories.path(self.dir_ids[index]), self.names[index])
+    
+    def group(self, index: int) -> str:
+        """Group name of a row ('' if none)"""
+        return self.groups[self.group_ids[index]]
+    
+    def record(self, index: int) -> FileRecord:
+        """Materialize one row as a FileRecord"""
+        record = FileRecord.__new__(FileRecord)
+        record.directories = self.directories
+        record.dir_id, record.filename = self.dir_ids[index], self.names[index]
+        record.size, record.modified, record.created = (
+            self.sizes[index], self.modified[index], self.created[index])
+        record.group = record.hash = record.nlink = record.hardlinks = record.error = None
+        group_id = self.group_ids[index]
+        if group_id:
+            record.group = self.groups[group_id]
+        return record
+    
+    def __getitem__(self, index: int) -> FileRecord:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.record(index)
+    
+    def __iter__(self) -> Iterator[FileRecord]:
+        for index in range(len(self)):
+            yield self.record(index)
+    
+    def column(self, name: str):
+        """Get a column by name (NumPy view when available, else the array)"""
+        columns = {
+            'size': self.sizes,
+            'modified': self.modified,
+            'created': self.created,
+            'dir_id': self.dir_ids,
+            'group': self.group_ids,
+        }
+        if name not in columns:
+            raise KeyError(name)
+        data = columns[name]
+        if HAS_NUMPY:
+            return np.frombuffer(data, dtype=np.dtype(data.typecode)) if len(data) else np.array([])
+        return data
+    
+    def _sort_column(self, name: str):
+        """Column values that sort like the column (group ids -> group name rank)"""
+        if name != 'group':
+            return self.column(name)
+        ranks = {group_id: rank for rank, group_id in
+                 enumerate(sorted(range(len(self.groups)), key=self.groups.__getitem__))}
+        ranked = array('q', (ranks[group_id] for group_id in self.group_ids))
+        return np.frombuffer(ranked, dtype=np.int64) if HAS_NUMPY and len(ranked) else ranked
+    
+    @staticmethod
+    def _descending(values):
+        """NumPy column negated for a descending sort
+        
+        Unsigned columns (dir_id, group) are widened to int64 first: negating
+        them in place would wrap around instead of reversing the order.
+        """
+        if values.dtype.kind == 'u':
+            values = values.astype(np.int64)
+        return -values
+    
+    def sum(self, column: str = 'size'):
+        """Sum of a numeric column"""
+        if HAS_NUMPY and len(self):
+            total = self.column(column).sum()
+            return int(total) if column in ('size', 'dir_id', 'group') else float(total)
+        return sum(self.column(column))
+    
+    def argsort(self, *keys: str) -> Sequence[int]:
+        """
+        Row order sorted by one or more columns
+        
+        Args:
+            keys: Column names, most significant first; prefix '-' for descending
+                  (e.g. argsort('group', '-size'))
+        
+        Returns:
+            Sequence of row indices
+        """
+        keys = keys or ('size',)
+        if not len(self):
+            return []
+        
+        if HAS_NUMPY:
+            # np.lexsort uses the LAST key as the primary one
+            sort_keys = []
+            for key in reversed(keys):
+                values = self._sort_column(key.lstrip('-'))
+                sort_keys.append(self._descending(values) if key.startswith('-') else values)
+            return np.lexsort(sort_keys)
+        
+        order = list(range(len(self)))
+        # Stable sorts from least to most significant key
+        for key in reversed(keys):
+            values = self._sort_column(key.lstrip('-'))
+            order.sort(key=values.__getitem__, reverse=key.startswith('-'))
+        return order
+    
+    def top_k(self, k: int, column: str = 'size', largest: bool = True) -> Sequence[int]:
+        """
+        Indices of the k largest (or smallest) rows of a column, in order
+        
+        Args:
+            k: Number of rows
+            column: Column to rank by
+            largest: True for largest first, False for smallest first
+        
+        Returns:
+            Sequence of row indices
+        """
+        n = len(self)
+        k = min(k, n)
+        if k <= 0:
+            return []
+        
+        values = self.column(column)
+        if HAS_NUMPY:
+            keyed = self._descending(values) if largest else values
+            if k < n:
+                candidates = np.argpartition(keyed, k - 1)[:k]
+            else:
+                candidates = np.arange(n)
+            return candidates[np.argsort(keyed[candidates], kind='stable')]
+        
+        select = heapq.nlargest if largest else heapq.nsmallest
+        return select(k, range(n), key=values.__getitem__)
+    
+    def mask(self, column: str, min_value=None, max_value=None):
+        """
+        Boolean row mask for min_value <= column <= max_value (None = unbounded)
+        """
+        values = self.column(column)
+        if HAS_NUMPY:
+            selected = np.ones(len(self), dtype=bool)
+            if min_value is not None:
+                selected &= values >= min_value
+            if max_value is not None:
+                selected &= values <= max_value
+            return selected
+        return [
+            (min_value is None or value >= min_value) and
+            (max_value is None or value <= max_value)
+            for value in values
+        ]
+    
+    def filter(self, mask) -> 'ColumnarResults':
+        """
+        Keep rows where mask is true
+        
+        Args:
+            mask: Sequence of booleans, one per row (see mask())
+        
+        Returns:
+            New ColumnarResults sharing this store's directory table
+        """
+        if HAS_NUMPY:
+            indices = np.flatnonzero(np.asarray(mask, dtype=bool))
+        else:
+            indices = [index for index, keep in enumerate(mask) if keep]
+        return self.take(indices)
+    
+    def sort(self, *keys: str) -> 'ColumnarResults':
+        """New store with rows sorted by keys (see argsort())"""
+        return self.take(self.argsort(*keys))
+    
+    def take(self, indices: Sequence[int]) -> 'ColumnarResults':
+        """New store with the given rows, in the given order"""
+        result = ColumnarResults(self.directories)
+        result.groups = list(self.groups)
+        result._group_index = dict(self._group_index)
+        
+        if HAS_NUMPY and len(indices):
+            indices = np.asarray(indices, dtype=np.intp)
+            for source, target in ((self.sizes, result.sizes),
+                                   (self.modified, result.modified),
+                                   (self.created, result.created),
+                                   (self.dir_ids, result.dir_ids),
+                                   (self.group_ids, result.group_ids)):
+                view = np.frombuffer(source, dtype=np.dtype(source.typecode))
+                target.frombytes(view[indices].tobytes())
+                del view  # Release the buffer so source can grow again
+        else:
+            for source, target in ((self.sizes, result.sizes),
+                                   (self.modified, result.modified),
+                                   (self.created, result.created),
+                                   (self.dir_ids, result.dir_ids),
+                                   (self.group_ids, result.group_ids)):
+                target.extend(source[index] for index in indices)
+        
+        names = self.names
+        result.names = [names[index] for index in indices]
+        return result
@@ -0,0 +1,325 @@
+"""
+Binary snapshot of scan results (file rows plus duplicate groups)
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from utils.file_record import FileRecord
+from utils.path_table import DirectoryTable
+from utils.result_store import ColumnarResults
+
+
+# File layout (little-endian):
+#   header   MAGIC, version u32, flags u32, row count u64, created f64
+#   sections tag (4 bytes), reserved u32, payload length u64, payload,
+#            zero padding to a multiple of 8
+# Fixed-width columns are raw arrays at 8-byte aligned offsets, usable straight
+# from a memory map. A string table is its count (u64), count + 1 offsets (u64)
+# and the UTF-8 bytes, so any one string is decoded without touching the others.
+# Readers skip sections with unknown tags.
+MAGIC = b'SMSNAP\r\n'  # \r\n catches files mangled by text-mode transfers
+VERSION = 1
+HEADER = struct.Struct('<8sIIQd')
+SECTION = struct.Struct('<4sIQ')
+
+# Default file extension for snapshots
+EXTENSION = '.smscan'
+
+# Undecodable names (bytes on Linux) round-trip through surrogateescape
+ENCODING = 'utf-8'
+ERRORS = 'surrogateescape'
+
+FLAG_DUPLICATES = 1  # Snapshot holds duplicate groups
+
+# Column sections: tag -> (ColumnarResults attribute, array typecode)
+COLUMNS = {
+    b'SIZE': ('sizes', 'q'),
+    b'MTIM': ('modified', 'd'),
+    b'CTIM': ('created', 'd'),
+    b'DIRI': ('dir_ids', 'I'),
+    b'GRPI': ('group_ids', 'H'),
+}
+
+# String table sections
+DIRECTORIES = b'DIRS'  # Directory paths (by dir_id)
+NAMES = b'NAME'  # File basenames (by row)
+GROUPS = b'GRPS'  # Group labels (by group id)
+META = b'META'  # JSON: roots, kind of scan, ...
+DUPLICATE_OFFSETS = b'DUPO'  # u64 row ranges, one per group plus the end
+DUPLICATE_HASHES = b'DUPH'  # String table: hash per group
+DUPLICATE_NLINKS = b'DUPN'  # u32 link count per member row (0 = unknown)
+DUPLICATE_HARDLINKS = b'DUPL'  # String table: other hardlink paths per member row
+
+# Hardlink paths of one member are stored as one string
+HARDLINK_SEPARATOR = '\0'
+
+
+def _pack_strings(strings: Iterable[str]) -> bytes:
+    """Encode a string table"""
+    offsets = array('Q', [0])
+    blob = bytearray()
+    for string in strings:
+        blob += string.encode(ENCODING, ERRORS)
+        offsets.append(len(blob))
+    return struct.pack('<Q', len(offsets) - 1) + offsets.tobytes() + bytes(blob)
+
+
+class StringTable(Sequence):
+    """String table read from a snapshot buffer, decoded one item at a time"""
+    
+    def __init__(self, buffer: memoryview):
+        self._count = struct.unpack_from('<Q', buffer, 0)[0]
+        end = 8 + (self._count + 1) * 8
+        self._offsets = buffer[8:end].cast('Q')
+        self._blob = buffer[end:]
+        self._cache: Dict[int, str] = {}
+    
+    def __len__(self):
+        return self._count
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        value = self._cache.get(index)
+        if value is None:
+            value = str(self._blob[self._offsets[index]:self._offsets[index + 1]], ENCODING, ERRORS)
+            self._cache[index] = value
+        return value
+    
+    def release(self):
+        """Drop the buffer references (see ScanSnapshot.close())"""
+        self._offsets.release()
+        self._blob.release()
+
+
+def save_snapshot(path: str,
+                  results: Optional[Union[ColumnarResults, Iterable[FileRecord]]] = None,
+                  duplicates: Optional[Dict[str, List[FileRecord]]] = None,
+                  meta: Optional[dict] = None) -> int:
+    """
+    Write scan results to a snapshot file (atomically: temp file + rename)
+    
+    Args:
+        path: Snapshot file path
+        results: Result rows (ColumnarResults or FileRecords)
+        duplicates: Duplicate groups (hash -> FileRecords), as from find_duplicates()
+        meta: Extra JSON-serializable information (e.g. {'roots': [...]})
+    
+    Returns:
+        Number of rows written
+    """
+    store = ColumnarResults(DirectoryTable())
+    if isinstance(results, ColumnarResults):
+        # Copy columns; keep only the directories these rows use, renumbered
+        used = sorted(set(results.dir_ids))
+        renumber = {old: new for new, old in enumerate(used)}
+        for dir_id in used:
+            store.directories.intern(results.directories.path(dir_id))
+        store.sizes.extend(results.sizes)
+        store.modified.extend(results.modified)
+        store.created.extend(results.created)
+        store.dir_ids.extend(renumber[dir_id] for dir_id in results.dir_ids)
+        store.group_ids.extend(results.group_ids)
+        store.names = list(results.names)
+        store.groups = list(results.groups)
+        store._group_index = dict(results._group_index)
+    elif results is not None:
+        for record in results:
+            store.append_record(record)
+    
+    duplicate_offsets = array('Q')
+    duplicate_nlinks = array('I')
+    duplicate_hardlinks = []
+    if duplicates:
+        for files in duplicates.values():
+            duplicate_offsets.append(len(store))
+            for record in files:
+                store.append_record(record)
+                duplicate_nlinks.append(record.nlink or 0)
+                duplicate_hardlinks.append(HARDLINK_SEPARATOR.join(record.hardlinks or ()))
+        duplicate_offsets.append(len(store))
+    
+    sections = [
+        (DIRECTORIES, _pack_strings(store.directories.paths)),
+        (NAMES, _pack_strings(store.names)),
+        (GROUPS, _pack_strings(store.groups)),
+    ]
+    for tag, (attribute, _) in COLUMNS.items():
+        sections.append((tag, getattr(store, attribute).tobytes()))
+    if duplicates:
+        sections += [
+            (DUPLICATE_OFFSETS, duplicate_offsets.tobytes()),
+            (DUPLICATE_HASHES, _pack_strings(duplicates.keys())),
+            (DUPLICATE_NLINKS, duplicate_nlinks.tobytes()),
+            (DUPLICATE_HARDLINKS, _pack_strings(duplicate_hardlinks)),
+        ]
+    sections.append((META, json.dumps(meta or {}).encode('utf-8')))
+    
+    flags = FLAG_DUPLICATES if duplicates else 0
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, len(store), time.time()))
+        for tag, payload in sections:
+            f.write(SECTION.pack(tag, 0, len(payload)))
+            f.write(payload)
+            f.write(b'\0' * (-len(payload) % 8))
+    os.replace(temp_path, path)
+    return len(store)
+
+
+class ScanSnapshot:
+    """Read-only view of a snapshot file
+    
+    The file is memory-mapped and only the section table is read on open.
+    Numeric columns are copied into arrays when results are first used (one
+    memcpy each); paths, names and duplicate groups are decoded only for the
+    rows that are actually accessed, so reopening a multi-million-file scan
+    takes about as long as reading its size column.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open a snapshot
+        
+        Args:
+            path: Snapshot file path
+        
+        Raises:
+            ValueError: Not a snapshot, unsupported version or truncated file
+        """
+        self.path = path
+        self._views: List[memoryview] = []
+        self._tables: List[StringTable] = []
+        self._results = None
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f"Not a scan snapshot: {path}")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        view = self._view(memoryview(self._map))
+        magic, version, self.flags, self.row_count, self.created = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a scan snapshot: {path}")
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"Snapshot version {version} is newer than supported ({VERSION})")
+        self.version = version
+        
+        self._sections: Dict[bytes, memoryview] = {}
+        offset = HEADER.size
+        while offset + SECTION.size <= len(view):
+            tag, _, length = SECTION.unpack_from(view, offset)
+            offset += SECTION.size
+            if offset + length > len(view):
+                self.close()
+                raise ValueError(f"Truncated scan snapshot: {path}")
+            self._sections[tag] = self._view(view[offset:offset + length])
+            offset += length + (-length % 8)
+        # Cut inside a section header, or before the sections every snapshot has
+        required = {DIRECTORIES, NAMES, GROUPS, *COLUMNS}
+        if offset < len(view) or not required.issubset(self._sections):
+            self.close()
+            raise ValueError(f"Truncated scan snapshot: {path}")
+        
+        meta = self._sections.get(META)
+        self.meta = json.loads(bytes(meta).decode('utf-8')) if meta is not None else {}
+    
+    def _view(self, view: memoryview) -> memoryview:
+        self._views.append(view)
+        return view
+    
+    def _strings(self, tag: bytes) -> StringTable:
+        section = self._sections.get(tag)
+        if section is None:
+            raise ValueError(f"Scan snapshot has no {tag.decode()} section: {self.path}")
+        table = StringTable(section)
+        self._tables.append(table)
+        return table
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Unmap the file (records already materialized stay valid)"""
+        for table in self._tables:
+            table.release()
+        for view in reversed(self._views):
+            view.release()
+        self._tables.clear()
+        self._views.clear()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # A caller still holds a buffer; the map is freed with it
+    
+    @property
+    def results(self) -> ColumnarResults:
+        """All rows as a ColumnarResults store (paths and names decoded on access)"""
+        if self._results is None:
+            directories = DirectoryTable()
+            directories.paths = self._strings(DIRECTORIES)
+            results = ColumnarResults(directories)
+            for tag, (attribute, typecode) in COLUMNS.items():
+                column = array(typecode)
+                column.frombytes(self._sections[tag])
+                setattr(results, attribute, column)
+            results.names = self._strings(NAMES)
+            results.groups = list(self._strings(GROUPS))
+            results._group_index = {group: index for index, group in enumerate(results.groups)}
+            self._results = results
+        return self._results
+    
+    @property
+    def has_duplicates(self) -> bool:
+        return bool(self.flags & FLAG_DUPLICATES)
+    
+    @property
+    def duplicate_count(self) -> int:
+        """Number of duplicate groups"""
+        offsets = self._sections.get(DUPLICATE_OFFSETS)
+        return max(0, len(offsets) // 8 - 1) if offsets is not None else 0
+    
+    def duplicate_group(self, index: int) -> Tuple[str, List[FileRecord]]:
+        """
+        Decode one duplicate group
+        
+        Returns:
+            Tuple of (hash, FileRecords with hash, nlink and hardlinks set)
+        """
+        if not hasattr(self, '_duplicate_offsets'):
+            self._duplicate_offsets = self._view(self._sections[DUPLICATE_OFFSETS].cast('Q'))
+            self._duplicate_nlinks = self._view(self._sections[DUPLICATE_NLINKS].cast('I'))
+            self._duplicate_hashes = self._strings(DUPLICATE_HASHES)
+            self._duplicate_hardlinks = self._strings(DUPLICATE_HARDLINKS)
+        
+        offsets = self._duplicate_offsets
+        first = offsets[-1] - len(self._duplicate_nlinks)  # Row of the first member
+        hash_val = self._duplicate_hashes[index]
+        results = self.results
+        files = []
+        for row in range(offsets[index], offsets[index + 1]):
+            record = results.record(row)
+            record.hash = hash_val
+            record.nlink = self._duplicate_nlinks[row - first] or None
+            hardlinks = self._duplicate_hardlinks[row - first]
+            record.hardlinks = hardlinks.split(HARDLINK_SEPARATOR) if hardlinks else []
+            files.append(record)
+        return hash_val, files
+    
+    def duplicates(self) -> Dict[str, List[FileRecord]]:
+        """All duplicate groups, like DuplicateFinder.find_duplicates() returns them"""
+        return dict(self.duplicate_group(index) for index in range(self.duplicate_count))
@@ -0,0 +1,226 @@
+"""
+Per-scan cost and error accounting
+"""
+
+import errno
+import heapq
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+
+import config
+
+
+class ScanStats:
+    """Where a scan spent its time and what it could not read
+    
+    Filled by FileScanner while it walks (any listing thread may record) and
+    reset by every scan. Counters are per directory, not per file, so keeping
+    them costs one lock round-trip per directory listed.
+    
+    Errors are grouped by errno name ('EACCES', 'ENOENT', ...) and by top
+    directory: the first path component below the scan root they occurred
+    under, which is usually enough to tell a denied system folder from a
+    flaky network share.
+    """
+    
+    def __init__(self, slowest: Optional[int] = None):
+        """
+        Initialize scan stats
+        
+        Args:
+            slowest: Number of slowest directories to keep (None = config.SCAN_STATS_SLOWEST)
+        """
+        self.slowest_count = slowest if slowest is not None else getattr(config, 'SCAN_STATS_SLOWEST', 20)
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Clear all counters (start of a scan)"""
+        with self._lock:
+            self.roots: List[str] = []
+            self.started = time.time()
+            self.duration = 0.0
+            self._clock = time.perf_counter()
+            self.directories_listed = 0  # Read with scandir
+            self.directories_replayed = 0  # Served from the directory index
+            self.directories_denied_skipped = 0  # Denied before and unchanged (negative cache)
+            self.directories_empty_skipped = 0  # Empty before and unchanged (negative cache)
+            self.entries_seen = 0  # Directory entries of any kind
+            self.stats_performed = 0  # stat() calls (files and directories)
+            self.errors_by_errno = Counter()
+            self.errors_by_top_dir = Counter()
+            self.root_errors: List[Tuple[str, str]] = []  # (root, message)
+            # Symlinked directories (follow-symlinks mode): descended into, not
+            # followed (inside a root, excluded or target already visited), dangling
+            self.links_followed = 0
+            self.links_skipped = 0
+            self.links_broken = 0
+            self._slowest: List[Tuple[float, str]] = []  # Min-heap of (seconds, dirpath)
+    
+    def add_root(self, root: str):
+        """Register a scan root (used to find the top directory of an error)"""
+        with self._lock:
+            if root not in self.roots:
+                self.roots.append(root)
+    
+    def record_directory(self, dirpath: str, seconds: float, entries: int, stats: int):
+        """Account for one listed directory"""
+        with self._lock:
+            self.directories_listed += 1
+            self.entries_seen += entries
+            self.stats_performed += stats
+            if len(self._slowest) < self.slowest_count:
+                heapq.heappush(self._slowest, (seconds, dirpath))
+            elif self._slowest and seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, (seconds, dirpath))
+    
+    def record_replay(self):
+        """Account for one directory served from the directory index"""
+        with self._lock:
+            self.directories_replayed += 1
+    
+    def record_denied_skip(self):
+        """Account for a directory skipped by the negative cache"""
+        with self._lock:
+            self.directories_denied_skipped += 1
+    
+    def record_empty_skip(self):
+        """Account for an empty directory skipped by the negative cache"""
+        with self._lock:
+            self.directories_empty_skipped += 1
+    
+    def record_stat(self):
+        """Account for one stat() made outside a directory listing"""
+        with self._lock:
+            self.stats_performed += 1
+    
+    def record_link(self, outcome: str):
+        """Account for a symlink: outcome is 'followed', 'skipped' or 'broken'"""
+        with self._lock:
+            if outcome == 'followed':
+                self.links_followed += 1
+            elif outcome == 'skipped':
+                self.links_skipped += 1
+            else:
+                self.links_broken += 1
+    
+    def record_error(self, path: str, error: OSError):
+        """Account for an entry or directory that could not be read"""
+        name = self.error_name(error)
+        top = self.top_directory(path)
+        with self._lock:
+            self.errors_by_errno[name] += 1
+            self.errors_by_top_dir[top] += 1
+    
+    def record_root_error(self, root: str, error: Exception):
+        """Account for a scan root that failed as a whole"""
+        with self._lock:
+            self.root_errors.append((root, str(error)))
+            if isinstance(error, OSError):
+                self.errors_by_errno[self.error_name(error)] += 1
+                self.errors_by_top_dir[root] += 1
+    
+    def finish(self):
+        """Record the scan's wall time so far"""
+        self.duration = time.perf_counter() - self._clock
+    
+    @staticmethod
+    def error_name(error: OSError) -> str:
+        if error.errno:
+            return errno.errorcode.get(error.errno, str(error.errno))
+        return type(error).__name__
+    
+    def top_directory(self, path: str) -> str:
+        """First path component below the scan root containing path"""
+        for root in self.roots:
+            prefix = root if root.endswith(os.sep) else root + os.sep
+            if path.startswith(prefix):
+                top = path[len(prefix):].split(os.sep, 1)[0]
+                return prefix + top
+            if path == root:
+                return root
+        return os.path.dirname(path) or path
+    
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors_by_errno.values())
+    
+    @property
+    def slowest_directories(self) -> List[Tuple[str, float]]:
+        """(dirpath, seconds) of the slowest listings, slowest first"""
+        with self._lock:
+            return [(path, seconds) for seconds, path in sorted(self._slowest, reverse=True)]
+    
+    def merge(self, data: dict):
+        """Add stats exported with to_dict() (e.g. from a worker process)"""
+        with self._lock:
+            for root in data.get('roots', []):
+                if root not in self.roots:
+                    self.roots.append(root)
+            self.directories_listed += data.get('directories_listed', 0)
+            self.directories_replayed += data.get('directories_replayed', 0)
+            self.directories_denied_skipped += data.get('directories_denied_skipped', 0)
+            self.directories_empty_skipped += data.get('directories_empty_skipped', 0)
+            self.entries_seen += data.get('entries_seen', 0)
+            self.stats_performed += data.get('stats_performed', 0)
+            self.links_followed += data.get('links_followed', 0)
+            self.links_skipped += data.get('links_skipped', 0)
+            self.links_broken += data.get('links_broken', 0)
+            self.errors_by_errno.update(data.get('errors_by_errno', {}))
+            self.errors_by_top_dir.update(data.get('errors_by_top_dir', {}))
+            self.root_errors.extend(tuple(item) for item in data.get('root_errors', []))
+            for path, seconds in data.get('slowest_directories', []):
+                if len(self._slowest) < self.slowest_count:
+                    heapq.heappush(self._slowest, (seconds, path))
+                elif seconds > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, (seconds, path))
+    
+    def to_dict(self) -> dict:
+        """All stats as plain JSON-serializable values"""
+        slowest = self.slowest_directories
+        with self._lock:
+            return {
+                'roots': list(self.roots),
+                'started': self.started,
+                'duration': round(self.duration, 6),
+                'directories_listed': self.directories_listed,
+                'directories_replayed': self.directories_replayed,
+                'directories_denied_skipped': self.directories_denied_skipped,
+                'directories_empty_skipped': self.directories_empty_skipped,
+                'entries_seen': self.entries_seen,
+                'stats_performed': self.stats_performed,
+                'links_followed': self.links_followed,
+                'links_skipped': self.links_skipped,
+                'links_broken': self.links_broken,
+                'error_count': sum(self.errors_by_errno.values()),
+                'errors_by_errno': dict(self.errors_by_errno.most_common()),
+                'errors_by_top_dir': dict(self.errors_by_top_dir.most_common()),
+                'root_errors': [list(item) for item in self.root_errors],
+                'slowest_directories': [[path, round(seconds, 6)] for path, seconds in slowest],
+            }
+    
+    def to_json(self, path: Optional[str] = None, indent: int = 2) -> str:
+        """
+        Export stats as JSON
+        
+        Args:
+            path: Also write the JSON to this file (optional)
+            indent: JSON indentation
+        
+        Returns:
+            JSON text
+        """
+        text = json.dumps(self.to_dict(), indent=indent)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
+    
+    def __repr__(self):
+        return (f"ScanStats(dirs={self.directories_listed}, entries={self.entries_seen}, "
+                f"stats={self.stats_performed}, errors={self.error_count}, "
+                f"{self.duration:.2f}s)")
@@ -0,0 +1,295 @@
+"""
+Multi-drive scanning with one worker process per storage device
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+from collections import OrderedDict
+from typing import Dict, Generator, List, Optional, Tuple
+
+import config
+from utils.mounts import MountTable
+
+
+def plan_shards(roots: List[str], mounts: MountTable, exclusions=None,
+                include_submounts: bool = True) -> List[List[str]]:
+    """
+    Group scan roots by the device they live on
+    
+    Every root goes to the shard of its device. With include_submounts, disk
+    and network mounts below a root become roots of their own device's shard,
+    so each worker can stay on one filesystem. Mounts the walk would never
+    reach (below an excluded directory or a pseudo filesystem) are left out.
+    Memory-backed mounts (tmpfs, overlay, ...) get no shard: the worker of
+    the root they are mounted under walks into them (see scan_shard).
+    
+    Args:
+        roots: Normalized scan roots (see FileScanner.normalize_roots)
+        mounts: Current mount table
+        exclusions: ExclusionRules applied during the walk (None = none)
+        include_submounts: Give mounts below the roots their own shards
+    
+    Returns:
+        List of shards, each a list of roots on the same device
+    """
+    shards: Dict[object, List[str]] = OrderedDict()
+    
+    def add(path, device_key):
+        shards.setdefault(device_key, []).append(path)
+    
+    def reachable(root, mount_point):
+        # Every directory from below the root down to the mount point is one
+        # the walker checks against the exclusions before listing it
+        path = root
+        for name in os.path.relpath(mount_point, root).split(os.sep):
+            path = os.path.join(path, name)
+            if exclusions is not None and exclusions.match(path, name) is not None:
+                return False
+            entry = mounts.get(path)
+            if entry is not None and mounts.is_pseudo(entry):
+                return False
+        return True
+    
+    for root in roots:
+        try:
+            root_dev = os.stat(root).st_dev
+        except OSError:
+            continue
+        add(root, root_dev)
+        
+        if not include_submounts or not mounts:
+            continue
+        for entry in mounts.submounts(root):
+            if not mounts.is_storage(entry) or not reachable(root, entry.mount_point):
+                continue
+            if not os.path.isdir(entry.mount_point):
+                continue  # File bind mounts (e.g. /etc/hosts in containers)
+            try:
+                device = os.stat(entry.mount_point).st_dev
+            except OSError:
+                continue
+            if device != root_dev:
+                add(entry.mount_point, device)
+    
+    return list(shards.values())
+
+
+def _put(out, cancel_event, message) -> bool:
+    """Blocking put that gives up once the scan is cancelled"""
+    while not cancel_event.is_set():
+        try:
+            out.put(message, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def scan_shard(index: int, roots: List[str], options: dict, out, cancel_event):
+    """
+    Worker process body: scan one shard and stream its files to the parent
+    
+    Messages put on out:
+        ('entries', index, [(dirpath, name, stat), ...])
+        ('progress', index, files_scanned, bytes_scanned, current_name)
+        ('done', index, summary)  - summary is a dict ('stats' from ScanStats.to_dict(),
+                                    'error' set on failure)
+    """
+    # Imported here: this module is imported by file_scanner itself
+    from utils.file_scanner import FileScanner
+    from utils.progress import ProgressChannel
+    
+    def report(event):
+        _put(out, cancel_event, ('progress', index, event.files, event.bytes, event.current))
+    
+    summary = {'overlap_skipped': {}, 'skipped_mounts': [], 'hits': [], 'stats': None, 'error': None}
+    scanner = None
+    try:
+        # Each worker stays on its roots' filesystems: other storage mounts are
+        # other shards, memory-backed mounts are walked by the worker above them
+        scanner = FileScanner(ProgressChannel(report), workers=options['workers'],
+                              use_index=options['use_index'],
+                              exclusions=options['exclusions'], one_filesystem=True,
+                              sharded=False, follow_symlinks=options['follow_symlinks'],
+                              retry_denied=options['retry_denied'],
+                              negative_cache=options['negative_cache'])
+        # Links into another shard's roots are left to that shard
+        scanner.other_roots = options['all_roots']
+        scanner.shard_worker = True
+        path = scanner.directories.path
+        batch_size = options['batch_size']
+        batch = []
+        for dir_id, name, stat in scanner.scan_roots_entries(roots, options['min_size'],
+                                                            options['max_size'],
+                                                            options['unique_inodes']):
+            if cancel_event.is_set():
+                scanner.cancel()
+                break
+            # Directory ids are per process; the same path string is pickled once per batch
+            batch.append((path(dir_id), name, stat))
+            if len(batch) >= batch_size:
+                if not _put(out, cancel_event, ('entries', index, batch)):
+                    scanner.cancel()
+                    break
+                batch = []
+        if batch:
+            _put(out, cancel_event, ('entries', index, batch))
+        
+        summary['overlap_skipped'] = scanner.overlap_skipped
+        summary['skipped_mounts'] = scanner.skipped_mounts
+        summary['hits'] = [rule.hits for rule in scanner.exclusions.rules]
+        summary['stats'] = scanner.stats.to_dict()
+    except Exception as e:
+        summary['error'] = str(e)
+    finally:
+        if scanner is not None:
+            for db in {scanner.index, scanner.negative} - {None}:
+                db.close()
+        _put(out, cancel_event, ('done', index, summary))
+
+
+class ShardedScan:
+    """Runs the shards of one FileScanner scan in worker processes
+    
+    Shards run in parallel (up to config.SHARD_PROCESSES at a time, each with
+    its own directory-listing threads), so independent disks are read at their
+    combined throughput instead of one after another. Files from all workers
+    are merged into one stream of (dir_id, name, stat) entries interned in the
+    parent's directory table; progress, counters, scan stats, skipped mounts
+    and exclusion hits are summed into the parent scanner, and cancelling the
+    parent stops every worker.
+    """
+    
+    def __init__(self, scanner, shards: List[List[str]],
+                 max_processes: Optional[int] = None):
+        """
+        Initialize sharded scan
+        
+        Args:
+            scanner: FileScanner whose settings, progress and counters are used
+            shards: Roots per shard (see plan_shards)
+            max_processes: Shards scanned at the same time (None = config.SHARD_PROCESSES)
+        """
+        if max_processes is None:
+            max_processes = getattr(config, 'SHARD_PROCESSES', 4)
+        self.scanner = scanner
+        self.shards = shards
+        self.max_processes = max(1, max_processes)
+        self.errors: List[Tuple[List[str], str]] = []
+    
+    def run(self, min_size: int = 0, max_size: Optional[int] = None,
+            unique_inodes: bool = True) -> Generator[tuple, None, None]:
+        """
+        Scan all shards and yield their files as one stream
+        
+        Args:
+            min_size: Minimum file size in bytes
+            max_size: Maximum file size in bytes (None for no limit)
+            unique_inodes: Yield hardlinked files once per shard (hardlinks
+                           never span devices, so once overall)
+        
+        Yields:
+            Tuple of (dir_id, name, stat_result), in no particular order
+        """
+        scanner = self.scanner
+        options = {
+            'workers': scanner.workers,
+            'use_index': scanner.index is not None,
+            'exclusions': scanner.exclusions,
+            'follow_symlinks': scanner.follow_symlinks,
+            'retry_denied': scanner.retry_denied,
+            'negative_cache': scanner.negative is not None,
+            'all_roots': [root for roots in self.shards for root in roots],
+            'min_size': min_size,
+            'max_size': max_size,
+            'unique_inodes': unique_inodes,
+            'batch_size': getattr(config, 'SHARD_BATCH_SIZE', 1024),
+        }
+        shard_roots = {os.path.normcase(root) for roots in self.shards for root in roots}
+        
+        # Spawn (not fork): the parent runs GUI and scan threads
+        context = multiprocessing.get_context('spawn')
+        out = context.Queue(maxsize=getattr(config, 'SHARD_QUEUE_SIZE', 64))
+        cancel_event = context.Event()
+        pending = list(enumerate(self.shards))
+        running = {}
+        progress_totals = {}  # shard index -> (files, bytes) last reported
+        
+        def start_next():
+            while pending and len(running) < self.max_processes:
+                index, roots = pending.pop(0)
+                process = context.Process(target=scan_shard,
+                                          args=(index, roots, options, out, cancel_event),
+                                          name=f"scan-shard-{index}", daemon=True)
+                process.start()
+                running[index] = process
+        
+        def finish(index, summary):
+            running.pop(index).join()
+            if summary['error']:
+                self.errors.append((self.shards[index], summary['error']))
+                print(f"Error scanning {', '.join(self.shards[index])}: {summary['error']}")
+            for key, count in summary['overlap_skipped'].items():
+                if key != 'roots':
+                    scanner.overlap_skipped[key] = scanner.overlap_skipped.get(key, 0) + count
+            # Mounts handled by another shard were not really skipped
+            scanner.skipped_mounts.extend(
+                mount for mount in summary['skipped_mounts']
+                if os.path.normcase(mount[0]) not in shard_roots
+            )
+            for rule, hits in zip(scanner.exclusions.rules, summary['hits']):
+                rule.hits += hits
+            if summary.get('stats'):
+                scanner.stats.merge(summary['stats'])
+        
+        progress = scanner.progress
+        intern = scanner.directories.intern
+        try:
+            start_next()
+            while running:
+                if scanner.cancelled:
+                    cancel_event.set()
+                    break
+                try:
+                    message = out.get(timeout=0.1)
+                except queue.Empty:
+                    # A worker that died without reporting (crash, killed)
+                    for index, process in list(running.items()):
+                        if not process.is_alive() and process.exitcode:
+                            finish(index, {'error': f"worker exited with code {process.exitcode}",
+                                           'overlap_skipped': {}, 'skipped_mounts': [], 'hits': []})
+                    start_next()
+                    continue
+                
+                kind, index = message[0], message[1]
+                if kind == 'entries':
+                    for dirpath, name, stat in message[2]:
+                        yield (intern(dirpath), name, stat)
+                elif kind == 'progress':
+                    files, size, current = message[2:]
+                    last_files, last_size = progress_totals.get(index, (0, 0))
+                    progress_totals[index] = (files, size)
+                    scanner.files_scanned += files - last_files
+                    progress.advance(files - last_files, size - last_size, current)
+                elif kind == 'done':
+                    # Workers flush progress before 'done', so counts are final
+                    finish(index, message[2])
+                    start_next()
+        finally:
+            # Stop workers (also on cancel or early close); drain so blocked puts return
+            cancel_event.set()
+            deadline = time.monotonic() + 5.0
+            for process in running.values():
+                while process.is_alive() and time.monotonic() < deadline:
+                    try:
+                        out.get_nowait()
+                    except queue.Empty:
+                        process.join(0.05)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            out.close()
+            progress.flush()
+            scanner.stats.finish()